@@ -1,61 +1,127 @@
-from logic_operators import operator_chain  #immports a utility function to handle operator chains
+from logic_operators import operator_chain, read_statements  #rule parsing for chaining and the streaming statement reader
 
 def parse_chain_file(filename, method):
-    knowledge_base = {}  #dictionary to hold logical rules for chaining
+    knowledge_base = {}  #dictionary to store logical rules
     fact_set = set()  #set to store known facts
-    query_statement = 0  #placeholder for the query statement
-    parse_mode = 0  #keps track of whether parsing "TELL" or "ASK" section
-
-    #read and split the input file into lines
-    with open(filename, 'r') as file:
-        lines = file.read().splitlines()
-
-    for line in lines:
-        line = line.strip()  #remove leading and trailing whitespace
-        if not line:
-            continue  #skip empty lines
-
-        if line == "TELL":
-            #enter the TELL section (knowledge base rules)
-            parse_mode = 'TELL'
-        elif line == "ASK":
-            #enter the ASK section (query)
-            parse_mode = 'ASK'
-        elif parse_mode == 'TELL':
-            #parse and process logical rules in the TELL section
-            clauses = line.split(';')  # Split multiple rules by semicolons
-            for clause in clauses:
-                clause = clause.strip()
-                #process each clause using the operator_chain function
-                operator_chain(clause, method, knowledge_base, fact_set)
-        elif parse_mode == 'ASK' and line:
-            #parse the ASK section (query statement)
-            query_statement = line.strip()
-
-    #return the parsed knowledge base, facts, and query statement
-    return knowledge_base, fact_set, query_statement
-
-#backward chaining
-def backward_chaining(knowledge_base, fact_set, query_statement, derived_facts):
-    #if the query is already a known fact, return success
-    if query_statement in fact_set:
-        derived_facts.add(query_statement)
-        return True
-    
-    #if the query has no rules in the knowledge base, it cannot be satisfied
-    if query_statement not in knowledge_base:
-        return False
-
-    #evaluate all conditions in the rules for the query
-    for conditions in knowledge_base[query_statement]:
-        #recursively check all conditions using backward chaining
-        if all(backward_chaining(knowledge_base, fact_set, cond, derived_facts) for cond in conditions):
-            #if all conditions are satisfied, the query is satisfied
-            derived_facts.add(query_statement)
-            #format the derived facts in sorted order for the result
-            derived_facts_list = sorted(derived_facts, key=lambda x: (len(x), x))
-            return "> YES: " + ', '.join(derived_facts_list)
+    queries = []  #every query of the ask section, in order
+    operator_chain.error_printed = False  #the generic kb message is printed once per file, not once per process
+
+    #statements are streamed from the file one at a time (see read_statements)
+    for section, statement in read_statements(filename):
+        if section == 'TELL':
+            #process the rule using the operator_chain function
+            operator_chain(statement, method, knowledge_base, fact_set)
+        elif section == 'ASK':
+            #queries, one per line or separated by semicolons
+            queries.append(statement)
+
+    #return the parsed knowledge base, facts, and queries
+    return knowledge_base, fact_set, queries
+
+#memo of decided goals that can outlive one query: proofs stay valid when the kb grows, failures do not
+class GoalTable:
+    def __init__(self):
+        self.proven = {}  #goal -> rule body that proved it (None for facts)
+        self.failed = set()  #goals that cannot be proven
+        self.expanded = 0  #goals that got a frame of their own
+        self.memo_hits = 0  #goals answered from proven or failed
+
+    def stats(self):
+        return {'goals_expanded': self.expanded, 'memo_hits': self.memo_hits}
+
+    def invalidate_failures(self): #called when facts or rules are added
+        self.failed.clear()
+
+#backward chaining (tabled and iterative: an explicit goal stack replaces recursion so proof depth is unbounded)
+def backward_chaining(knowledge_base, fact_set, query_statement, derived_facts, table=None):
+    table = table if table is not None else GoalTable()  #pass a table to keep it warm across queries
+    proven = table.proven
+    failed = table.failed
+    in_progress = {}  #goal -> depth of its frame on the stack, used to detect cycles
+    tentative = []  #goals that only failed because of a cycle through a goal still in progress
+
+    #frame: [goal, rule bodies, body index, premise index, lowest in-progress depth reached, tentative mark]
+    stack = []
+
+    def resolve(goal):
+        #returns True/False when the goal is already decided, otherwise pushes a frame for it
+        if goal in proven:
+            table.memo_hits += 1
+            return True
+        if goal in fact_set:
+            proven[goal] = None
+            return True
+        if goal in failed:
+            table.memo_hits += 1
+            return False
+        if goal in in_progress:
+            frame = stack[-1]
+            frame[4] = min(frame[4], in_progress[goal])  #cyclic dependency: fail this path for now
+            return False
+        in_progress[goal] = len(stack)
+        table.expanded += 1
+        stack.append([goal, knowledge_base.get(goal, ()), 0, 0, len(stack), len(tentative)])
+        return None
+
+    answer = resolve(query_statement)
+    while stack:
+        frame = stack[-1]
+        goal, bodies, body_index, premise_index, low, mark = frame
+        depth = len(stack) - 1
+
+        if body_index == len(bodies):
+            #every alternative body failed
+            stack.pop()
+            del in_progress[goal]
+            if low < depth:
+                tentative.append(goal)  #depends on an ancestor, decided when that ancestor completes
+                stack[-1][4] = min(stack[-1][4], low)
+            else:
+                failed.add(goal)
+                failed.update(tentative[mark:])
+                del tentative[mark:]
+            answer = False
+        elif premise_index == len(bodies[body_index]):
+            #every premise of the current body is proven
+            stack.pop()
+            del in_progress[goal]
+            proven[goal] = bodies[body_index]
+            del tentative[mark:]  #failures below a proven goal may have depended on it, forget them
+            answer = True
         else:
-            #if any condition fails, the query cannot be satisfied
-            return "NO"
-    return False
\ No newline at end of file
+            answer = resolve(bodies[body_index][premise_index])
+            if answer is None:
+                continue  #new frame pushed for the premise
+
+        #feed the answer of the finished goal or premise back into the frame now on top
+        if stack:
+            parent = stack[-1]
+            if answer:
+                parent[3] += 1
+            else:
+                parent[2] += 1
+                parent[3] = 0
+
+    if not answer:
+        return "NO"
+
+    #collect the goals used in the proof of the query
+    pending = [query_statement]
+    while pending:
+        goal = pending.pop()
+        if goal not in derived_facts:
+            derived_facts.add(goal)
+            pending.extend(proven[goal] or ())
+    derived_facts_list = sorted(derived_facts, key=lambda x: (len(x), x))
+    return "> YES: " + ', '.join(derived_facts_list)
+
+#yields (answer, derived facts) per query, sharing one goal table; a Stats object passed as stats
+#receives the table counters after each query
+def backward_chaining_queries(knowledge_base, fact_set, queries, stats=None):
+    table = GoalTable()
+    for query_statement in queries:
+        derived_facts = set()
+        answer = backward_chaining(knowledge_base, fact_set, query_statement, derived_facts, table)
+        if stats is not None:
+            stats.answered(table.stats())
+        yield answer, derived_facts
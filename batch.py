@@ -0,0 +1,172 @@
+import argparse
+import contextlib
+import glob
+import io
+import json
+import os
+import signal
+import sys
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor, wait, FIRST_COMPLETED, TimeoutError
+from concurrent.futures.process import BrokenProcessPool
+
+from execution import InferenceEngine, InferenceMethod
+from dimacs import COMPRESSED, DIMACS_SUFFIXES
+
+#batch runner: answers many TELL/ASK files with several methods in one long-lived process pool,
+#writing one json line per (file, method) task with its answers and timing
+
+class TaskTimeout(BaseException): #not an Exception, so the engines' error handling cannot swallow it
+    pass
+
+def raise_timeout(signum, frame):
+    raise TaskTimeout()
+
+def is_kb_file(name): #TELL/ASK text or DIMACS, possibly compressed, judged by the extension
+    name = name.lower()
+    for suffix in COMPRESSED:
+        if name.endswith(suffix):
+            name = name[:-len(suffix)]
+    return name.endswith(('.txt',) + DIMACS_SUFFIXES)
+
+#files named by directories (their kb files, recursively: *.txt and DIMACS, compressed or not) or glob patterns
+def expand_paths(patterns):
+    files = []
+    for pattern in patterns:
+        if os.path.isdir(pattern):
+            found = glob.glob(os.path.join(pattern, '**', '*'), recursive=True)
+            files.extend(sorted(name for name in found if is_kb_file(name) and os.path.isfile(name)))
+        else:
+            files.extend(sorted(glob.glob(pattern, recursive=True)) or [pattern])
+    return list(dict.fromkeys(files))  #drop duplicates, keep order
+
+def result_record(result): #json-friendly form of an InferenceResult
+    record = {'answer': result.is_valid}
+    if result.derived_facts:
+        record['derived_facts'] = sorted(result.derived_facts, key=lambda x: (len(x), x))
+    if result.error_message:
+        record['error'] = result.error_message
+    return record
+
+#runs in a worker process: answers every query of one file with one method, the timeout is enforced
+#with an interval timer that interrupts the python code of the task
+def run_task(filename, method, timeout):
+    record = {'file': filename, 'method': method}
+    use_alarm = timeout and hasattr(signal, 'setitimer')
+    if use_alarm:
+        signal.signal(signal.SIGALRM, raise_timeout)
+        signal.setitimer(signal.ITIMER_REAL, timeout)
+    start = time.perf_counter()
+    results = []
+    printed = io.StringIO()  #messages the engines print, kept out of the json lines stream
+    try:
+        with contextlib.redirect_stdout(printed):
+            for result in InferenceEngine().process(filename, method):
+                results.append(result_record(result))
+        status = 'error' if any('error' in result for result in results) else 'ok'
+    except TaskTimeout:
+        status = 'timeout'
+    except Exception as e:
+        status = 'error'
+        record['error'] = str(e)
+    finally:
+        if use_alarm:
+            signal.setitimer(signal.ITIMER_REAL, 0)
+    record.update(status=status, seconds=round(time.perf_counter() - start, 6), results=results)
+    if printed.getvalue():
+        record['messages'] = printed.getvalue().splitlines()
+    return record
+
+TIMEOUT_GRACE = 5.0  #seconds the parent waits past the task timeout before killing the worker
+
+def timeout_record(filename, method, seconds):
+    return {'file': filename, 'method': method, 'status': 'timeout', 'seconds': round(seconds, 6), 'results': []}
+
+def kill_workers(pool): #terminates the worker processes of a pool (no public api for it before python 3.14)
+    for process in list(pool._processes.values()):
+        process.terminate()
+
+#schedules tasks on a shared pool with at most `workers` tasks in flight, so a crashing worker only takes
+#down the tasks that were running; those are retried one at a time in a fresh pool to find the culprit.
+#the alarm in run_task only fires between python bytecodes, so a task stuck in c code (a large compiled
+#truth table block, a blocking read) is also timed out by the parent: past timeout + TIMEOUT_GRACE its
+#record is written, the pool is killed and rebuilt, and the other tasks that were running start over
+def run_batch(tasks, workers, timeout, emit):
+    queue = deque(tasks)
+    limit = timeout + TIMEOUT_GRACE if timeout else None
+    while queue:
+        suspects = []
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            running = {}
+            started = {}
+            try:
+                while queue or running:
+                    while queue and len(running) < workers:
+                        task = queue.popleft()
+                        future = pool.submit(run_task, *task, timeout)
+                        running[future], started[future] = task, time.perf_counter()
+                    wait_for = None if limit is None else max(0.0, min(started[future] + limit for future in running)
+                                                               - time.perf_counter())
+                    done, _ = wait(running, timeout=wait_for, return_when=FIRST_COMPLETED)
+                    for future in done:
+                        emit(future.result())
+                        del running[future]
+                    now = time.perf_counter()
+                    expired = [future for future in running if limit is not None and now - started[future] >= limit]
+                    if expired:
+                        for future in expired:
+                            emit(timeout_record(*running.pop(future), now - started[future]))
+                        queue.extendleft(reversed(list(running.values())))  #innocent tasks run again
+                        running.clear()
+                        kill_workers(pool)
+                        break
+            except BrokenProcessPool:
+                suspects = list(running.values())
+        for filename, method in suspects:
+            with ProcessPoolExecutor(max_workers=1) as pool:
+                start = time.perf_counter()
+                try:
+                    emit(pool.submit(run_task, filename, method, timeout).result(timeout=limit))
+                except BrokenProcessPool:
+                    emit({'file': filename, 'method': method, 'status': 'crash', 'seconds': None, 'results': []})
+                except TimeoutError:
+                    emit(timeout_record(filename, method, time.perf_counter() - start))
+                    kill_workers(pool)
+
+def parse_arguments():
+    parser = argparse.ArgumentParser(description='Batch inference over directories or globs of KB files')
+    parser.add_argument('paths', nargs='+', help='Directories (searched for *.txt and DIMACS files) or glob patterns')
+    #the portfolio starts its own processes, which pool workers (daemons) are not allowed to do
+    parser.add_argument('--methods', nargs='+', default=['TT'],
+                        choices=[m.value for m in InferenceMethod if m is not InferenceMethod.PORTFOLIO],
+                        help='Inference methods run on every file')
+    parser.add_argument('--workers', type=int, default=os.cpu_count() or 1, help='Number of worker processes')
+    parser.add_argument('--timeout', type=float, default=60.0, help='Seconds allowed per file and method (0 for none)')
+    parser.add_argument('--output', type=str, default='-', help='JSON Lines output file, - for stdout')
+    return parser.parse_args()
+
+def main():
+    args = parse_arguments()
+    files = expand_paths(args.paths)
+    tasks = [(filename, method) for filename in files for method in args.methods]
+    output = sys.stdout if args.output == '-' else open(args.output, 'w')
+    counts = {}
+
+    def emit(record): #writes each record as soon as its task finishes
+        counts[record['status']] = counts.get(record['status'], 0) + 1
+        output.write(json.dumps(record) + '\n')
+        output.flush()
+
+    start = time.perf_counter()
+    try:
+        run_batch(tasks, max(args.workers, 1), args.timeout, emit)
+    finally:
+        if output is not sys.stdout:
+            output.close()
+    summary = ', '.join(f"{status}: {count}" for status, count in sorted(counts.items()))
+    print(f"{len(tasks)} tasks over {len(files)} files in {time.perf_counter() - start:.2f} s ({summary})",
+          file=sys.stderr)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,2 @@
+#benchmark scripts, run from the repository root as python -m benchmarks.<name>;
+#python -m benchmarks.suite times every method on generated kbs against baseline.json
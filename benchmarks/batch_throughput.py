@@ -0,0 +1,45 @@
+import argparse
+import os
+import subprocess
+import sys
+import tempfile
+import time
+
+from batch import run_batch
+from benchmarks.session_latency import horn_kb
+
+#one interpreter per file, the way the nightly job calls execution.py, vs one shared worker pool
+def main():
+    parser = argparse.ArgumentParser(description='Batch runner throughput vs one execution.py process per file')
+    parser.add_argument('--files', type=int, default=200)
+    parser.add_argument('--symbols', type=int, default=50)
+    parser.add_argument('--method', default='FC')
+    parser.add_argument('--workers', type=int, default=os.cpu_count() or 1)
+    parser.add_argument('--subprocess-files', type=int, default=20, help='files timed with one process each')
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as directory:
+        paths = []
+        for i in range(args.files):
+            path = os.path.join(directory, f"kb{i}.txt")
+            with open(path, 'w') as file:
+                file.write(f"TELL\n{'; '.join(horn_kb(args.symbols, seed=i))}\nASK\ns{args.symbols - 1}\n")
+            paths.append(path)
+
+        start = time.perf_counter()
+        for path in paths[:args.subprocess_files]:
+            subprocess.run([sys.executable, 'execution.py', path, args.method], check=True, capture_output=True)
+        per_file = (time.perf_counter() - start) / args.subprocess_files
+
+        records = []
+        start = time.perf_counter()
+        run_batch([(path, args.method) for path in paths], args.workers, 60.0, records.append)
+        batch_per_file = (time.perf_counter() - start) / len(paths)
+        assert all(record['status'] == 'ok' for record in records)
+
+    print(f"{'mode':>12} {'files':>6} {'ms/file':>8} {'files/s':>8}")
+    print(f"{'subprocess':>12} {args.subprocess_files:>6} {per_file * 1e3:>8.2f} {1 / per_file:>8.1f}")
+    print(f"{'batch':>12} {len(paths):>6} {batch_per_file * 1e3:>8.2f} {1 / batch_per_file:>8.1f}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,37 @@
+import argparse
+import random
+import time
+
+from dpll import DPLLSolver
+from cdcl import CDCLSolver
+
+#uniform random 3-sat near the satisfiability threshold (about 4.26 clauses per variable)
+def random_3sat(num_vars, ratio, rng):
+    return [[rng.choice((1, -1)) * var for var in rng.sample(range(1, num_vars + 1), 3)]
+            for _ in range(int(ratio * num_vars))]
+
+def main():
+    parser = argparse.ArgumentParser(description='DPLL vs CDCL on random 3-SAT')
+    parser.add_argument('--vars', type=int, nargs='+', default=[50, 100, 150, 200])
+    parser.add_argument('--ratio', type=float, default=4.26)
+    parser.add_argument('--dpll-limit', type=int, default=100, help='largest instance given to plain DPLL')
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    print(f"{'vars':>6} {'clauses':>8} {'result':>7} {'cdcl (s)':>10} {'conflicts':>10} {'dpll (s)':>10}")
+    for num_vars in args.vars:
+        clauses = random_3sat(num_vars, args.ratio, rng)
+        start = time.perf_counter()
+        solver = CDCLSolver(num_vars, clauses)
+        result = 'SAT' if solver.solve() else 'UNSAT'
+        cdcl_time = time.perf_counter() - start
+        dpll_column = 'skipped'
+        if num_vars <= args.dpll_limit:
+            start = time.perf_counter()
+            DPLLSolver(num_vars, clauses).solve()
+            dpll_column = f"{time.perf_counter() - start:.4f}"
+        print(f"{num_vars:>6} {len(clauses):>8} {result:>7} {cdcl_time:>10.4f} {solver.conflicts:>10} {dpll_column:>10}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,75 @@
+import argparse
+import random
+import tracemalloc
+
+from dpll import KnowledgeBase
+
+#the object-per-literal representation dpll.py used before the csr clause database, kept for comparison
+class LegacyLiteral:
+    def __init__(self, name, negated=False):
+        self.name = name
+        self.negated = negated
+
+    def __eq__(self, other):
+        return isinstance(other, LegacyLiteral) and self.name == other.name and self.negated == other.negated
+
+    def __hash__(self):
+        return hash((self.name, self.negated))
+
+class LegacyClause:
+    def __init__(self, literals):
+        self.literals = set(literals)
+
+class LegacyKnowledgeBase:
+    def __init__(self):
+        self.clauses = []
+        self.symbols = set()
+
+    def add_clause(self, clause):
+        self.clauses.append(clause)
+        for literal in clause.literals:
+            self.symbols.add(literal.name)
+
+def random_clauses(num_vars, num_clauses, width, seed=0):
+    rng = random.Random(seed)
+    return [[(f"v{rng.randrange(num_vars)}", rng.random() < 0.5) for _ in range(width)]
+            for _ in range(num_clauses)]
+
+def build_legacy(clauses):
+    kb = LegacyKnowledgeBase()
+    for clause in clauses:
+        kb.add_clause(LegacyClause([LegacyLiteral(name, negated) for name, negated in clause]))
+    return kb
+
+def build_csr(clauses):
+    kb = KnowledgeBase()
+    literal = kb.symbol_table.intern
+    for clause in clauses:
+        kb.add_clause([-literal(name) if negated else literal(name) for name, negated in clause])
+    return kb
+
+def measure(builder, clauses): #bytes allocated by the knowledge base that stay alive after building it
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    kb = builder(clauses)
+    after = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    return after - before, kb
+
+def main():
+    parser = argparse.ArgumentParser(description='Memory per clause of the clause database')
+    parser.add_argument('--clauses', type=int, nargs='+', default=[10000, 100000])
+    parser.add_argument('--vars', type=int, default=5000)
+    parser.add_argument('--width', type=int, default=3)
+    args = parser.parse_args()
+
+    print(f"{'clauses':>8} {'legacy (B/clause)':>18} {'csr (B/clause)':>15} {'ratio':>7}")
+    for num_clauses in args.clauses:
+        clauses = random_clauses(args.vars, num_clauses, args.width)
+        legacy_bytes, _ = measure(build_legacy, clauses)
+        csr_bytes, _ = measure(build_csr, clauses)
+        print(f"{num_clauses:>8} {legacy_bytes / num_clauses:>18.1f} {csr_bytes / num_clauses:>15.1f} "
+              f"{legacy_bytes / csr_bytes:>7.1f}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,39 @@
+import argparse
+import random
+import time
+
+from dpll import KnowledgeBase, dpll_satisfiable
+
+#exact satisfiability: variables are split into groups of three and exactly one per group must hold,
+#with random implications linking groups together
+def exactly_one_kb(num_groups, links, seed=0):
+    rng = random.Random(seed)
+    kb = KnowledgeBase()
+    for group in range(num_groups):
+        group_vars = [kb.literal(f"x{group}_{i}") for i in range(3)]
+        kb.add_clause(group_vars)
+        for i in range(3):
+            for j in range(i + 1, 3):
+                kb.add_clause((-group_vars[i], -group_vars[j]))
+    for _ in range(links):
+        a, b = rng.randrange(num_groups), rng.randrange(num_groups)
+        kb.add_clause((-kb.literal(f"x{a}_{rng.randrange(3)}"), kb.literal(f"x{b}_{rng.randrange(3)}")))
+    return kb
+
+def main():
+    parser = argparse.ArgumentParser(description='DPLL benchmark on exact-satisfiability instances')
+    parser.add_argument('--groups', type=int, nargs='+', default=[100, 1000, 3000])
+    parser.add_argument('--links-per-group', type=float, default=0.5)
+    args = parser.parse_args()
+
+    print(f"{'variables':>10} {'clauses':>8} {'result':>8} {'time (s)':>10}")
+    for groups in args.groups:
+        kb = exactly_one_kb(groups, int(groups * args.links_per_group))
+        start = time.perf_counter()
+        model = dpll_satisfiable(kb)
+        elapsed = time.perf_counter() - start
+        result = 'SAT' if model is not None else 'UNSAT'
+        print(f"{len(kb.symbols):>10} {len(kb):>8} {result:>8} {elapsed:>10.4f}")
+
+if __name__ == "__main__":
+    main()
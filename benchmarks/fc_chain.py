@@ -0,0 +1,53 @@
+import argparse
+import time
+
+from forward_chaining import forward_chaining
+
+#the fixpoint loop forward_chaining used before the agenda rewrite, kept as the reference point
+def fixpoint_forward_chaining(knowledge_base, fact_set, query_statement):
+    fact_set = set(fact_set)
+    changed = True
+    while changed:
+        changed = False
+        for condition, results in knowledge_base.items():
+            if all(c in fact_set for c in condition):
+                for result in results:
+                    if result not in fact_set:
+                        fact_set.add(result)
+                        changed = True
+    return "NO" if query_statement not in fact_set else "YES"
+
+#builds s0 => s1 => ... => sN, optionally with the rules stored back to front (worst case for the fixpoint loop)
+def horn_chain(length, reverse=False):
+    steps = range(length - 1, -1, -1) if reverse else range(length)
+    knowledge_base = {(f"s{i}",): [f"s{i + 1}"] for i in steps}
+    return knowledge_base, {"s0"}, f"s{length}"
+
+def timed(function, *args):
+    start = time.perf_counter()
+    result = function(*args)
+    return time.perf_counter() - start, result
+
+def main():
+    parser = argparse.ArgumentParser(description='Forward chaining benchmark on horn chains')
+    parser.add_argument('--sizes', type=int, nargs='+', default=[1000, 10000, 100000])
+    parser.add_argument('--fixpoint-limit', type=int, default=2000,
+                        help='largest reversed chain the fixpoint loop is run on')
+    args = parser.parse_args()
+
+    print(f"{'rules':>8} {'order':>8} {'agenda (s)':>12} {'fixpoint (s)':>14}")
+    for size in args.sizes:
+        for reverse in (False, True):
+            knowledge_base, facts, query = horn_chain(size, reverse)
+            agenda_time, result = timed(forward_chaining, knowledge_base, set(facts), query)
+            assert result.startswith("> YES")
+            if reverse and size > args.fixpoint_limit:
+                fixpoint_column = 'skipped'
+            else:
+                fixpoint_time, _ = timed(fixpoint_forward_chaining, knowledge_base, facts, query)
+                fixpoint_column = f"{fixpoint_time:.4f}"
+            order = 'reverse' if reverse else 'forward'
+            print(f"{size:>8} {order:>8} {agenda_time:>12.4f} {fixpoint_column:>14}")
+
+if __name__ == "__main__":
+    main()
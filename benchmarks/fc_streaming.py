@@ -0,0 +1,86 @@
+import argparse
+import random
+import time
+
+from logic_operators import operator_chain
+from forward_chaining import ForwardChainer, RuleNetwork
+
+#sustained fact insertion and retraction against a fixed rule set: the rule network propagates each change,
+#the baseline recomputes the closure of the current facts from scratch after every change (on the first
+#--scratch changes only, it is far slower). the rules form layers over input symbols, each symbol implied
+#by one or two symbols of lower layers, with a few back edges making cycles
+def layered_rules(num_inputs, num_derived, back_edges, seed=0):
+    rng = random.Random(seed)
+    sentences = []
+    for i in range(num_inputs, num_inputs + num_derived):
+        premises = ' & '.join(f"s{rng.randrange(i)}" for _ in range(rng.randint(1, 2)))
+        sentences.append(f"{premises} => s{i}")
+    total = num_inputs + num_derived
+    for _ in range(back_edges):
+        later = rng.randrange(num_inputs, total)
+        sentences.append(f"s{later} => s{rng.randrange(num_inputs, later)}")
+    knowledge_base, fact_set = {}, set()
+    for sentence in sentences:
+        operator_chain(sentence, "FC", knowledge_base, fact_set)
+    return knowledge_base
+
+def scratch_closure(knowledge_base, facts): #the closure recomputed by a fresh agenda chainer
+    chainer = ForwardChainer()
+    for fact in facts:
+        chainer.add_fact(fact)
+    for condition, results in knowledge_base.items():
+        chainer.add_rule(condition, results)
+    chainer.run()
+    return chainer.inferred
+
+def main():
+    parser = argparse.ArgumentParser(description='Fact insertion and retraction throughput of the rule network')
+    parser.add_argument('--inputs', type=int, default=20000, help='symbols only ever asserted as facts')
+    parser.add_argument('--derived', type=int, default=20000, help='symbols concluded by rules')
+    parser.add_argument('--back-edges', type=int, default=200)
+    parser.add_argument('--facts', type=int, default=10000, help='facts streamed in, then retracted')
+    parser.add_argument('--scratch', type=int, default=50, help='changes timed for the recompute baseline')
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args()
+
+    knowledge_base = layered_rules(args.inputs, args.derived, args.back_edges, args.seed)
+    rng = random.Random(args.seed)
+    stream = [f"s{i}" for i in rng.sample(range(args.inputs), min(args.facts, args.inputs))]
+
+    start = time.perf_counter()
+    network = RuleNetwork(knowledge_base)
+    build = time.perf_counter() - start
+    derived = 0
+    start = time.perf_counter()
+    for fact in stream:
+        derived += len(network.add_fact(fact))
+    insert_time = time.perf_counter() - start
+    closure = set(network.true)
+    removed = 0
+    start = time.perf_counter()
+    for fact in stream:
+        removed += len(network.retract(fact))
+    retract_time = time.perf_counter() - start
+    assert not network.true and removed == derived
+
+    #the baseline after each of the first changes of both phases
+    scratch = stream[:args.scratch]
+    start = time.perf_counter()
+    for i in range(1, len(scratch) + 1):
+        scratch_closure(knowledge_base, scratch[:i])
+    scratch_insert = (time.perf_counter() - start) / len(scratch)
+    start = time.perf_counter()
+    for i in range(len(scratch)):
+        scratch_closure(knowledge_base, stream[i + 1:])
+    scratch_retract = (time.perf_counter() - start) / len(scratch)
+    assert scratch_closure(knowledge_base, stream) == closure
+
+    print(f"rules {sum(map(len, knowledge_base.values()))}, network built in {build:.3f} s, "
+          f"{len(stream)} facts deriving {derived} symbols")
+    print(f"{'phase':>8} {'network facts/s':>16} {'scratch facts/s':>16} {'speedup':>8}")
+    for phase, seconds, baseline in (('insert', insert_time, scratch_insert), ('retract', retract_time, scratch_retract)):
+        rate = len(stream) / seconds
+        print(f"{phase:>8} {rate:>16.0f} {1 / baseline:>16.1f} {rate * baseline:>8.0f}")
+
+if __name__ == "__main__":
+    main()
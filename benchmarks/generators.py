@@ -0,0 +1,80 @@
+import random
+
+#scalable kb generators; each returns (tell sentences, ask queries) as strings in the input file syntax
+
+OPERATORS = ['&', '||', '=>', '<=>']
+SAT_THRESHOLD = {3: 4.26, 4: 9.93, 5: 21.12}  #clause/variable ratio at the k-sat phase transition
+
+def horn_chain(depth): #a => b1, b1 => b2, ... one long derivation
+    sentences = ["b0"] + [f"b{i} => b{i + 1}" for i in range(depth)]
+    return sentences, [f"b{depth}"]
+
+def horn_tree(depth, fan_in, seed=0): #every internal node needs all fan_in children, leaves are facts
+    rng = random.Random(seed)
+    sentences, level = [], [f"t{depth}_0"]
+    for d in range(depth, 0, -1):
+        children = []
+        for node in level:
+            kids = [f"t{d - 1}_{len(children) + i}" for i in range(fan_in)]
+            children.extend(kids)
+            sentences.append(f"{' & '.join(rng.sample(kids, fan_in))} => {node}")
+        level = children
+    sentences.extend(level)
+    return sentences, [f"t{depth}_0", f"t{depth - 1}_1"]
+
+def random_ksat(num_vars, k=3, ratio=None, seed=0): #uniform random k-sat, at the threshold by default
+    rng = random.Random(seed)
+    ratio = SAT_THRESHOLD.get(k, 2 ** k * 0.69) if ratio is None else ratio
+    sentences = []
+    for _ in range(int(num_vars * ratio)):
+        chosen = rng.sample(range(num_vars), k)
+        sentences.append(' || '.join(f"{'~' if rng.random() < 0.5 else ''}x{v}" for v in chosen))
+    return sentences, [f"x{rng.randrange(num_vars)}", f"x0 || ~x0"]
+
+def banded_ksat(num_vars, width=6, k=3, ratio=1.0, seed=0): #random k-sat inside a window sliding along the variables
+    rng = random.Random(seed)
+    sentences = []
+    for i in range(int(num_vars * ratio)):
+        start = min(i * num_vars // int(num_vars * ratio), num_vars - width)
+        chosen = rng.sample(range(start, start + width), k)
+        sentences.append(' || '.join(f"{'~' if rng.random() < 0.5 else ''}x{v}" for v in chosen))
+    return sentences, [f"x{num_vars // 2} || ~x{num_vars // 2 + 1} || x{num_vars // 2 + 2}", f"x0 || ~x0"]
+
+def nested_formula(rng, depth, num_symbols): #binary tree formula of exactly the given depth
+    if depth == 0:
+        symbol = f"p{rng.randrange(num_symbols)}"
+        return f"~{symbol}" if rng.random() < 0.2 else symbol
+    left = nested_formula(rng, depth - 1, num_symbols)
+    if rng.random() < 0.5:  #half the nodes get a symbol on one side, so depth grows faster than size
+        right = f"p{rng.randrange(num_symbols)}"
+    else:
+        right = nested_formula(rng, depth - 1, num_symbols)
+    return f"({left} {rng.choice(OPERATORS)} {right})"
+
+def nested_kb(num_sentences, depth, num_symbols, seed=0):
+    rng = random.Random(seed)
+    sentences = [nested_formula(rng, depth, num_symbols) for _ in range(num_sentences)]
+    return sentences, [nested_formula(rng, 3, num_symbols), f"p0 => p{num_symbols - 1}"]
+
+def biconditional_kb(num_symbols, seed=0): #equivalence chain with xor-like cross links, parity-hard for resolution
+    rng = random.Random(seed)
+    sentences = ["q0"]
+    for i in range(1, num_symbols):
+        sentences.append(f"q{i} <=> q{i - 1}")
+        j = rng.randrange(i)
+        sentences.append(f"(q{i} <=> ~r{i}) <=> q{j}")
+    return sentences, [f"q{num_symbols - 1}", f"r{num_symbols - 1}"]
+
+def independent_blocks(num_blocks, block_symbols, sentences_per_block=None, seed=0): #3-sat blocks, queries on block 0
+    rng = random.Random(seed)
+    sentences = []
+    for block in range(num_blocks):
+        for _ in range(sentences_per_block or block_symbols):
+            chosen = rng.sample(range(block_symbols), 3)
+            sentences.append(' || '.join(f"{'~' if rng.random() < 0.5 else ''}b{block}_{v}" for v in chosen))
+    return sentences, ["b0_0 || b0_1", "b0_0 => b0_2", "b0_1 || ~b0_1"]
+
+def write_kb(path, sentences, queries):
+    with open(path, 'w') as file:
+        file.write(f"TELL\n{'; '.join(sentences)}\nASK\n{'; '.join(queries)}\n")
+    return path
@@ -0,0 +1,83 @@
+import argparse
+import re
+import time
+
+from logic_operators import LogicParser
+from truth_table import truth_table_entails_all
+from dpll import KnowledgeBase, DPLLSolver, EntailmentChecker, add_formula
+from cdcl import CDCLSolver
+from cnf import TseitinEncoder
+from horn import HornEntailment
+from benchmarks.generators import horn_chain, horn_tree
+
+#entailment on horn kbs with and without the horn-sat fast path: the truth table against enumeration (or
+#model counting above 24 symbols), dpll and cdcl against their search. the renamed family negates every
+#symbol, so the kb is only horn after flipping all of them back
+def negated(family): #every symbol of a kb and its queries negated
+    sentences, queries = family
+    flip = lambda text: re.sub(r'\b(\w+)\b', r'~\1', text)
+    return [flip(sentence) for sentence in sentences], [flip(query) for query in queries]
+
+FAMILIES = {
+    'chain_20': lambda: horn_chain(20),
+    'tree_3x2': lambda: horn_tree(3, 2),
+    'renamed_tree_3x2': lambda: negated(horn_tree(3, 2)),
+    'chain_2000': lambda: horn_chain(2000),
+    'tree_9x2': lambda: horn_tree(9, 2),
+    'renamed_tree_9x2': lambda: negated(horn_tree(9, 2)),
+}
+SOLVERS = {'DPLL': DPLLSolver, 'CDCL': CDCLSolver}
+
+def best(repeats, run): #(best seconds, answers) of run over repeats calls
+    seconds = float('inf')
+    for _ in range(repeats):
+        start = time.perf_counter()
+        answers = run()
+        seconds = min(seconds, time.perf_counter() - start)
+    return seconds, answers
+
+def clause_kb(sentences):
+    kb = KnowledgeBase()
+    encoder = TseitinEncoder(kb)
+    for sentence in sentences:
+        add_formula(kb, encoder, sentence)
+    return kb
+
+def horn_answers(kb, queries):
+    horn = HornEntailment(kb, TseitinEncoder(kb))
+    return [horn.entails(query) for query in queries]
+
+def search_answers(kb, queries, solver_class):
+    checker = EntailmentChecker(kb, solver_class)
+    return [checker.entails(query) for query in queries]
+
+def main():
+    parser = argparse.ArgumentParser(description='Horn-SAT fast path vs truth table and DPLL search on horn kbs')
+    parser.add_argument('--families', nargs='+', default=list(FAMILIES))
+    parser.add_argument('--tt-limit', type=int, default=200, help='largest kb, in symbols, given to the truth table')
+    parser.add_argument('--repeats', type=int, default=5)
+    args = parser.parse_args()
+
+    print(f"{'family':>17} {'symbols':>8} {'method':>6} {'general (s)':>12} {'horn (s)':>10} {'speedup':>8}")
+    for family in args.families:
+        sentences, queries = FAMILIES[family]()
+        sentences = [LogicParser.parse_formula(sentence) for sentence in sentences]
+        queries = [LogicParser.parse_formula(query) for query in queries]
+        num_symbols = len(set().union(*(sentence.symbols() for sentence in sentences)))
+        rows = []
+        if num_symbols <= args.tt_limit:
+            general, slow = best(args.repeats, lambda: list(truth_table_entails_all(sentences, queries, horn=False)))
+            fast_time, fast = best(args.repeats, lambda: list(truth_table_entails_all(sentences, queries)))
+            assert fast == slow, (fast, slow)
+            rows.append(('TT', general, fast_time))
+        kb = clause_kb(sentences)
+        fast_time, fast = best(args.repeats, lambda: horn_answers(kb.copy(), queries))
+        for method, solver_class in SOLVERS.items():
+            general, slow = best(args.repeats, lambda: search_answers(kb.copy(), queries, solver_class))
+            assert fast == slow, (fast, slow)
+            rows.append((method, general, fast_time))
+        for method, general, fast_time in rows:
+            print(f"{family:>17} {num_symbols:>8} {method:>6} {general:>12.4f} {fast_time:>10.4f} {general / fast_time:>8.1f}")
+
+if __name__ == "__main__":
+    main()
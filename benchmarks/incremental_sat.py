@@ -0,0 +1,57 @@
+import argparse
+import random
+import time
+
+from dpll import DPLLSolver, IncrementalSolver
+from cdcl import CDCLSolver
+from benchmarks.cdcl_random import random_3sat
+
+#many entailment checks KB |= (a & b) against one random 3-sat kb: a fresh solver per query adds the
+#negated query as a clause and searches from scratch, the incremental solver adds it inside a push/pop
+#scope and keeps its level 0 units and learned clauses from one query to the next
+SOLVERS = {'DPLL': DPLLSolver, 'CDCL': CDCLSolver}
+
+def fresh(num_vars, clauses, queries, solver_class):
+    return [not solver_class(num_vars, clauses + [[-a, -b]]).solve() for a, b in queries]
+
+def incremental(num_vars, clauses, queries, solver_class):
+    solver = IncrementalSolver(num_vars, clauses, solver_class)
+    answers = []
+    for a, b in queries:
+        solver.push()
+        solver.add_clause((-a, -b))
+        answers.append(not solver.solve())
+        solver.pop()
+    return answers
+
+def main():
+    parser = argparse.ArgumentParser(description='Fresh solver per query vs one incremental solver')
+    parser.add_argument('--vars', type=int, nargs='+', default=[50, 100])
+    parser.add_argument('--ratio', type=float, default=4.2, help='clauses per variable, below the threshold')
+    parser.add_argument('--queries', type=int, default=100)
+    parser.add_argument('--methods', nargs='+', default=list(SOLVERS))
+    parser.add_argument('--dpll-limit', type=int, default=50, help='largest instance given to plain DPLL')
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    print(f"{'method':>6} {'vars':>6} {'queries':>8} {'entailed':>9} {'fresh (s)':>10} {'incremental (s)':>16} {'speedup':>8}")
+    for num_vars in args.vars:
+        clauses = random_3sat(num_vars, args.ratio, rng)
+        queries = [[rng.choice((1, -1)) * var for var in rng.sample(range(1, num_vars + 1), 2)]
+                   for _ in range(args.queries)]
+        for method in args.methods:
+            if method == 'DPLL' and num_vars > args.dpll_limit:
+                continue
+            start = time.perf_counter()
+            separate = fresh(num_vars, clauses, queries, SOLVERS[method])
+            fresh_time = time.perf_counter() - start
+            start = time.perf_counter()
+            shared = incremental(num_vars, clauses, queries, SOLVERS[method])
+            shared_time = time.perf_counter() - start
+            assert separate == shared
+            print(f"{method:>6} {num_vars:>6} {len(queries):>8} {sum(shared):>9} {fresh_time:>10.3f} "
+                  f"{shared_time:>16.3f} {fresh_time / shared_time:>8.1f}")
+
+if __name__ == "__main__":
+    main()
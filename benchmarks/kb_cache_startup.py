@@ -0,0 +1,52 @@
+import argparse
+import os
+import tempfile
+import time
+
+from kb_cache import KBCache
+from truth_table import parse_truth_table_file
+from forward_chaining import parse_chain_file
+from dpll import parse_knowledge_base
+from benchmarks.parse_throughput import tell_section
+from benchmarks.session_latency import horn_kb
+
+PARSERS = {
+    'TT': parse_truth_table_file,
+    'FC': lambda filename: parse_chain_file(filename, "FC"),
+    'BC': lambda filename: parse_chain_file(filename, "BC"),
+    'DPLL': parse_knowledge_base,
+}
+
+def timed(function, *args):
+    start = time.perf_counter()
+    function(*args)
+    return time.perf_counter() - start
+
+def main():
+    parser = argparse.ArgumentParser(description='KB load time without cache, with a cold cache and with a warm cache')
+    parser.add_argument('--megabytes', type=float, default=2, help='size of the generic kb (TT, DPLL)')
+    parser.add_argument('--horn-symbols', type=int, default=200000, help='size of the horn kb (FC, BC)')
+    parser.add_argument('--repeats', type=int, default=3)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as directory:
+        generic = os.path.join(directory, 'generic.txt')
+        with open(generic, 'w') as file:
+            file.write(f"TELL\n{tell_section(int(args.megabytes * 1e6), 6, 50)}\nASK\np0 => p1\n")
+        horn = os.path.join(directory, 'horn.txt')
+        with open(horn, 'w') as file:
+            file.write(f"TELL\n{'; '.join(horn_kb(args.horn_symbols))}\nASK\ns1\n")
+
+        print(f"{'method':>6} {'file MB':>8} {'parse (s)':>10} {'cold (s)':>9} {'warm (s)':>9} {'cache MB':>9} {'speedup':>8}")
+        for method, parse in PARSERS.items():
+            filename = horn if method in ('FC', 'BC') else generic
+            cache = KBCache(os.path.join(directory, f"cache_{method}"))
+            parse_time = min(timed(parse, filename) for _ in range(args.repeats))
+            cold = timed(cache.load, filename, method, parse)
+            warm = min(timed(cache.load, filename, method, parse) for _ in range(args.repeats))
+            cache_bytes = sum(entry.stat().st_size for entry in os.scandir(cache.directory))
+            print(f"{method:>6} {os.path.getsize(filename) / 1e6:>8.2f} {parse_time:>10.3f} {cold:>9.3f} "
+                  f"{warm:>9.3f} {cache_bytes / 1e6:>9.2f} {parse_time / warm:>8.1f}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,40 @@
+import argparse
+import time
+
+from logic_operators import LogicParser
+from model_count import count_entails_all
+from benchmarks.generators import horn_chain, horn_tree, banded_ksat, random_ksat, biconditional_kb
+
+#exact model counting on kbs with far more symbols than a truth table can enumerate (2^symbols rows);
+#the decisions, searched components and cache hits show how much the component split and the cache save
+FAMILIES = {
+    'horn_chain_1000': lambda: horn_chain(1000),
+    'horn_tree_d8_f2': lambda: horn_tree(8, 2),
+    'bicond_300': lambda: biconditional_kb(300),
+    'path_300': lambda: ([f"a{i} || a{i + 1}" for i in range(300)], ["a0 || a1", "a7"]),
+    'banded_300': lambda: banded_ksat(300),
+    'ksat3_n50_r3': lambda: random_ksat(50, 3, ratio=3.0),
+}
+
+def main():
+    parser = argparse.ArgumentParser(description='Exact model counting time on kbs too large to enumerate')
+    parser.add_argument('--families', nargs='+', choices=sorted(FAMILIES), help='only these families')
+    args = parser.parse_args()
+
+    print(f"{'family':>16} {'symbols':>7} {'time (s)':>9} {'decisions':>9} {'searched':>8} {'hits':>7}  answers")
+    for family in args.families or FAMILIES:
+        sentences, queries = FAMILIES[family]()
+        sentences = [LogicParser.parse_formula(sentence) for sentence in sentences]
+        queries = [LogicParser.parse_formula(query) for query in queries]
+        symbols = len(set().union(*(formula.symbols() for formula in sentences + queries)))
+        counters = {}
+        start = time.perf_counter()
+        answers = list(count_entails_all(sentences, queries, counters))
+        seconds = time.perf_counter() - start
+        shown = ', '.join('NO' if not entailed else f"YES {models}" if models < 10 ** 6 else
+                          f"YES ~2^{models.bit_length() - 1}" for entailed, models in answers)
+        print(f"{family:>16} {symbols:>7} {seconds:>9.3f} {counters['decisions']:>9} {counters['components']:>8} "
+              f"{counters['cache_hits']:>7}  {shown}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,48 @@
+import argparse
+import os
+import random
+import tempfile
+import time
+
+from execution import InferenceEngine
+from benchmarks.session_latency import horn_kb, ONE_SHOT
+
+def write_file(sentences, queries):
+    handle, path = tempfile.mkstemp(suffix='.txt')
+    with os.fdopen(handle, 'w') as file:
+        file.write(f"TELL\n{'; '.join(sentences)}\nASK\n" + '\n'.join(queries) + '\n')
+    return path
+
+def main():
+    parser = argparse.ArgumentParser(description='One pass over a multi-query ASK section vs one run per query')
+    parser.add_argument('--symbols', type=int, default=5000, help='kb size for FC, BC, DPLL and CDCL')
+    parser.add_argument('--tt-symbols', type=int, default=20, help='kb size for TT')
+    parser.add_argument('--queries', type=int, default=50)
+    parser.add_argument('--methods', nargs='+', default=list(ONE_SHOT))
+    args = parser.parse_args()
+
+    rng = random.Random(2)
+    print(f"{'method':>6} {'symbols':>8} {'queries':>8} {'per query (s)':>14} {'one pass (s)':>13} {'speedup':>8}")
+    for method in args.methods:
+        num_symbols = args.tt_symbols if method == 'TT' else args.symbols
+        sentences = horn_kb(num_symbols)
+        queries = [f"s{rng.randrange(num_symbols)}" for _ in range(args.queries)]
+        paths = [write_file(sentences, [query]) for query in queries]
+        batch_path = write_file(sentences, queries)
+        try:
+            start = time.perf_counter()
+            separate = [ONE_SHOT[method](InferenceEngine(), path)[0].is_valid for path in paths]
+            per_query = time.perf_counter() - start
+            start = time.perf_counter()
+            together = [result.is_valid for result in ONE_SHOT[method](InferenceEngine(), batch_path)]
+            one_pass = time.perf_counter() - start
+        finally:
+            for path in paths + [batch_path]:
+                os.remove(path)
+        if method in ('TT', 'DPLL', 'CDCL'):
+            assert separate == together  #fc and bc answers also list facts, which depend on earlier queries
+        print(f"{method:>6} {num_symbols:>8} {len(queries):>8} {per_query:>14.3f} {one_pass:>13.3f} "
+              f"{per_query / one_pass:>8.1f}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,51 @@
+import argparse
+import random
+import time
+
+from logic_operators import Formula, LogicParser
+
+OPERATORS = ['&', '||', '=>', '<=', '<=>']
+
+#random bracketed formula over a small vocabulary so identical subformulas recur
+def random_formula(rng, depth, num_symbols):
+    if depth == 0 or rng.random() < 0.3:
+        symbol = f"p{rng.randrange(num_symbols)}"
+        return f"~{symbol}" if rng.random() < 0.2 else symbol
+    left = random_formula(rng, depth - 1, num_symbols)
+    right = random_formula(rng, depth - 1, num_symbols)
+    return f"({left} {rng.choice(OPERATORS)} {right})"
+
+def tell_section(target_bytes, depth, num_symbols, seed=0):
+    rng = random.Random(seed)
+    sentences, size = [], 0
+    while size < target_bytes:
+        sentence = random_formula(rng, depth, num_symbols)
+        sentences.append(sentence)
+        size += len(sentence) + 2
+    return '; '.join(sentences)
+
+def main():
+    parser = argparse.ArgumentParser(description='Formula parser throughput on a large TELL section')
+    parser.add_argument('--megabytes', type=float, nargs='+', default=[1, 4])
+    parser.add_argument('--depth', type=int, default=6)
+    parser.add_argument('--symbols', type=int, default=50)
+    parser.add_argument('--nesting', type=int, default=100000, help='parenthesis depth of the nesting test')
+    args = parser.parse_args()
+
+    print(f"{'MB':>6} {'sentences':>10} {'time (s)':>10} {'MB/s':>8} {'shared nodes':>13}")
+    for megabytes in args.megabytes:
+        text = tell_section(int(megabytes * 1e6), args.depth, args.symbols)
+        start = time.perf_counter()
+        formulas = [LogicParser.parse_formula(part) for part in text.split(';')]
+        elapsed = time.perf_counter() - start
+        print(f"{megabytes:>6} {len(formulas):>10} {elapsed:>10.3f} {megabytes / elapsed:>8.2f} "
+              f"{len(Formula.interned):>13}")
+        del formulas
+
+    nested = '(' * args.nesting + 'a' + ' & b)' * args.nesting
+    start = time.perf_counter()
+    LogicParser.parse_formula(nested)
+    print(f"nesting depth {args.nesting}: {time.perf_counter() - start:.3f} s")
+
+if __name__ == "__main__":
+    main()
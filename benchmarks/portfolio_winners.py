@@ -0,0 +1,46 @@
+import argparse
+import glob
+import os
+import tempfile
+import time
+from collections import Counter
+
+from execution import InferenceEngine
+from benchmarks.session_latency import horn_kb
+
+#portfolio latency and winners vs every single method on the sample files and generated horn kbs
+def main():
+    parser = argparse.ArgumentParser(description='Portfolio winners and latency vs single methods')
+    parser.add_argument('files', nargs='*', default=sorted(glob.glob('*.txt')))
+    parser.add_argument('--horn-sizes', type=int, nargs='+', default=[100, 1000, 5000])
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as directory:
+        files = list(args.files)
+        for size in args.horn_sizes:
+            path = os.path.join(directory, f"horn_{size}.txt")
+            with open(path, 'w') as file:
+                file.write(f"TELL\n{'; '.join(horn_kb(size))}\nASK\ns{size - 1}\n")
+            files.append(path)
+
+        winners = Counter()
+        print(f"{'file':>22} {'winner':>7} {'portfolio (s)':>14} {'best single':>12} {'best (s)':>9}")
+        for filename in files:
+            engine = InferenceEngine()
+            start = time.perf_counter()
+            list(engine.process_portfolio(filename))
+            elapsed = time.perf_counter() - start
+            record = engine.portfolio_record
+            winners[record['winner']] += 1
+            timings = {}
+            for method in record['candidates']:
+                start = time.perf_counter()
+                list(InferenceEngine().process(filename, method))
+                timings[method] = time.perf_counter() - start
+            best = min(timings, key=timings.get)
+            print(f"{os.path.basename(filename):>22} {record['winner']:>7} {elapsed:>14.3f} {best:>12} "
+                  f"{timings[best]:>9.3f}")
+    print('wins: ' + ', '.join(f"{method} {count}" for method, count in winners.most_common()))
+
+if __name__ == "__main__":
+    main()
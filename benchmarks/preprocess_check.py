@@ -0,0 +1,66 @@
+import argparse
+import itertools
+import random
+
+from dpll import KnowledgeBase, dpll_satisfiable
+from cdcl import cdcl_satisfiable
+from preprocess import Preprocessor, STEPS
+
+#soundness check of the cnf preprocessing against brute force on small random clause sets, for random
+#subsets of the steps: satisfiability through dpll and cdcl must not change, and the model each returns
+#(completed by extend_model over eliminated and fixed variables) must satisfy the original clauses.
+#the simplified clauses must also agree with the original ones under any assumption on frozen variables,
+#which is what keeps query answers unchanged
+SOLVERS = {'DPLL': dpll_satisfiable, 'CDCL': cdcl_satisfiable}
+
+def satisfied(model, clauses): #model is a list indexed by variable
+    return all(any(model[abs(lit)] == (lit > 0) for lit in clause) for clause in clauses)
+
+def brute_force(num_vars, clauses, assumptions=()): #whether the clauses have a model where the assumptions hold
+    for values in itertools.product((False, True), repeat=num_vars):
+        model = (None,) + values
+        if all(model[abs(lit)] == (lit > 0) for lit in assumptions) and satisfied(model, clauses):
+            return True
+    return False
+
+def random_clauses(rng, num_vars):
+    return [[rng.choice((1, -1)) * rng.randint(1, num_vars) for _ in range(rng.randint(1, 4))]
+            for _ in range(rng.randint(0, 4 * num_vars))]
+
+def check(rng, max_vars): #one random instance, returns whether it is satisfiable
+    num_vars = rng.randint(1, max_vars)
+    clauses = random_clauses(rng, num_vars)
+    steps = tuple(step for step in STEPS if rng.random() < 0.7)
+    kb = KnowledgeBase()
+    for var in range(1, num_vars + 1):
+        kb.symbol_table.intern(f"v{var}")
+    for clause in clauses:
+        kb.add_clause(clause)
+    expected = brute_force(num_vars, clauses)
+    for method, satisfiable in SOLVERS.items():
+        assignment = satisfiable(kb, preprocess=steps)
+        assert (assignment is not None) == expected, (method, clauses, steps)
+        if assignment is not None:
+            model = [None] + [assignment[f"v{var}"] for var in range(1, num_vars + 1)]
+            assert satisfied(model, clauses), (method, clauses, steps, model)
+    frozen = set(rng.sample(range(1, num_vars + 1), rng.randint(0, num_vars)))
+    simplified = Preprocessor(num_vars, clauses, frozen, steps).run()
+    for _ in range(3):
+        assumptions = [var if rng.random() < 0.5 else -var for var in frozen if rng.random() < 0.6]
+        assert brute_force(num_vars, clauses, assumptions) == brute_force(num_vars, simplified, assumptions), \
+            (clauses, steps, frozen, assumptions, simplified)
+    return expected
+
+def main():
+    parser = argparse.ArgumentParser(description='Preprocessing soundness against brute force on random cnfs')
+    parser.add_argument('--instances', type=int, default=3000)
+    parser.add_argument('--max-vars', type=int, default=9)
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    satisfiable = sum(check(rng, args.max_vars) for _ in range(args.instances))
+    print(f"{args.instances} instances ({satisfiable} satisfiable) agree with brute force for steps {', '.join(STEPS)}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,55 @@
+import argparse
+import os
+import tempfile
+
+from execution import InferenceEngine
+from preprocess import STEPS
+from benchmarks.generators import horn_chain, horn_tree, random_ksat, nested_kb, biconditional_kb, write_kb
+
+#search time with and without cnf preprocessing on the generated benchmark families; times come from the
+#engine stats, so parsing is left out and the preprocessing time is shown on its own
+FAMILIES = {
+    'horn_chain': lambda: horn_chain(3000),
+    'horn_tree': lambda: horn_tree(10, 2),
+    'ksat3': lambda: random_ksat(120, 3),
+    'ksat4': lambda: random_ksat(50, 4),
+    'nested': lambda: nested_kb(60, 12, 40),
+    'bicond': lambda: biconditional_kb(1000),
+}
+
+def run(path, method, preprocess, repeats): #best (preprocess seconds, solve seconds, clauses left) over the repeats
+    best = None
+    for _ in range(repeats):
+        engine = InferenceEngine(stats=True, preprocess=preprocess)
+        results = list(engine.process(path, method))
+        assert not any(result.error_message for result in results), results
+        summary = engine.stats.summary()
+        steps = summary['preprocess'] or []
+        prep = summary['preprocess_seconds']
+        removed = sum(step['clauses_removed'] for step in steps)
+        sample = (prep, summary['solve_seconds'], summary['parse']['clauses'] - removed)
+        if best is None or sum(sample[:2]) < sum(best[:2]):
+            best = sample
+    return best
+
+def main():
+    parser = argparse.ArgumentParser(description='DPLL/CDCL search time with and without cnf preprocessing')
+    parser.add_argument('--methods', nargs='+', default=['DPLL', 'CDCL'])
+    parser.add_argument('--steps', default=','.join(STEPS), help='comma separated preprocessing steps')
+    parser.add_argument('--repeats', type=int, default=3)
+    args = parser.parse_args()
+    steps = tuple(step for step in args.steps.split(',') if step)
+
+    print(f"{'family':>11} {'method':>6} {'clauses':>8} {'after':>7} {'plain (s)':>10} {'prep (s)':>9} "
+          f"{'search (s)':>11} {'speedup':>8}")
+    with tempfile.TemporaryDirectory() as directory:
+        for family, generate in FAMILIES.items():
+            path = write_kb(os.path.join(directory, f"{family}.txt"), *generate())
+            for method in args.methods:
+                _, plain, clauses = run(path, method, None, args.repeats)
+                prep, search, after = run(path, method, steps, args.repeats)
+                print(f"{family:>11} {method:>6} {clauses:>8} {after:>7} {plain:>10.4f} {prep:>9.4f} "
+                      f"{search:>11.4f} {plain / (prep + search):>8.2f}")
+
+if __name__ == "__main__":
+    main()
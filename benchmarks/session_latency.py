@@ -0,0 +1,84 @@
+import argparse
+import os
+import random
+import statistics
+import tempfile
+import time
+
+from execution import InferenceEngine
+
+#random horn kb: a few facts, then each symbol implied by a conjunction of one or two earlier symbols
+def horn_kb(num_symbols, seed=0):
+    rng = random.Random(seed)
+    sentences = [f"s{i}" for i in range(min(5, num_symbols))]
+    for i in range(len(sentences), num_symbols):
+        premises = ' & '.join(f"s{rng.randrange(i)}" for _ in range(rng.randint(1, 2)))
+        sentences.append(f"{premises} => s{i}")
+    return sentences
+
+def write_kb(sentences, query):
+    handle, path = tempfile.mkstemp(suffix='.txt')
+    with os.fdopen(handle, 'w') as file:
+        file.write(f"TELL\n{'; '.join(sentences)}\nASK\n{query}\n")
+    return path
+
+ONE_SHOT = {
+    'TT': lambda engine, path: list(engine.process_truth_table(path)),
+    'FC': lambda engine, path: list(engine.process_forward_chaining(path)),
+    'BC': lambda engine, path: list(engine.process_backward_chaining(path)),
+    'DPLL': lambda engine, path: list(engine.process_dpll(path)),
+    'CDCL': lambda engine, path: list(engine.process_cdcl(path)),
+}
+
+def percentiles(samples):
+    samples = sorted(samples)
+    return statistics.median(samples), samples[int(0.99 * (len(samples) - 1))]
+
+def main():
+    parser = argparse.ArgumentParser(description='Per-query latency of a warm session vs re-running the file')
+    parser.add_argument('--symbols', type=int, default=2000, help='kb size for FC, BC, DPLL and CDCL')
+    parser.add_argument('--tt-symbols', type=int, default=14, help='kb size for TT')
+    parser.add_argument('--queries', type=int, default=500)
+    parser.add_argument('--warmup', type=int, default=50)
+    parser.add_argument('--one-shot-queries', type=int, default=20)
+    parser.add_argument('--methods', nargs='+', default=list(ONE_SHOT))
+    args = parser.parse_args()
+
+    rng = random.Random(1)
+    print(f"{'method':>6} {'symbols':>8} {'load (ms)':>10} {'one-shot p50 (ms)':>18} "
+          f"{'session p50 (ms)':>17} {'session p99 (ms)':>17} {'speedup':>8}")
+    for method in args.methods:
+        num_symbols = args.tt_symbols if method == 'TT' else args.symbols
+        sentences = horn_kb(num_symbols)
+        queries = [f"s{rng.randrange(num_symbols)}" for _ in range(args.queries + args.warmup)]
+        path = write_kb(sentences, queries[0])
+        try:
+            one_shot = []
+            for query in queries[:args.one_shot_queries]:
+                with open(path, 'w') as file:
+                    file.write(f"TELL\n{'; '.join(sentences)}\nASK\n{query}\n")
+                start = time.perf_counter()
+                ONE_SHOT[method](InferenceEngine(), path)
+                one_shot.append(time.perf_counter() - start)
+
+            engine = InferenceEngine()
+            start = time.perf_counter()
+            engine.load(path, method)
+            load = time.perf_counter() - start
+            for query in queries[:args.warmup]:
+                engine.ask(query)
+            latencies = []
+            for query in queries[args.warmup:]:
+                start = time.perf_counter()
+                engine.ask(query)
+                latencies.append(time.perf_counter() - start)
+        finally:
+            os.remove(path)
+
+        one_shot_p50, _ = percentiles(one_shot)
+        p50, p99 = percentiles(latencies)
+        print(f"{method:>6} {num_symbols:>8} {load * 1e3:>10.2f} {one_shot_p50 * 1e3:>18.3f} "
+              f"{p50 * 1e3:>17.3f} {p99 * 1e3:>17.3f} {one_shot_p50 / p50:>8.0f}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,54 @@
+import argparse
+import contextlib
+import os
+import tempfile
+
+from execution import InferenceEngine
+from benchmarks.generators import independent_blocks, horn_tree, write_kb
+
+#time of every method with and without query slicing on kbs where most symbols are unrelated to the
+#queries, parsing left out; the truth table rows show the table shrinking from 2^symbols rows to
+#2^(cone symbols) rows (above 24 symbols the unsliced table is counted instead of enumerated, no rows)
+FAMILIES = {
+    'blocks_4x6': (lambda: independent_blocks(4, 6), ['TT', 'DPLL', 'CDCL']),
+    'blocks_400x5': (lambda: independent_blocks(400, 5), ['TT', 'DPLL', 'CDCL']),
+    'ksat_6x20': (lambda: independent_blocks(6, 20, 70), ['DPLL', 'CDCL']),
+    'horn_forest': (lambda: horn_forest(40, 6, 2), ['FC', 'DPLL', 'CDCL']),
+}
+
+def horn_forest(num_trees, depth, fan_in): #independent horn trees, the queries ask about the first one
+    sentences = []
+    for tree in range(num_trees):
+        tree_sentences, queries = horn_tree(depth, fan_in, seed=tree)
+        sentences += [sentence.replace('t', f"f{tree}_") for sentence in tree_sentences]
+    return sentences, [query.replace('t', 'f0_') for query in queries]
+
+def run(path, method, slicing, repeats): #(best seconds after parsing, truth table rows or None)
+    best, rows = float('inf'), None
+    for _ in range(repeats):
+        engine = InferenceEngine(stats=True, slicing=slicing, fc_slicing=slicing)
+        with open(os.devnull, 'w') as sink, contextlib.redirect_stdout(sink):
+            results = list(engine.process(path, method))
+        assert not any(result.error_message for result in results), results
+        summary = engine.stats.summary()
+        best = min(best, summary['seconds'] - summary['parse']['seconds'])
+        rows = summary['totals'].get('rows')
+    return best, rows
+
+def main():
+    parser = argparse.ArgumentParser(description='Time of every method with and without query slicing')
+    parser.add_argument('--repeats', type=int, default=3)
+    args = parser.parse_args()
+
+    print(f"{'family':>13} {'method':>6} {'whole (s)':>10} {'sliced (s)':>10} {'speedup':>8} {'rows':>9} {'sliced rows':>11}")
+    with tempfile.TemporaryDirectory() as directory:
+        for family, (generate, methods) in FAMILIES.items():
+            path = write_kb(os.path.join(directory, f"{family}.txt"), *generate())
+            for method in methods:
+                whole, rows = run(path, method, False, args.repeats)
+                sliced, sliced_rows = run(path, method, True, args.repeats)
+                print(f"{family:>13} {method:>6} {whole:>10.4f} {sliced:>10.4f} {whole / sliced:>8.2f} "
+                      f"{rows if rows is not None else '-':>9} {sliced_rows if sliced_rows is not None else '-':>11}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,53 @@
+import argparse
+import os
+import tempfile
+import time
+import tracemalloc
+
+from logic_operators import read_statements
+from forward_chaining import parse_chain_file
+from benchmarks.session_latency import horn_kb
+
+#statement splitting the way the parsers used to do it: whole file, then lines, then ';'
+def split_statements(filename):
+    with open(filename, 'r') as file:
+        lines = file.read().split('\n')
+    for line in lines:
+        for statement in line.split(';'):
+            if statement.strip():
+                yield statement.strip()
+
+def count_statements(statements):
+    return sum(1 for _ in statements)
+
+def measure(function, *args): #(seconds, peak traced MB) of one call
+    tracemalloc.start()
+    start = time.perf_counter()
+    result = function(*args)
+    elapsed = time.perf_counter() - start
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    del result
+    return elapsed, peak / 1e6
+
+def main():
+    parser = argparse.ArgumentParser(description='Streaming statement reader vs read().split() on a large TELL line')
+    parser.add_argument('--symbols', type=int, nargs='+', default=[100000, 400000], help='horn kb sizes')
+    args = parser.parse_args()
+
+    print(f"{'file MB':>8} {'stage':>10} {'split (s)':>10} {'split MB':>9} {'stream (s)':>11} {'stream MB':>10}")
+    with tempfile.TemporaryDirectory() as directory:
+        for symbols in args.symbols:
+            path = os.path.join(directory, f"horn_{symbols}.txt")
+            with open(path, 'w') as file:
+                file.write(f"TELL\n{'; '.join(horn_kb(symbols))}\nASK\ns1\n")
+            size = os.path.getsize(path) / 1e6
+            split_time, split_peak = measure(lambda: count_statements(split_statements(path)))
+            stream_time, stream_peak = measure(lambda: count_statements(read_statements(path)))
+            print(f"{size:>8.1f} {'tokenize':>10} {split_time:>10.2f} {split_peak:>9.1f} "
+                  f"{stream_time:>11.2f} {stream_peak:>10.1f}")
+            parse_time, parse_peak = measure(parse_chain_file, path, "FC")
+            print(f"{size:>8.1f} {'FC parse':>10} {'':>10} {'':>9} {parse_time:>11.2f} {parse_peak:>10.1f}")
+
+if __name__ == "__main__":
+    main()
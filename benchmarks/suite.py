@@ -0,0 +1,190 @@
+import argparse
+import contextlib
+import json
+import os
+import math
+import platform
+import statistics
+import sys
+import tempfile
+import time
+import tracemalloc
+
+from execution import InferenceEngine
+from benchmarks.generators import horn_chain, horn_tree, random_ksat, nested_kb, biconditional_kb, write_kb
+
+#times every inference method on generated kbs and compares against benchmarks/baseline.json;
+#timings are scaled by a calibration loop so a baseline recorded on another machine still applies.
+#a calibration sample is taken before every timed sample and each entry is scaled by the median of its
+#own samples, so a burst of load on the machine shows up on both sides; timings are medians too, short
+#cases are run back to back until a sample lasts MIN_SAMPLE seconds, and SLACK is always allowed on top
+#of the tolerance
+#
+#  python -m benchmarks.suite                    compare, exit status 1 on any regression
+#  python -m benchmarks.suite --update-baseline  record the current numbers as the new baseline
+
+BASELINE = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'baseline.json')
+HORN = ['FC', 'BC', 'DPLL', 'CDCL']
+GENERIC = ['DPLL', 'CDCL']
+MIN_SAMPLE = 0.25  #seconds
+SLACK = 0.005  #seconds per run, far above the timer and scheduling noise of a MIN_SAMPLE sample
+
+#name -> (generator call, methods); truth tables only get the cases with few symbols
+CASES = {
+    'horn_chain_3000': (lambda: horn_chain(3000), HORN),
+    'horn_tree_d10_f2': (lambda: horn_tree(10, 2), HORN),
+    'horn_tree_d4_f6': (lambda: horn_tree(4, 6), HORN),
+    'ksat3_n16': (lambda: random_ksat(16, 3), ['TT'] + GENERIC),
+    'ksat3_n80': (lambda: random_ksat(80, 3), GENERIC),
+    'ksat4_n40': (lambda: random_ksat(40, 4), GENERIC),
+    'nested_d8_s14': (lambda: nested_kb(20, 8, 14), ['TT'] + GENERIC),
+    'nested_d12_s40': (lambda: nested_kb(60, 12, 40), GENERIC),
+    'bicond_10': (lambda: biconditional_kb(10), ['TT'] + GENERIC),
+    'bicond_1000': (lambda: biconditional_kb(1000), GENERIC),
+}
+
+def calibrate(): #seconds for one run of a fixed pure-python workload, the unit timings are scaled by
+    start = time.perf_counter()
+    table = {}
+    for i in range(200000):
+        table[i % 1000] = table.get(i % 1000, 0) + i
+    return time.perf_counter() - start
+
+def entailed(answer): #chaining methods answer "> YES: ..." or "NO", the others a bool
+    return answer.startswith('> YES') if isinstance(answer, str) else bool(answer)
+
+def run_method(path, method): #answers of one method on one file, engine output suppressed
+    with open(os.devnull, 'w') as sink, contextlib.redirect_stdout(sink):
+        results = list(InferenceEngine().process(path, method))
+    errors = [result.error_message for result in results if result.error_message]
+    if errors:
+        raise RuntimeError(f"{method} failed on {os.path.basename(path)}: {errors[0]}")
+    return [entailed(result.is_valid) for result in results]
+
+def time_runs(path, method, number): #(seconds per run over `number` runs in a row, answers)
+    start = time.perf_counter()
+    for _ in range(number):
+        answers = run_method(path, method)
+    return (time.perf_counter() - start) / number, answers
+
+#(median seconds per run, median calibration taken in between, peak traced MB, answers)
+def measure(path, method, repeats):
+    seconds, answers = time_runs(path, method, 1)  #warm-up, also sizes the samples
+    number = max(1, math.ceil(MIN_SAMPLE / max(seconds, 1e-6)))
+    samples, calibrations = [], []
+    for _ in range(repeats):
+        calibrations.append(calibrate())
+        samples.append(time_runs(path, method, number)[0])
+    tracemalloc.start()  #separate run, tracing slows everything down
+    run_method(path, method)
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return statistics.median(samples), statistics.median(calibrations), peak / 1e6, answers
+
+def run_suite(cases, methods, repeats, directory):
+    results = {}
+    for name, (generate, case_methods) in cases.items():
+        sentences, queries = generate()
+        path = write_kb(os.path.join(directory, f"{name}.txt"), sentences, queries)
+        statements = len(sentences) + len(queries)
+        for method in case_methods:
+            if methods and method not in methods:
+                continue
+            seconds, calibration, peak, answers = measure(path, method, repeats)
+            results[f"{name}/{method}"] = {
+                'seconds': round(seconds, 6),
+                'calibration': round(calibration, 6),
+                'statements_per_s': round(statements / seconds, 1),
+                'peak_mb': round(peak, 3),
+                'answers': answers,
+            }
+        answers = {tuple(results[f"{name}/{m}"]['answers']) for m in case_methods if f"{name}/{m}" in results}
+        if len(answers) > 1:
+            raise RuntimeError(f"methods disagree on {name}: " + ', '.join(
+                f"{m}={results[f'{name}/{m}']['answers']}" for m in case_methods if f"{name}/{m}" in results))
+    return results
+
+def entry_scale(current, previous, scale): #machine scale for one entry, from its own calibration samples
+    if 'calibration' in previous:
+        return current['calibration'] / previous['calibration']
+    return scale
+
+def compare(results, baseline, scale, tolerance): #list of (key, reason) for every regression
+    regressions = []
+    for key, current in results.items():
+        previous = baseline['results'].get(key)
+        if previous is None:
+            continue
+        scale = entry_scale(current, previous, scale)
+        if current['answers'] != previous['answers']:
+            regressions.append((key, f"answers changed from {previous['answers']} to {current['answers']}"))
+        allowed = max(previous['seconds'] * scale * (1 + tolerance), previous['seconds'] * scale + SLACK)
+        if current['seconds'] > allowed:
+            regressions.append((key, f"{current['seconds']:.4f}s vs baseline {previous['seconds'] * scale:.4f}s "
+                                     f"(x{current['seconds'] / (previous['seconds'] * scale):.2f})"))
+        allowed = previous['peak_mb'] * (1 + tolerance) + 1.0
+        if current['peak_mb'] > allowed:
+            regressions.append((key, f"peak {current['peak_mb']:.1f} MB vs baseline {previous['peak_mb']:.1f} MB"))
+    return regressions
+
+def main():
+    parser = argparse.ArgumentParser(description='Timing and memory of every method on generated kbs vs a stored baseline')
+    parser.add_argument('--baseline', default=BASELINE)
+    parser.add_argument('--update-baseline', action='store_true', help='overwrite the baseline with this run')
+    parser.add_argument('--tolerance', type=float, default=0.5, help='allowed slowdown / memory growth, 0.5 = 50%%')
+    parser.add_argument('--repeats', type=int, default=5, help='timed samples per case, the median counts')
+    parser.add_argument('--cases', nargs='+', choices=sorted(CASES), help='only these cases')
+    parser.add_argument('--methods', nargs='+', help='only these methods')
+    parser.add_argument('--output', help='also write this run as json')
+    args = parser.parse_args()
+
+    cases = {name: CASES[name] for name in args.cases} if args.cases else CASES
+    with tempfile.TemporaryDirectory() as directory:
+        results = run_suite(cases, args.methods, args.repeats, directory)
+    calibration = statistics.median([current['calibration'] for current in results.values()] or [calibrate()])
+    run = {'calibration': round(calibration, 6), 'python': platform.python_version(), 'results': results}
+
+    baseline = None
+    if not args.update_baseline and os.path.exists(args.baseline):
+        with open(args.baseline) as file:
+            baseline = json.load(file)
+    scale = calibration / baseline['calibration'] if baseline else 1.0
+
+    print(f"{'case':>18} {'method':>6} {'time (s)':>9} {'stmts/s':>10} {'peak MB':>8} {'vs base':>8}")
+    for key, current in results.items():
+        name, method = key.split('/')
+        previous = baseline['results'].get(key) if baseline else None
+        ratio = (f"{current['seconds'] / (previous['seconds'] * entry_scale(current, previous, scale)):.2f}"
+                 if previous else 'new')
+        print(f"{name:>18} {method:>6} {current['seconds']:>9.4f} {current['statements_per_s']:>10.0f} "
+              f"{current['peak_mb']:>8.1f} {ratio:>8}")
+
+    if args.output:
+        with open(args.output, 'w') as file:
+            json.dump(run, file, indent=1)
+    if args.update_baseline:
+        if args.cases or args.methods:  #keep the entries this run did not cover
+            with contextlib.suppress(OSError):
+                with open(args.baseline) as file:
+                    run['results'] = {**json.load(file)['results'], **results}
+        with open(args.baseline, 'w') as file:
+            json.dump(run, file, indent=1)
+        print(f"baseline written to {args.baseline}")
+        return
+    if baseline is None:
+        print(f"no baseline at {args.baseline}, run with --update-baseline to record one")
+        return
+
+    regressions = compare(results, baseline, scale, args.tolerance)
+    if regressions:
+        print('\n' + '!' * 72, file=sys.stderr)
+        print(f"PERFORMANCE REGRESSION: {len(regressions)} check(s) failed "
+              f"(tolerance {args.tolerance:.0%}, machine scale x{scale:.2f})", file=sys.stderr)
+        for key, reason in regressions:
+            print(f"  {key}: {reason}", file=sys.stderr)
+        print('!' * 72, file=sys.stderr)
+        sys.exit(1)
+    print(f"all {len(results)} timings within {args.tolerance:.0%} of the baseline (machine scale x{scale:.2f})")
+
+if __name__ == "__main__":
+    main()
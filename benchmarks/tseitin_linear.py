@@ -0,0 +1,57 @@
+import argparse
+import time
+
+from logic_operators import Formula, LogicalOperator
+from dpll import KnowledgeBase, dpll_satisfiable
+from cnf import TseitinEncoder
+from cdcl import cdcl_satisfiable
+
+#left-nested biconditional chain ((p0 <=> p1) <=> p2) ... <=> p(n-1), whose distributed cnf has 2^(n-1) clauses
+def biconditional_chain(n):
+    formula = Formula.symbol('p0')
+    for i in range(1, n):
+        formula = Formula.make(LogicalOperator.EQUIVALENCE, formula, Formula.symbol(f"p{i}"))
+    return formula
+
+#alternating & / || nesting of depth n, the shape that makes distribution blow up
+def alternating_nesting(n):
+    formula = Formula.symbol('q0')
+    for i in range(1, n):
+        op = LogicalOperator.AND if i % 2 else LogicalOperator.OR
+        inner = Formula.make(LogicalOperator.OR if i % 2 else LogicalOperator.AND,
+                             Formula.symbol(f"q{i}"), Formula.symbol(f"r{i}"))
+        formula = Formula.make(op, formula, inner)
+    return formula
+
+def encode(formula, polarity):
+    kb = KnowledgeBase()
+    start = time.perf_counter()
+    TseitinEncoder(kb, polarity=polarity).add_formula(formula)
+    return kb, time.perf_counter() - start
+
+def main():
+    parser = argparse.ArgumentParser(description='Clause count and time of the tseitin encoding on deep formulas')
+    parser.add_argument('--sizes', type=int, nargs='+', default=[100, 1000, 10000, 100000])
+    parser.add_argument('--solve-limit', type=int, default=10000, help='largest size that is also solved')
+    args = parser.parse_args()
+
+    print(f"{'formula':>14} {'n':>7} {'mode':>5} {'vars':>8} {'clauses':>8} {'clauses/n':>10} "
+          f"{'encode (s)':>11} {'dpll (s)':>9} {'cdcl (s)':>9}")
+    for name, build in (('biconditional', biconditional_chain), ('alternating', alternating_nesting)):
+        for n in args.sizes:
+            formula = build(n)
+            for polarity, mode in ((True, 'pg'), (False, 'full')):
+                kb, encode_time = encode(formula, polarity)
+                timings = []
+                for satisfiable in (dpll_satisfiable, cdcl_satisfiable):
+                    if n > args.solve_limit:
+                        timings.append('-')
+                        continue
+                    start = time.perf_counter()
+                    satisfiable(kb)
+                    timings.append(f"{time.perf_counter() - start:.3f}")
+                print(f"{name:>14} {n:>7} {mode:>5} {kb.num_vars:>8} {len(kb):>8} {len(kb) / n:>10.2f} "
+                      f"{encode_time:>11.3f} {timings[0]:>9} {timings[1]:>9}")
+
+if __name__ == "__main__":
+    main()
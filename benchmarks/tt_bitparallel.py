@@ -0,0 +1,64 @@
+import argparse
+import time
+from itertools import product
+
+from logic_operators import LogicParser, LogicalOperator
+from truth_table import truth_table_entails_all
+
+#one dict per row, the way the truth table was enumerated before the bit-parallel engine
+def row_by_row_entails(sentences, query):
+    def holds(node, row):
+        if node.op is None:
+            return row[node.name]
+        values = [holds(arg, row) for arg in node.args]
+        if node.op is LogicalOperator.NOT:
+            return not values[0]
+        if node.op is LogicalOperator.AND:
+            return all(values)
+        if node.op is LogicalOperator.OR:
+            return any(values)
+        if node.op is LogicalOperator.IMPLIES:
+            return not values[0] or values[1]
+        return values[0] == values[1]
+
+    symbols = sorted(set().union(query.symbols(), *(sentence.symbols() for sentence in sentences)))
+    rows = [dict(zip(symbols, values)) for values in product([True, False], repeat=len(symbols))]
+    models = 0
+    for row in rows:
+        if all(holds(sentence, row) for sentence in sentences):
+            if not holds(query, row):
+                return False, None
+            models += 1
+    return True, models
+
+#s0 => s1 => ... => s(n-1) with the query s0 => s(n-1), which forces a full enumeration
+def implication_chain(num_symbols):
+    text = '; '.join(f"s{i} => s{i + 1}" for i in range(num_symbols - 1))
+    sentences = [LogicParser.parse_formula(part) for part in text.split(';')]
+    return sentences, LogicParser.parse_formula(f"s0 => s{num_symbols - 1}")
+
+def main():
+    parser = argparse.ArgumentParser(description='Bit-parallel truth table benchmark')
+    parser.add_argument('--symbols', type=int, nargs='+', default=[12, 16, 20, 24, 28])
+    parser.add_argument('--row-limit', type=int, default=16, help='largest table enumerated row by row')
+    args = parser.parse_args()
+
+    print(f"{'symbols':>8} {'models':>8} {'bit-parallel (s)':>17} {'rows/s':>12} {'row-by-row (s)':>15}")
+    for num_symbols in args.symbols:
+        sentences, query = implication_chain(num_symbols)
+        counters = {}
+        start = time.perf_counter()
+        #horn=False since the chain is horn, enumerate_rows since the larger tables would go to the model counter
+        entailed, models = next(truth_table_entails_all(sentences, [query], counters=counters, horn=False,
+                                                        enumerate_rows=True))
+        elapsed = time.perf_counter() - start
+        row_column = 'skipped'
+        if num_symbols <= args.row_limit:
+            start = time.perf_counter()
+            assert row_by_row_entails(sentences, query) == (entailed, models)
+            row_column = f"{time.perf_counter() - start:.4f}"
+        rate = counters['rows'] / elapsed  #rows actually evaluated
+        print(f"{num_symbols:>8} {models:>8} {elapsed:>17.4f} {rate:>12.3g} {row_column:>15}")
+
+if __name__ == "__main__":
+    main()
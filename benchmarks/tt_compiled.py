@@ -0,0 +1,68 @@
+import argparse
+import glob
+import time
+
+from truth_table import parse_truth_table_file, flatten_formulas, compile_program, block_columns
+from benchmarks.tt_bitparallel import row_by_row_entails
+
+#step-by-step interpretation of a program, the evaluation the compiled functions replace
+def interpret_program(program, columns, full):
+    _, steps, kb_slots, query_slots = program
+    values = []
+    for kind, args in steps:
+        if kind == 'var':
+            value = columns[args]
+        elif kind == 'not':
+            value = full & ~values[args[0]]
+        elif kind == 'and':
+            value = full
+            for slot in args:
+                value &= values[slot]
+        elif kind == 'or':
+            value = 0
+            for slot in args:
+                value |= values[slot]
+        elif kind == 'implies':
+            value = (full & ~values[args[0]]) | values[args[1]]
+        else:
+            value = full & ~(values[args[0]] ^ values[args[1]])
+        values.append(value)
+    kb_rows = full
+    for slot in kb_slots:
+        kb_rows &= values[slot]
+    return kb_rows, tuple(values[slot] for slot in query_slots)
+
+def row_by_row_rate(sentences, query, num_symbols, repeats):
+    start = time.perf_counter()
+    for _ in range(repeats):
+        row_by_row_entails(sentences, query)
+    return repeats * (1 << num_symbols) / (time.perf_counter() - start)
+
+def rows_per_second(evaluate, program, repeats):
+    columns, full = block_columns(program[0])
+    start = time.perf_counter()
+    for _ in range(repeats):
+        evaluate(program, columns, full) if evaluate is interpret_program else evaluate(columns, full)
+    return repeats * (1 << program[0]) / (time.perf_counter() - start)
+
+def main():
+    parser = argparse.ArgumentParser(description='Compiled vs interpreted truth table programs')
+    parser.add_argument('files', nargs='*', default=sorted(glob.glob('generic*.txt') + glob.glob('test_genericKB*.txt')))
+    parser.add_argument('--repeats', type=int, default=20000)
+    args = parser.parse_args()
+
+    print(f"{'file':>22} {'symbols':>8} {'row dicts rows/s':>17} {'interpreted rows/s':>19} "
+          f"{'compiled rows/s':>16} {'speedup':>8}")  #speedup of compiled over row dicts
+    for filename in args.files:
+        sentences, queries = parse_truth_table_file(filename)
+        query = queries[-1]
+        num_symbols, steps, slots = flatten_formulas(sentences + [query])
+        program = (num_symbols, tuple(steps), tuple(slots[:-1]), (slots[-1],))
+        row_dicts = row_by_row_rate(sentences, query, num_symbols, max(args.repeats // 100, 1))
+        interpreted = rows_per_second(interpret_program, program, args.repeats)
+        compiled = rows_per_second(compile_program(program), program, args.repeats)
+        print(f"{filename:>22} {num_symbols:>8} {row_dicts:>17.3g} {interpreted:>19.3g} "
+              f"{compiled:>16.3g} {compiled / row_dicts:>8.0f}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,27 @@
+import argparse
+import os
+import time
+
+from truth_table import truth_table_entails
+from benchmarks.tt_bitparallel import implication_chain
+
+def main():
+    parser = argparse.ArgumentParser(description='Scaling of the multi-process truth table')
+    parser.add_argument('--symbols', type=int, default=28)
+    parser.add_argument('--workers', type=int, nargs='+', default=[1, 2, 4, 8])
+    args = parser.parse_args()
+
+    sentences, query = implication_chain(args.symbols)
+    print(f"{args.symbols} symbols, {os.cpu_count()} cpus available")
+    print(f"{'workers':>8} {'time (s)':>10} {'speedup':>8}")
+    baseline = None
+    for workers in args.workers:
+        start = time.perf_counter()
+        entailed, models = truth_table_entails(sentences, query, workers=workers, horn=False, enumerate_rows=True)
+        elapsed = time.perf_counter() - start
+        assert entailed and models == args.symbols + 1
+        baseline = baseline or elapsed
+        print(f"{workers:>8} {elapsed:>10.3f} {baseline / elapsed:>8.2f}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,317 @@
+from array import array  #flat int buffers for the clause database
+from dpll import DPLLSolver, dpll_satisfiable, process_dpll_file, parse_knowledge_base  #watched-literal engine the cdcl solver builds on
+
+#luby restart sequence 1, 1, 2, 1, 1, 2, 4, ... (index starts at 0)
+def luby(index):
+    size, exponent = 1, 0
+    while size < index + 1:
+        exponent += 1
+        size = 2 * size + 1
+    while size - 1 != index:
+        size = (size - 1) >> 1
+        exponent -= 1
+        index %= size
+    return 1 << exponent
+
+#binary max-heap of variables ordered by activity, with positions so entries can be updated in place
+class ActivityHeap:
+    def __init__(self, activity):
+        self.activity = activity
+        self.heap = []
+        self.positions = {}  #variable -> index in heap
+
+    def __contains__(self, var):
+        return var in self.positions
+
+    def __len__(self):
+        return len(self.heap)
+
+    def push(self, var):
+        if var in self.positions:
+            return
+        self.heap.append(var)
+        self.positions[var] = len(self.heap) - 1
+        self.sift_up(len(self.heap) - 1)
+
+    def pop(self):
+        heap = self.heap
+        top = heap[0]
+        last = heap.pop()
+        del self.positions[top]
+        if heap:
+            heap[0] = last
+            self.positions[last] = 0
+            self.sift_down(0)
+        return top
+
+    def increased(self, var): #restores heap order after the activity of var went up
+        if var in self.positions:
+            self.sift_up(self.positions[var])
+
+    def sift_up(self, index):
+        heap, positions, activity = self.heap, self.positions, self.activity
+        var = heap[index]
+        while index > 0:
+            parent = (index - 1) >> 1
+            if activity[heap[parent]] >= activity[var]:
+                break
+            heap[index] = heap[parent]
+            positions[heap[index]] = index
+            index = parent
+        heap[index] = var
+        positions[var] = index
+
+    def sift_down(self, index):
+        heap, positions, activity = self.heap, self.positions, self.activity
+        var = heap[index]
+        size = len(heap)
+        while True:
+            child = 2 * index + 1
+            if child >= size:
+                break
+            if child + 1 < size and activity[heap[child + 1]] > activity[heap[child]]:
+                child += 1
+            if activity[heap[child]] <= activity[var]:
+                break
+            heap[index] = heap[child]
+            positions[heap[index]] = index
+            index = child
+        heap[index] = var
+        positions[var] = index
+
+#conflict-driven clause learning on top of the dpll watched-literal engine: 1-uip learning with
+#non-chronological backjumping, vsids branching, phase saving, luby restarts and learned clause deletion
+class CDCLSolver(DPLLSolver):
+    def __init__(self, num_vars, clauses=(), restart_base=100, reduce_base=2000, reduce_step=300):
+        super().__init__(num_vars, clauses)
+        self.activity = [0.0] * (num_vars + 1)  #vsids score of each variable
+        self.var_inc = 1.0
+        self.var_decay = 0.95
+        self.phase = [False] * (num_vars + 1)  #last value of each variable, reused when branching
+        self.seen = [False] * (num_vars + 1)
+        self.order = ActivityHeap(self.activity)
+        for var in range(1, num_vars + 1):
+            self.order.push(var)
+        self.learned = []  #indices of learned clauses still in the database
+        self.lbd = {}  #learned clause index -> number of distinct decision levels when learned
+        self.clause_activity = {}  #learned clause index -> bump score
+        self.clause_inc = 1.0
+        self.clause_decay = 0.999
+        self.restart_base = restart_base
+        self.reduce_interval = reduce_base  #conflicts between learned clause reductions, grows each time
+        self.reduce_step = reduce_step
+        self.next_reduce = reduce_base
+        self.restarts = 0
+
+    def new_vars(self, count):
+        first = self.num_vars + 1
+        super().new_vars(count)
+        for _ in range(max(count, 0)):
+            self.activity.append(0.0)
+            self.phase.append(False)
+            self.seen.append(False)
+        for var in range(first, self.num_vars + 1):
+            self.order.push(var)
+
+    def cancel_until(self, level): #undoes assignments above level, saving phases and refilling the heap
+        if len(self.trail_lim) <= level:
+            return
+        values, phase, order = self.values, self.phase, self.order
+        start = self.trail_lim[level]
+        for lit in self.trail[start:]:
+            values[lit] = 0
+            values[-lit] = 0
+            var = abs(lit)
+            phase[var] = lit > 0
+            order.push(var)
+        del self.trail[start:]
+        del self.trail_lim[level:]
+        del self.flipped[level:]
+        self.qhead = start
+
+    def pick_branch_var(self): #unassigned variable with the highest activity
+        values, order = self.values, self.order
+        while len(order):
+            var = order.pop()
+            if values[var] == 0:
+                return var
+        return None
+
+    def bump_variable(self, var):
+        activity = self.activity
+        activity[var] += self.var_inc
+        if activity[var] > 1e100:
+            #rescale every score to keep floats in range
+            for other in range(1, self.num_vars + 1):
+                activity[other] *= 1e-100
+            self.var_inc *= 1e-100
+        self.order.increased(var)
+
+    def bump_clause(self, index):
+        scores = self.clause_activity
+        if index not in scores:
+            return  #original clauses are never deleted
+        scores[index] += self.clause_inc
+        if scores[index] > 1e20:
+            for other in scores:
+                scores[other] *= 1e-20
+            self.clause_inc *= 1e-20
+
+    def analyze(self, conflict): #derives the first-uip clause, returns it with the level to backjump to
+        clause_of, reasons, levels, seen, trail = self.clause, self.reasons, self.levels, self.seen, self.trail
+        current_level = len(self.trail_lim)
+        learnt = [0]  #slot 0 is filled with the asserting literal
+        pending = 0  #literals of the current level still to be resolved away
+        lit = 0
+        index = len(trail) - 1
+        clause = clause_of(conflict)
+        self.bump_clause(conflict)
+        while True:
+            for other in clause:
+                if other == lit:
+                    continue
+                var = abs(other)
+                if not seen[var] and levels[var] > 0:
+                    seen[var] = True
+                    self.bump_variable(var)
+                    if levels[var] >= current_level:
+                        pending += 1
+                    else:
+                        learnt.append(other)
+            #walk back to the most recent marked literal on the trail
+            while not seen[abs(trail[index])]:
+                index -= 1
+            lit = trail[index]
+            index -= 1
+            seen[abs(lit)] = False
+            pending -= 1
+            if pending == 0:
+                break
+            reason = reasons[abs(lit)]
+            clause = clause_of(reason)
+            self.bump_clause(reason)
+        learnt[0] = -lit
+
+        #drop literals whose reason is already covered by the rest of the clause
+        kept = [learnt[0]]
+        for other in learnt[1:]:
+            reason = reasons[abs(other)]
+            if reason is None or any(not seen[abs(x)] and levels[abs(x)] > 0
+                                     for x in clause_of(reason) if x != -other):
+                kept.append(other)
+        for other in learnt[1:]:
+            seen[abs(other)] = False
+        learnt = kept
+
+        if len(learnt) == 1:
+            return learnt, 0
+        #the literal with the highest level becomes the second watch
+        best = max(range(1, len(learnt)), key=lambda i: levels[abs(learnt[i])])
+        learnt[1], learnt[best] = learnt[best], learnt[1]
+        return learnt, levels[abs(learnt[1])]
+
+    def learn(self, learnt): #adds a learned clause after backjumping and asserts its first literal
+        if len(learnt) == 1:
+            self.assign(learnt[0])
+            return
+        index = len(self.offsets) - 1
+        self.lits.extend(learnt)
+        self.offsets.append(len(self.lits))
+        self.watches[learnt[0]].append(index)
+        self.watches[learnt[1]].append(index)
+        self.learned.append(index)
+        self.lbd[index] = len({self.levels[abs(lit)] for lit in learnt})
+        self.clause_activity[index] = self.clause_inc
+        self.assign(learnt[0], index)
+
+    def reduce_learned(self): #deletes the less useful half of the learned clauses and compacts the database
+        lits, offsets, reasons, values = self.lits, self.offsets, self.reasons, self.values
+
+        def locked(index):
+            first = lits[offsets[index]]
+            return values[first] == 1 and reasons[abs(first)] == index
+
+        candidates = [index for index in self.learned if self.lbd[index] > 2 and not locked(index)]
+        candidates.sort(key=lambda index: (-self.lbd[index], self.clause_activity[index]))
+        doomed = set(candidates[:len(candidates) // 2])
+        if not doomed:
+            return
+
+        #copy the surviving clauses into fresh arrays and renumber every reference to them
+        new_lits = array('i')
+        new_offsets = array('q', [0])
+        renumber = {}
+        for index in range(len(offsets) - 1):
+            if index not in doomed:
+                renumber[index] = len(new_offsets) - 1
+                new_lits.extend(lits[offsets[index]:offsets[index + 1]])
+                new_offsets.append(len(new_lits))
+        self.lits, self.offsets = new_lits, new_offsets
+        for lit in self.trail:
+            reason = reasons[abs(lit)]
+            if reason is not None:
+                reasons[abs(lit)] = renumber[reason]
+        self.learned = [renumber[index] for index in self.learned if index not in doomed]
+        self.lbd = {renumber[index]: lbd for index, lbd in self.lbd.items() if index not in doomed}
+        self.clause_activity = {renumber[index]: score for index, score in self.clause_activity.items()
+                                if index not in doomed}
+        for watchers in self.watches:
+            watchers.clear()
+        for index in range(len(new_offsets) - 1):
+            start = new_offsets[index]
+            self.watches[new_lits[start]].append(index)
+            self.watches[new_lits[start + 1]].append(index)
+
+    def solve(self, assumptions=()): #cdcl search, returns True when the clauses are satisfiable under the assumptions
+        self.cancel_until(0)
+        self.failed = []
+        if not self.ok:
+            return False
+        conflict_limit = self.restart_base * luby(self.restarts)
+        conflicts_since_restart = 0
+        while True:
+            conflict = self.propagate()
+            if conflict is not None:
+                self.conflicts += 1
+                conflicts_since_restart += 1
+                if not self.trail_lim:
+                    self.ok = False
+                    return False
+                learnt, level = self.analyze(conflict)
+                self.cancel_until(level)
+                self.backtracks += 1
+                self.learn(learnt)
+                self.var_inc /= self.var_decay
+                self.clause_inc /= self.clause_decay
+                continue
+
+            if conflicts_since_restart >= conflict_limit:
+                self.restarts += 1
+                conflict_limit = self.restart_base * luby(self.restarts)
+                conflicts_since_restart = 0
+                self.cancel_until(0)
+            if self.conflicts >= self.next_reduce:
+                self.reduce_interval += self.reduce_step
+                self.next_reduce = self.conflicts + self.reduce_interval
+                self.reduce_learned()
+
+            if len(self.trail_lim) < len(assumptions):
+                if not self.assume(assumptions):
+                    return False
+                continue
+            var = self.pick_branch_var()
+            if var is None:
+                return True
+            self.decide(var if self.phase[var] else -var)
+
+    def stats(self):
+        counters = super().stats()
+        counters.update(restarts=self.restarts, learned=len(self.learned))
+        return counters
+
+def cdcl_satisfiable(kb, assignment=None, preprocess=None): #checks satisfiability of the knowledge base with the cdcl solver
+    return dpll_satisfiable(kb, assignment, solver_class=CDCLSolver, preprocess=preprocess)
+
+def process_cdcl_file(filename, parse=parse_knowledge_base, stats=None, preprocess=None, slicing=False): #processes file using the cdcl solver to check entailment
+    return process_dpll_file(filename, solver_class=CDCLSolver, parse=parse, stats=stats, preprocess=preprocess,
+                             slicing=slicing, method="CDCL")
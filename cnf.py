@@ -0,0 +1,90 @@
+from logic_operators import LogicalOperator  #operator of each formula node
+
+#tseitin transformation of formula nodes into an equisatisfiable clause set, written into a
+#KnowledgeBase. every compound subformula gets one auxiliary variable, shared through hash-consing,
+#so the output stays linear in the size of the formula dag. with polarity=True only the direction of
+#each definition that the node's polarity needs is emitted (plaisted-greenbaum); polarity=False emits
+#full equivalences, which also keeps the number of models unchanged
+class TseitinEncoder:
+    def __init__(self, kb, polarity=True):
+        self.kb = kb
+        self.polarity = polarity
+        self.definitions = {}  #compound node -> auxiliary variable
+        self.emitted = set()  #(node, polarity) pairs whose definition clauses are already in the kb
+
+    def literal(self, node): #signed literal standing for a node
+        sign = 1
+        while node.op is LogicalOperator.NOT:
+            node = node.args[0]
+            sign = -sign
+        if node.op is None:
+            return sign * self.kb.symbol_table.intern(node.name)
+        var = self.definitions.get(node)
+        if var is None:
+            var = self.definitions[node] = self.kb.symbol_table.fresh()
+        return sign * var
+
+    def add_formula(self, formula): #asserts a formula
+        pending = []  #(node, polarity) definitions still to emit
+        for sentence in formula.conjuncts():
+            if sentence.op is LogicalOperator.OR:
+                #a top-level disjunction becomes one clause over its arguments
+                self.kb.add_clause([self.literal(arg) for arg in sentence.args])
+                pending.extend((arg, 1) for arg in sentence.args)
+            elif sentence.op is LogicalOperator.IMPLIES:
+                premise, conclusion = sentence.args
+                self.kb.add_clause((-self.literal(premise), self.literal(conclusion)))
+                pending.extend(((premise, -1), (conclusion, 1)))
+            else:
+                self.kb.add_clause((self.literal(sentence),))
+                pending.append((sentence, 1))
+        self.define(pending)
+
+    def define(self, pending): #emits the definition clauses of every node reachable from pending
+        add_clause, literal = self.kb.add_clause, self.literal
+        while pending:
+            node, polarity = pending.pop()
+            while node.op is LogicalOperator.NOT:
+                node = node.args[0]
+                polarity = -polarity
+            if node.op is None:
+                continue
+            polarities = (polarity,) if self.polarity else (1, -1)
+            for polarity in polarities:
+                if (node, polarity) in self.emitted:
+                    continue
+                self.emitted.add((node, polarity))
+                x = literal(node)
+                args = [literal(arg) for arg in node.args]
+                op = node.op
+                if op is LogicalOperator.AND:
+                    if polarity > 0:
+                        for arg in args:
+                            add_clause((-x, arg))
+                    else:
+                        add_clause([x] + [-arg for arg in args])
+                    pending.extend((arg, polarity) for arg in node.args)
+                elif op is LogicalOperator.OR:
+                    if polarity > 0:
+                        add_clause([-x] + args)
+                    else:
+                        for arg in args:
+                            add_clause((x, -arg))
+                    pending.extend((arg, polarity) for arg in node.args)
+                elif op is LogicalOperator.IMPLIES:
+                    a, b = args
+                    if polarity > 0:
+                        add_clause((-x, -a, b))
+                    else:
+                        add_clause((x, a))
+                        add_clause((x, -b))
+                    pending.extend(((node.args[0], -polarity), (node.args[1], polarity)))
+                else:
+                    a, b = args
+                    if polarity > 0:
+                        add_clause((-x, -a, b))
+                        add_clause((-x, a, -b))
+                    else:
+                        add_clause((x, a, b))
+                        add_clause((x, -a, -b))
+                    pending.extend((arg, sign) for arg in node.args for sign in (1, -1))
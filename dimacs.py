@@ -0,0 +1,177 @@
+import bz2
+import gzip
+import json
+import lzma
+import os
+import re
+from itertools import compress
+
+from logic_operators import LogicParser, read_chunks
+from dpll import KnowledgeBase, DPLLSolver, process_dpll_file, kb_counts
+from preprocess import preprocess_kb
+
+#dimacs cnf: "p cnf <variables> <clauses>", then clauses as signed variable numbers each ended by 0; lines
+#starting with c are comments. two comment forms carry what the TELL/ASK format has on top of the clauses:
+#  c var <n> <name>    symbol name of variable n (variables without one are named by their number)
+#  c ask <sentence>    a query, in the TELL/ASK sentence syntax
+#a file without queries asks whether the clauses are satisfiable
+
+DIMACS_CHUNK = 4 << 20
+COMPRESSED = {'.gz': gzip.open, '.bz2': bz2.open, '.xz': lzma.open, '.lzma': lzma.open}
+DIMACS_SUFFIXES = ('.cnf', '.dimacs')
+SEPARATORS = bytes.maketrans(b' \t\r\n\f\v', b',,,,,,')
+
+def open_input(filename): #binary file object, decompressing by extension
+    opener = COMPRESSED.get(os.path.splitext(str(filename))[1].lower())
+    return opener(filename, 'rb') if opener else open(filename, 'rb')
+
+def input_chunks(filename, chunk_size): #the (decompressed) bytes of a file in chunks, memory-mapped when plain
+    with open_input(filename) as file:
+        if os.path.splitext(str(filename))[1].lower() in COMPRESSED:
+            yield from iter(lambda: file.read(chunk_size), b'')
+        else:
+            yield from read_chunks(file, chunk_size)
+
+def is_dimacs(filename): #by extension, otherwise by the first non-blank line: a comment or the problem line
+    name = str(filename).lower()
+    for suffix in COMPRESSED:
+        if name.endswith(suffix):
+            name = name[:-len(suffix)]
+    if name.endswith(DIMACS_SUFFIXES):
+        return True
+    try:
+        with open_input(filename) as file:
+            head = file.read(4096)
+    except (OSError, EOFError, lzma.LZMAError):
+        return False
+    for line in head.splitlines():
+        line = line.strip()
+        if line:
+            return line.startswith(b'p cnf') or line == b'c' or line.startswith((b'c ', b'c\t'))
+    return False
+
+def parse_literals(text): #signed ints of a run of whitespace separated numbers, through the C json parser
+    text = text.translate(SEPARATORS)
+    if b',,' in text:
+        text = re.sub(rb',,+', b',', text)
+    text = text.strip(b',')
+    if not text:
+        return []
+    try:
+        return json.loads(b'[' + text + b']')
+    except ValueError:
+        raise ValueError("Invalid clause data in DIMACS file") from None
+
+def read_dimacs(filename, chunk_size=DIMACS_CHUNK): #(kb, queries) of a dimacs file, clauses loaded straight into the csr arrays
+    kb = KnowledgeBase()
+    literals, offsets = kb.literals, kb.offsets
+    declared = 0
+    names = {}  #variable -> name from "c var" lines
+    asks = []
+    carry = b''  #a partial last line, completed by the next chunk
+    largest = 0  #largest variable seen in a clause
+
+    def add_numbers(text):
+        nonlocal largest
+        numbers = parse_literals(text)
+        if not numbers:
+            return
+        largest = max(largest, max(numbers), -min(numbers))
+        base = len(literals)
+        #clause ends are the zeros; the clause offset is the zero position minus the zeros before it
+        ends = list(compress(range(len(numbers)), map((0).__eq__, numbers)))
+        offsets.extend(map(int.__sub__, ends, range(-base, len(ends) - base)))
+        literals.extend(filter(None, numbers))
+
+    finished = False  #set by the satlib end marker '%', after which a file only holds padding
+    for chunk in input_chunks(filename, chunk_size):
+        chunk = carry + chunk
+        cut = chunk.rfind(b'\n') + 1
+        chunk, carry = chunk[:cut], chunk[cut:]
+        if b'c' not in chunk and b'p' not in chunk and b'%' not in chunk:
+            add_numbers(chunk)  #the common case: nothing but clauses
+            continue
+        clause_lines = []
+        for line in chunk.split(b'\n'):
+            stripped = line.strip()
+            if stripped[:1] not in (b'c', b'p', b'%'):
+                clause_lines.append(line)
+                continue
+            add_numbers(b'\n'.join(clause_lines))
+            clause_lines = []
+            if stripped.startswith(b'%'):
+                finished = True
+                break
+            text = stripped.decode('utf-8')
+            fields = text.split(None, 3)
+            if fields[0] == 'p':
+                if len(fields) < 4 or fields[1] != 'cnf':
+                    raise ValueError(f"Invalid DIMACS problem line: {text!r}")
+                declared = int(fields[2])
+            elif fields[0] == 'c' and len(fields) >= 4 and fields[1] == 'var':
+                names[int(fields[2])] = fields[3]
+            elif fields[0] == 'c' and len(fields) >= 3 and fields[1] == 'ask':
+                asks.append(text.split(None, 2)[2])
+        if finished:
+            break
+        add_numbers(b'\n'.join(clause_lines))
+    if carry.strip() and not finished:
+        add_numbers(carry)
+    if offsets[-1] != len(literals):
+        raise ValueError("DIMACS file ends inside a clause (missing 0)")
+
+    num_vars = max(declared, largest)
+    symbol_table = kb.symbol_table
+    symbol_table.names = [None] + list(map(str, range(1, num_vars + 1)))
+    for var, name in names.items():
+        if 0 < var <= num_vars:
+            symbol_table.names[var] = name
+    symbol_table.index = dict(zip(symbol_table.names[1:], range(1, num_vars + 1)))
+    if len(symbol_table.index) < num_vars:  #a "c var" name equal to the number of another variable
+        taken = set(names.values())
+        for var in range(1, num_vars + 1):
+            if var not in names and symbol_table.names[var] in taken:
+                symbol_table.names[var] = f"<var {var}>"
+        symbol_table.index = dict(zip(symbol_table.names[1:], range(1, num_vars + 1)))
+    return kb, [LogicParser.parse_formula(sentence) for sentence in asks]
+
+def write_dimacs(kb, filename, queries=()): #dumps the clause database (and queries as "c ask" lines) as dimacs
+    literals, offsets = kb.literals, kb.offsets
+    names = kb.symbol_table.names
+    with open(filename, 'w') as file:
+        for var in range(1, kb.num_vars + 1):
+            if names[var] != str(var):
+                file.write(f"c var {var} {names[var]}\n")
+        for query in queries:
+            file.write(f"c ask {query}\n")
+        file.write(f"p cnf {kb.num_vars} {len(kb)}\n")
+        for start in range(0, len(kb), 4096):
+            stop = min(start + 4096, len(kb))
+            file.write(''.join(' '.join(map(str, literals[offsets[i]:offsets[i + 1]])) + ' 0\n'
+                               for i in range(start, stop)))
+
+#answers the "c ask" queries of a dimacs file like process_dpll_file, or yields one satisfiability
+#verdict in the sat competition format when there are none
+def process_dimacs_file(filename, solver_class=DPLLSolver, parse=read_dimacs, stats=None, preprocess=None,
+                        slicing=False):
+    try:
+        kb, queries = parse(filename)
+    except Exception as e:
+        raise Exception(f"Error processing DIMACS file: {str(e)}")
+    if queries:
+        yield from process_dpll_file(filename, solver_class, lambda name: (kb, queries), stats, preprocess, slicing)
+        return
+    try:
+        if stats is not None:
+            stats.parsed(**kb_counts(kb))
+        if preprocess is not None:
+            preprocessor = preprocess_kb(kb, steps=preprocess)
+            if stats is not None:
+                stats.preprocessed(preprocessor.report)
+        solver = solver_class(kb.num_vars, kb.clauses)
+        satisfiable = solver.solve()
+        if stats is not None:
+            stats.answered(solver.stats())
+        yield "s SATISFIABLE" if satisfiable else "s UNSATISFIABLE"
+    except Exception as e:
+        raise Exception(f"Error processing DIMACS file: {str(e)}")
@@ -1,204 +1,569 @@
-from logic_operators import LogicParser, LogicalOperator  #import logical parsing utilities and operator enumeration
-
-#represents a literal (atomic statement) in logical expressions
-class Literal: #initialize a literal with a name and negation status
-    def __init__(self, name, negated=False):
-        self.name = name
-        self.negated = negated
-
-    def __str__(self): #string representation of literal
-        return f"{'~' if self.negated else ''}{self.name}"
-
-    def __eq__(self, other): #equality check for literals based on name and negation
-        if not isinstance(other, Literal):
-            return False
-        return self.name == other.name and self.negated == other.negated
-
-    def __hash__(self): #hash function to allow literals to be used in sets
-        return hash((self.name, self.negated))
-
-    def negate(self): #returns the negation of the current literal
-        return Literal(self.name, not self.negated)
-
-#represents a disjunction of literals
-class Clause:
-    def __init__(self, literals): #initialize a clause containing a set of literals
-        self.literals = set(literals)
-
-    def __str__(self): #string representation of the clause
-        return " ∨ ".join(str(lit) for lit in self.literals)
-
-    def evaluate(self, assignment): #evalautes the clause based on given asssignment
-        if not all(lit.name in assignment for lit in self.literals):
-            return None  #undecided if some literals are unassigned
-        return any(
-            (not lit.negated and assignment[lit.name]) or
-            (lit.negated and not assignment[lit.name])
-            for lit in self.literals
-        )
-
-#represents a knowledge base composed of multiple clauses
-class KnowledgeBase: #initialize an empty knowledge base with clauses and symbols
+from array import array  #flat int buffers for the clause database
+from logic_operators import LogicParser, LogicalOperator, read_statements  #import logical parsing utilities and operator enumeration
+from cnf import TseitinEncoder  #clause encoding of sentences that are not already clausal
+from preprocess import preprocess_kb  #clause database simplification before search
+from slicing import clause_cone  #clause components the queries touch
+from horn import HornEntailment  #linear-time answers while the clauses stay (renamable) horn
+
+#interns symbol names as ints 1..n so literals can be stored as signed ints (v true, -v false)
+class SymbolTable:
     def __init__(self):
-        self.clauses = []  #list of clauses
-        self.symbols = set()  #set of unique symbols in the clauses
-
-    def add_clause(self, clause: Clause): #adds a clause to the knowledge base and updates the symbol set
-        self.clauses.append(clause)
-        for literal in clause.literals:
-            self.symbols.add(literal.name)
-
-def parse_knowledge_base(filename): #parses a file to construct a knowledge base and a query statement
+        self.names = [None]  #variable -> symbol name, slot 0 unused
+        self.index = {}  #symbol name -> variable
+
+    def __len__(self):
+        return len(self.names) - 1
+
+    def __contains__(self, name):
+        return name in self.index
+
+    def intern(self, name): #variable for name, allocated on first use
+        var = self.index.get(name)
+        if var is None:
+            var = self.index[name] = len(self.names)
+            self.names.append(name)
+        return var
+
+    def name(self, var):
+        return self.names[var]
+
+    def fresh(self): #new auxiliary variable, named so it cannot clash with a parsed symbol
+        var = len(self.names)
+        name = f"<aux {var}>"
+        self.index[name] = var
+        self.names.append(name)
+        return var
+
+    def literal(self, term): #signed literal for a term such as 'a' or '~a'
+        term = term.strip()
+        if term.startswith('~'):
+            return -self.intern(term[1:].strip())
+        return self.intern(term)
+
+    def term(self, lit): #inverse of literal
+        return f"~{self.names[-lit]}" if lit < 0 else self.names[lit]
+
+#represents a knowledge base as a csr clause database: the literals of every clause stored
+#back to back in one int array, clause i spanning literals[offsets[i]:offsets[i + 1]]
+class KnowledgeBase:
+    def __init__(self, symbol_table=None):
+        self.symbol_table = symbol_table if symbol_table is not None else SymbolTable()
+        self.literals = array('i')
+        self.offsets = array('q', [0])
+
+    def __len__(self): #number of clauses
+        return len(self.offsets) - 1
+
+    @property
+    def num_vars(self):
+        return len(self.symbol_table)
+
+    @property
+    def symbols(self): #names of every interned symbol
+        return set(self.symbol_table.names[1:])
+
+    @property
+    def clauses(self): #each clause as an int array slice
+        literals, offsets = self.literals, self.offsets
+        for i in range(len(offsets) - 1):
+            yield literals[offsets[i]:offsets[i + 1]]
+
+    def clause(self, i):
+        return self.literals[self.offsets[i]:self.offsets[i + 1]]
+
+    def literal(self, term): #signed literal for a term, interning its symbol
+        return self.symbol_table.literal(term)
+
+    def add_clause(self, literals): #appends a clause given as signed int literals
+        self.literals.extend(literals)
+        self.offsets.append(len(self.literals))
+
+    def copy(self): #independent clause database sharing the symbol numbering
+        kb = KnowledgeBase()
+        kb.symbol_table.names = list(self.symbol_table.names)
+        kb.symbol_table.index = dict(self.symbol_table.index)
+        kb.literals = array('i', self.literals)
+        kb.offsets = array('q', self.offsets)
+        return kb
+
+#clauses of a formula that is already clausal up to negation pushing (literals, disjunctions of
+#literals, conjunctive implications, literal equivalences and conjunctions of these), as lists of
+#signed literals; None when the formula would need distribution to reach cnf
+def formula_clauses(formula, literal, positive=True):
+    op = formula.op
+    if op is None:
+        var = literal(formula.name)
+        return [[var if positive else -var]]
+    if op is LogicalOperator.NOT:
+        return formula_clauses(formula.args[0], literal, not positive)
+    if op is LogicalOperator.IMPLIES:
+        premise, conclusion = formula.args
+        if positive:
+            parts = [(premise, False), (conclusion, True)]  #~premise || conclusion
+        else:
+            return combine_conjunction([(premise, True), (conclusion, False)], literal)
+        return combine_disjunction(parts, literal)
+    if op is LogicalOperator.EQUIVALENCE:
+        left, right = formula.args
+        if positive:
+            halves = [[(left, False), (right, True)], [(left, True), (right, False)]]
+        else:
+            halves = [[(left, True), (right, True)], [(left, False), (right, False)]]
+        clauses = []
+        for half in halves:
+            part = combine_disjunction(half, literal)
+            if part is None:
+                return None
+            clauses.extend(part)
+        return clauses
+    if (op is LogicalOperator.AND) == positive:
+        return combine_conjunction([(arg, positive) for arg in formula.args], literal)
+    return combine_disjunction([(arg, positive) for arg in formula.args], literal)
+
+def combine_conjunction(parts, literal): #clauses of every part together
+    clauses = []
+    for part, positive in parts:
+        part_clauses = formula_clauses(part, literal, positive)
+        if part_clauses is None:
+            return None
+        clauses.extend(part_clauses)
+    return clauses
+
+def combine_disjunction(parts, literal): #one clause joining the parts, None unless each part is a single clause
+    clause = []
+    for part, positive in parts:
+        part_clauses = formula_clauses(part, literal, positive)
+        if part_clauses is None or len(part_clauses) != 1:
+            return None
+        clause.extend(part_clauses[0])
+    return [clause]
+
+def add_formula(kb, encoder, formula): #adds a sentence directly when it is clausal, through tseitin otherwise
+    clauses = formula_clauses(formula, kb.symbol_table.intern)
+    if clauses is None:
+        encoder.add_formula(formula)
+    else:
+        for clause in clauses:
+            kb.add_clause(clause)
+
+def parse_knowledge_base(filename): #parses a file to construct a knowledge base and its queries
     kb = KnowledgeBase()  #create a new knowledge base
-
-    with open(filename, 'r') as file:
-        lines = file.read().split('\n')  #read all lines from the file
-
-    tell_content = []  #stores rules from the TELL section
-    ask_query = ""  #stores the ASK query
-    parse_mode = None  #tracks whether parsing "tell" or "ask"
-
-    for line in lines:
-        line = line.strip()
-        if line == "TELL":
-            parse_mode = 'TELL'
-        elif line == "ASK":
-            parse_mode = 'ASK'
-        elif parse_mode == 'TELL' and line:
-            tell_content.extend(expr.strip() for expr in line.split(';') if expr.strip())
-        elif parse_mode == 'ASK' and line:
-            ask_query = line.strip()
-
-    #parse rules from the tell section into the knowledge base
-    for expr in tell_content:
-        parsed = LogicParser.parse_expression(expr)
-
-        if isinstance(parsed, str):
-            if parsed.startswith('~'):
-                kb.add_clause(Clause([Literal(parsed[1:], True)]))  #add negated literal
-            else:
-                kb.add_clause(Clause([Literal(parsed)]))  #add positive literal
-            continue
-
-        if parsed.operator_type == LogicalOperator.IMPLIES:
-            #add implication as a clause
-            if len(parsed.left_side) == 1:
-                kb.add_clause(Clause([Literal(parsed.left_side[0], True), Literal(parsed.right_side)]))
-            else:
-                literals = [Literal(ant, True) for ant in parsed.left_side]
-                literals.append(Literal(parsed.right_side))
-                kb.add_clause(Clause(literals))
-
-        elif parsed.operator_type == LogicalOperator.EQUIVALENCE:
-            #add equivalence as two implications
-            kb.add_clause(Clause([Literal(parsed.left_side[0], True), Literal(parsed.right_side)]))
-            kb.add_clause(Clause([Literal(parsed.right_side, True), Literal(parsed.left_side[0])]))
-
-        elif parsed.operator_type == LogicalOperator.OR:
-            #add disjunction of literals
-            literals = []
-            for term in parsed.left_side:
-                if term.startswith('*'):
-                    term = term[1:]
-                if term.startswith('~'):
-                    literals.append(Literal(term[1:], True))
+    encoder = TseitinEncoder(kb)
+    queries = []  #stores the parsed ASK queries, in order
+
+    #statements are streamed from the file, each TELL sentence going straight into the clause database
+    for section, statement in read_statements(filename):
+        if section == 'TELL':
+            add_formula(kb, encoder, LogicParser.parse_formula(statement))
+        elif section == 'ASK':
+            queries.append(LogicParser.parse_formula(statement))
+
+    return kb, queries
+
+#dpll search engine over signed int literals (v is true, -v is false for variable v >= 1)
+#clauses are kept in the same csr layout as the knowledge base, each watching its first two literals;
+#assignments live on a trail split into decision levels and backtracking undoes the trail
+class DPLLSolver:
+    def __init__(self, num_vars, clauses=()):
+        self.num_vars = num_vars
+        size = 2 * num_vars + 1
+        self.values = [0] * size  #literal -> 1 true, -1 false, 0 unassigned (negative literals index from the end)
+        self.watches = [[] for _ in range(size)]  #literal -> clauses currently watching it
+        self.reasons = [None] * (num_vars + 1)  #variable -> index of the clause that implied it
+        self.levels = [0] * (num_vars + 1)  #variable -> decision level it was assigned at
+        self.lits = array('i')  #literals of the stored clauses back to back, watched ones first
+        self.offsets = array('q', [0])  #clause i spans lits[offsets[i]:offsets[i + 1]]
+        self.trail = []  #assigned literals in assignment order
+        self.trail_lim = []  #trail position where each decision level starts
+        self.flipped = []  #whether the decision of each level is already the second branch
+        self.qhead = 0  #next trail position to propagate
+        self.next_var = 1  #lowest variable that may still be unassigned
+        self.ok = True  #False once the clause set is known to be unsatisfiable
+        self.failed = []  #assumptions the last unsatisfiable solve call depended on, empty when no assumption did
+        #search counters, bumped once per decision, conflict or propagate call rather than per literal
+        self.decisions = 0
+        self.propagations = 0  #literals taken off the propagation queue
+        self.conflicts = 0
+        self.backtracks = 0
+        self.max_depth = 0  #deepest decision level reached
+        for clause in clauses:
+            self.add_clause(clause)
+
+    def new_vars(self, count): #appends count unassigned variables, numbered after the existing ones
+        if count <= 0:
+            return
+        split = self.num_vars + 1  #new positive slots go before the negative literals at the end
+        self.values[split:split] = [0] * (2 * count)
+        self.watches[split:split] = [[] for _ in range(2 * count)]
+        self.reasons.extend([None] * count)
+        self.levels.extend([0] * count)
+        self.num_vars += count
+
+    def add_clause(self, literals): #adds a clause at decision level 0
+        values = self.values
+        clause = []
+        for lit in literals:
+            if -lit in clause or values[lit] == 1:
+                return  #tautology or already satisfied
+            if lit not in clause and values[lit] == 0:
+                clause.append(lit)  #literals already false at level 0 are dropped
+        if not clause:
+            self.ok = False
+        elif len(clause) == 1:
+            value = self.values[clause[0]]
+            if value == -1:
+                self.ok = False
+            elif value == 0:
+                self.assign(clause[0])
+        else:
+            index = len(self.offsets) - 1
+            self.lits.extend(clause)
+            self.offsets.append(len(self.lits))
+            self.watches[clause[0]].append(index)
+            self.watches[clause[1]].append(index)
+
+    def clause(self, index): #literals of a stored clause
+        return self.lits[self.offsets[index]:self.offsets[index + 1]]
+
+    def assign(self, lit, reason=None): #makes a literal true at the current decision level
+        self.values[lit] = 1
+        self.values[-lit] = -1
+        var = abs(lit)
+        self.reasons[var] = reason
+        self.levels[var] = len(self.trail_lim)
+        self.trail.append(lit)
+
+    def propagate(self): #unit propagation over the watch lists, returns a conflicting clause index or None
+        values = self.values
+        watches = self.watches
+        lits = self.lits
+        offsets = self.offsets
+        trail = self.trail
+        first_head = self.qhead
+        while self.qhead < len(trail):
+            false_lit = -trail[self.qhead]
+            self.qhead += 1
+            watchers = watches[false_lit]
+            i = j = 0
+            count = len(watchers)
+            while i < count:
+                index = watchers[i]
+                i += 1
+                start = offsets[index]
+                first = lits[start]
+                if first == false_lit:
+                    first = lits[start] = lits[start + 1]
+                    lits[start + 1] = false_lit
+                if values[first] == 1:
+                    watchers[j] = index  #clause already satisfied
+                    j += 1
+                    continue
+                for k in range(start + 2, offsets[index + 1]):
+                    other = lits[k]
+                    if values[other] != -1:
+                        #move the watch to a literal that is not false
+                        lits[start + 1] = other
+                        lits[k] = false_lit
+                        watches[other].append(index)
+                        break
                 else:
-                    literals.append(Literal(term))
-            kb.add_clause(Clause(literals))
-
-    return kb, ask_query
-
-def find_pure_literal(kb, assignment): #find a pure literal in the knowledge base
-    polarity = {}
-    for clause in kb.clauses:
-        for lit in clause.literals:
-            if lit.name not in assignment:
-                if lit.name not in polarity:
-                    polarity[lit.name] = set()
-                polarity[lit.name].add(lit.negated)
-
-    for var, pols in polarity.items():
-        if len(pols) == 1:  #only one polarity exists
-            return var, not list(pols)[0]
-    return None
-
-def find_unit_clause(kb, assignment): #finds a unit clause 
-    for clause in kb.clauses:
-        unassigned = []
-        is_satisfied = False
-
-        for lit in clause.literals:
-            if lit.name in assignment:
-                if (not lit.negated and assignment[lit.name]) or (lit.negated and not assignment[lit.name]):
-                    is_satisfied = True
-                    break
+                    watchers[j] = index
+                    j += 1
+                    if values[first] == -1:
+                        #conflict: keep the remaining watchers and stop propagating
+                        watchers[j:] = watchers[i:count]
+                        self.propagations += self.qhead - first_head
+                        self.qhead = len(trail)
+                        return index
+                    self.assign(first, index)  #unit clause
+            del watchers[j:]
+        self.propagations += self.qhead - first_head
+        return None
+
+    def decide(self, lit, flipped=False): #opens a new decision level with lit as its decision
+        self.trail_lim.append(len(self.trail))
+        self.flipped.append(flipped)
+        self.assign(lit)
+        if not flipped:
+            self.decisions += 1  #second branches are counted as backtracks
+        if len(self.trail_lim) > self.max_depth:
+            self.max_depth = len(self.trail_lim)
+
+    def cancel_until(self, level): #undoes every assignment above the given decision level
+        if len(self.trail_lim) <= level:
+            return
+        values = self.values
+        start = self.trail_lim[level]
+        for lit in self.trail[start:]:
+            values[lit] = 0
+            values[-lit] = 0
+            var = abs(lit)
+            if var < self.next_var:
+                self.next_var = var
+        del self.trail[start:]
+        del self.trail_lim[level:]
+        del self.flipped[level:]
+        self.qhead = start
+
+    def pick_branch_var(self): #lowest unassigned variable, None when the assignment is complete
+        values = self.values
+        var = self.next_var
+        while var <= self.num_vars and values[var] != 0:
+            var += 1
+        self.next_var = var
+        return var if var <= self.num_vars else None
+
+    def assume(self, assumptions): #opens the next assumption level, returns False when an assumption is already false
+        lit = assumptions[len(self.trail_lim)]
+        if self.values[lit] == -1:
+            self.failed = self.analyze_final((lit,)) + [lit]
+            self.cancel_until(0)
+            return False
+        #an assumption that already holds still gets its own (empty) level so levels line up with assumptions
+        self.trail_lim.append(len(self.trail))
+        self.flipped.append(True)  #assumptions are never flipped
+        if self.values[lit] == 0:
+            self.assign(lit)
+        return True
+
+    #assumptions whose assignment made the given false literals false: the reasons of the literals are
+    #followed back along the trail, the assumption decisions reached are collected (level 0 facts need none)
+    def analyze_final(self, literals):
+        levels, reasons = self.levels, self.reasons
+        seen = {abs(lit) for lit in literals}
+        failed = []
+        for lit in reversed(self.trail):
+            var = abs(lit)
+            if var not in seen or not levels[var]:
+                continue
+            reason = reasons[var]
+            if reason is None:
+                failed.append(lit)
             else:
-                unassigned.append(lit)
-
-        if not is_satisfied and len(unassigned) == 1:
-            return unassigned[0].name, not unassigned[0].negated
-
-    return None
-
-def dpll_satisfiable(kb, assignment=None): #uses the dpll algorithm to check satisfiability of the knowledge base
-    if assignment is None:
-        assignment = {}
-
-    all_satisfied = True
-    for clause in kb.clauses:
-        result = clause.evaluate(assignment)
-        if result is False:
-            return None  #clause is unsatisfied
-        if result is None:
-            all_satisfied = False  #some clauses are undecided
-
-    if all_satisfied:
-        return assignment  #all clauses are satisfied
-
-    #apply unit propagation
-    unit = find_unit_clause(kb, assignment)
-    if unit:
-        var, value = unit
-        new_assignment = assignment.copy()
-        new_assignment[var] = value
-        return dpll_satisfiable(kb, new_assignment)
-
-    #apply pure literal elimination
-    pure = find_pure_literal(kb, assignment)
-    if pure:
-        var, value = pure
-        new_assignment = assignment.copy()
-        new_assignment[var] = value
-        return dpll_satisfiable(kb, new_assignment)
-
-    #choose a variable and try both true and false assignments
-    var = next(iter(kb.symbols - set(assignment.keys())))
-
-    assignment_true = assignment.copy()
-    assignment_true[var] = True
-    result = dpll_satisfiable(kb, assignment_true)
-    if result is not None:
+                seen.update(map(abs, self.clause(reason)))
+        failed.reverse()
+        return failed
+
+    def solve(self, assumptions=()): #iterative dpll search, returns True when the clauses are satisfiable
+        #assumptions are literals taken as the first decisions; False then means unsatisfiable under them,
+        #and failed holds the assumptions that are unsatisfiable together
+        self.cancel_until(0)
+        self.failed = []
+        if not self.ok:
+            return False
+        while True:
+            conflict = self.propagate()
+            if conflict is not None:
+                self.conflicts += 1
+                exhausted = False  #whether some decision below the assumptions was undone
+                #chronological backtracking: flip the most recent decision not yet flipped
+                while True:
+                    if len(self.trail_lim) <= len(assumptions):
+                        if not self.trail_lim:
+                            self.ok = False
+                        #a conflict among the assumptions names the ones involved; once the search below
+                        #them is exhausted only the whole prefix assumed so far is known to fail
+                        if exhausted:
+                            self.failed = list(assumptions[:len(self.trail_lim)])
+                        else:
+                            self.failed = self.analyze_final(self.clause(conflict))
+                        self.cancel_until(0)
+                        return False
+                    level = len(self.trail_lim) - 1
+                    decision = self.trail[self.trail_lim[level]]
+                    was_flipped = self.flipped[level]
+                    self.cancel_until(level)
+                    self.backtracks += 1
+                    exhausted = True
+                    if not was_flipped:
+                        self.decide(-decision, flipped=True)
+                        break
+                continue
+            if len(self.trail_lim) < len(assumptions):
+                if not self.assume(assumptions):
+                    return False
+                continue
+            var = self.pick_branch_var()
+            if var is None:
+                return True
+            self.decide(var)  #try true first
+
+    def model(self): #truth value of every variable in the current assignment
+        return [self.values[var] == 1 for var in range(self.num_vars + 1)]
+
+    def stats(self): #search counters accumulated over every solve call
+        return {'decisions': self.decisions, 'propagations': self.propagations, 'conflicts': self.conflicts,
+                'backtracks': self.backtracks, 'max_depth': self.max_depth}
+
+#uses the dpll algorithm to check satisfiability of the knowledge base; preprocess names the preprocessing
+#steps to run first (see preprocess.STEPS), the model is then reconstructed for the variables they removed
+def dpll_satisfiable(kb, assignment=None, solver_class=DPLLSolver, preprocess=None):
+    symbol_table = kb.symbol_table
+    units = [symbol_table.index[name] if value else -symbol_table.index[name]
+             for name, value in (assignment or {}).items() if name in symbol_table]
+    preprocessor = None
+    if preprocess is not None:
+        kb = kb.copy()
+        for unit in units:
+            kb.add_clause((unit,))
+        preprocessor = preprocess_kb(kb, steps=preprocess)
+    solver = solver_class(kb.num_vars, kb.clauses)
+    for unit in units:
+        solver.add_clause((unit,))
+
+    if not solver.solve():
+        return None
+    model = solver.model()
+    if preprocessor is not None:
+        preprocessor.extend_model(model)
+    result = dict(assignment or {})
+    result.update((symbol_table.name(var), model[var]) for var in range(1, kb.num_vars + 1))
+    return result
+
+#incremental sat over a dpll-style solver: clauses are added between solve calls, scopes make clauses
+#temporary and each solve runs under assumption literals. a scope's clauses carry the negation of a selector
+#variable that is assumed true while the scope is open; pop asserts the selector false, which satisfies the
+#scope's clauses for good (and any learned clause derived from them), so nothing is ever retracted
+class IncrementalSolver:
+    def __init__(self, num_vars=0, clauses=(), solver_class=DPLLSolver):
+        self.solver = solver_class(num_vars, clauses)
+        self.scopes = []  #selector variable of each open scope, innermost last
+        self.selectors = set()  #every selector allocated, open or popped
+        self.failed = []  #assumptions the last unsatisfiable solve depended on
+
+    @property
+    def num_vars(self):
+        return self.solver.num_vars
+
+    def new_vars(self, count): #appends count variables, returns the first; selectors come from the same numbering
+        first = self.solver.num_vars + 1
+        self.solver.cancel_until(0)
+        self.solver.new_vars(count)
+        return first
+
+    def add_clause(self, literals, permanent=False): #adds to the innermost open scope unless permanent
+        literals = list(literals)
+        top = max(map(abs, literals), default=0)
+        if top > self.solver.num_vars:
+            self.new_vars(top - self.solver.num_vars)
+        if self.selectors and not self.selectors.isdisjoint(map(abs, literals)):
+            raise ValueError("clause mentions a scope selector variable, allocate variables with new_vars")
+        if self.scopes and not permanent:
+            literals.append(-self.scopes[-1])
+        self.solver.cancel_until(0)
+        self.solver.add_clause(literals)
+
+    def push(self): #opens a scope for temporary clauses
+        selector = self.new_vars(1)
+        self.scopes.append(selector)
+        self.selectors.add(selector)
+
+    def pop(self): #drops the clauses added since the matching push
+        self.solver.cancel_until(0)
+        self.solver.add_clause((-self.scopes.pop(),))
+
+    def solve(self, assumptions=()): #True when the clauses of the open scopes are satisfiable under the assumptions
+        result = self.solver.solve(self.scopes + list(assumptions))
+        selectors = self.selectors
+        self.failed = [] if result else [lit for lit in self.solver.failed if abs(lit) not in selectors]
         return result
 
-    assignment_false = assignment.copy()
-    assignment_false[var] = False
-    return dpll_satisfiable(kb, assignment_false)
-
-def process_dpll_file(filename): #processes file using the dpll algorithm to check satisfiability
+    def model(self): #truth value of every variable after a satisfiable solve
+        return self.solver.model()
+
+    def stats(self):
+        return self.solver.stats()
+
+#answers many queries against one clause database: kb |= q is checked by solving under the assumption
+#that the literal tseitin-defining q is false, so query clauses never need retracting and everything the
+#solver derives (level 0 units, learned clauses) carries over to the next query and to later kb additions
+class EntailmentChecker:
+    def __init__(self, kb, solver_class=DPLLSolver, encoder=None):
+        self.kb = kb
+        self.encoder = encoder if encoder is not None else TseitinEncoder(kb)
+        self.solver = IncrementalSolver(kb.num_vars, kb.clauses, solver_class)
+        self.synced = len(kb)  #clauses of the kb already handed to the solver
+
+    def sync(self): #passes new variables and clauses of the kb to the solver
+        solver, kb = self.solver, self.kb
+        solver.new_vars(kb.num_vars - solver.num_vars)
+        for index in range(self.synced, len(kb)):
+            solver.add_clause(kb.clause(index), permanent=True)
+        self.synced = len(kb)
+
+    def add_formula(self, formula):
+        add_formula(self.kb, self.encoder, formula)
+        self.sync()
+
+    def entails(self, query):
+        self.encoder.define([(query, -1)])  #clauses forcing the query literal true wherever the query holds
+        literal = self.encoder.literal(query)
+        self.sync()
+        return not self.solver.solve((-literal,))
+
+def component_satisfiable(clauses, solver_class=DPLLSolver): #solves clauses over a few of many variables, renumbered 1..n
+    if all(max(clause) > 0 for clause in clauses) or all(min(clause) < 0 for clause in clauses):
+        return True  #all true (all false) satisfies clauses that each have a positive (negative) literal, e.g. horn rules
+    numbering = {}
+    compact = [[numbering.setdefault(abs(lit), len(numbering) + 1) * (1 if lit > 0 else -1) for lit in clause]
+               for clause in clauses]
+    return solver_class(len(numbering), compact).solve()
+
+def kb_counts(kb): #size counts of a clause database for stats, auxiliary tseitin variables counted apart
+    symbols = sum(1 for name in kb.symbol_table.names[1:] if not name.startswith('<aux'))
+    return {'clauses': len(kb), 'symbols': symbols, 'variables': kb.num_vars}
+
+#checks every query of the file with the dpll algorithm, yields answers in order; a Stats object passed
+#as stats receives the kb size and the solver counters after each query. with slicing the clause components
+#sharing no variable with a query are checked satisfiable once and left out of the search. preprocess names
+#the steps simplifying the clauses before search, the variables of the queries are frozen so answers do not change.
+#while the clauses are horn, or horn after flipping some variables, queries are answered by horn-sat and
+#the solver is only built for the first query that is not; the horn and renamed counters show which.
+#method names the engine in error messages
+def process_dpll_file(filename, solver_class=DPLLSolver, parse=parse_knowledge_base, stats=None, preprocess=None,
+                      slicing=False, method="DPLL"):
     try:
-        kb, query = parse_knowledge_base(filename)
-
-        query_kb = KnowledgeBase()
-        query_kb.clauses = kb.clauses.copy()
-        query_kb.symbols = kb.symbols.copy()
-
-        #negate the query and add it to the knowledge base
-        if query.startswith('~'):
-            query_kb.add_clause(Clause([Literal(query[1:])]))
-        else:
-            query_kb.add_clause(Clause([Literal(query, True)]))
-
-        return dpll_satisfiable(query_kb) is None
+        kb, queries = parse(filename)
+        if stats is not None:
+            stats.parsed(**kb_counts(kb))
+        index = kb.symbol_table.index
+        query_vars = {index[name] for query in queries for name in query.symbols() if name in index}
+        if slicing:
+            kept, dropped = clause_cone(kb, query_vars)
+            if stats is not None:
+                stats.sliced(kept=len(kb) if kept is None else len(kept), dropped=sum(map(len, dropped)),
+                             components=len(dropped))
+            if dropped:
+                #each component is solved on its own, a solver over all of them would backtrack across them
+                if not all(component_satisfiable(component, solver_class) for component in dropped):
+                    for _ in queries:  #a component left out has no model, so the kb entails anything
+                        if stats is not None:
+                            stats.answered()
+                        yield True
+                    return
+                kb = KnowledgeBase(kb.symbol_table)
+                for clause in kept:
+                    kb.add_clause(clause)
+        if preprocess is not None:
+            preprocessor = preprocess_kb(kb, query_vars, preprocess)
+            if stats is not None:
+                stats.preprocessed(preprocessor.report)
+        encoder = TseitinEncoder(kb)
+        horn = HornEntailment(kb, encoder)
+        checker = None
+        for query in queries:
+            entailed = horn.entails(query)
+            if entailed is None:
+                if checker is None:
+                    checker = EntailmentChecker(kb, solver_class, encoder)
+                entailed = checker.entails(query)
+            if stats is not None:
+                counters = {} if checker is None else checker.solver.stats()
+                counters['horn'] = horn.answered
+                if horn.renamed is not None:
+                    counters['renamed'] = horn.renamed
+                stats.answered(counters)
+            yield entailed
 
     except Exception as e:
-        raise Exception(f"Error processing DPLL file: {str(e)}")
\ No newline at end of file
+        raise Exception(f"Error processing {method} file: {str(e)}")
@@ -1,4 +1,8 @@
 import sys
+import json
+import time
+import queue
+import multiprocessing
 from typing import Set
 from pathlib import Path
 from enum import Enum 
@@ -6,10 +10,17 @@ from dataclasses import dataclass
 import argparse 
 
 #importing necessary modules for the different inference methods and truth table, dpll operations
-from truth_table import parse_truth_table_file, evaluate_truth_table, evaluate_generic_truth_table
-from forward_chaining import parse_chain_file, forward_chaining
-from backward_chaining import backward_chaining
-from dpll import process_dpll_file
+from truth_table import parse_truth_table_file, evaluate_truth_table_queries
+from forward_chaining import parse_chain_file, forward_chaining_queries
+from backward_chaining import backward_chaining_queries
+from dpll import DPLLSolver, process_dpll_file, parse_knowledge_base
+from cdcl import CDCLSolver, process_cdcl_file
+from dimacs import is_dimacs, read_dimacs, write_dimacs, process_dimacs_file
+from session import open_session
+from kb_cache import KBCache, load_parsed
+from stats import Stats
+from preprocess import STEPS
+from logic_operators import horn_rules
 
 #defines different types of inference methods supported
 class InferenceMethod(Enum): 
@@ -17,6 +28,8 @@ class InferenceMethod(Enum):
     FORWARD_CHAINING = "FC"
     BACKWARD_CHAINING = "BC"
     DPLL = "DPLL"
+    CDCL = "CDCL"
+    PORTFOLIO = "PORTFOLIO"
 
 #dataclass to represent the result of an inference operation
 @dataclass
@@ -24,46 +37,268 @@ class InferenceResult:
     is_valid: bool #used for indicating whether or not inference was successful
     derived_facts: Set[str] = None #set of facts derived during inference
     error_message: str = None #error msg in case of failure
+    engine: str = None #method that produced the result when it was picked by the portfolio
+
+SENTENCE_METHODS = ("TT", "FC", "BC") #methods that need sentences rather than clauses, refused on DIMACS files
+PORTFOLIO_TT_SYMBOLS = 24 #truth tables larger than this are left out of the portfolio race
+
+def is_horn_kb(sentences, queries): #definite clauses over positive symbols with symbol queries, which fc and bc decide
+    for sentence in sentences:
+        parsed = horn_rules(sentence)
+        if parsed is None:
+            return False
+        facts, rules = parsed
+        names = facts + [name for premises, conclusion in rules for name in premises + (conclusion,)]
+        if any(name.startswith('~') for name in names):
+            return False
+    return all(query.op is None for query in queries)
+
+def chain_counts(knowledge_base, fact_set): #clause and symbol counts of a parsed horn kb, either direction
+    symbols = set(fact_set)
+    rules = 0
+    for key, values in knowledge_base.items():
+        rules += len(values)
+        for item in (key, *values):
+            symbols.update(item if isinstance(item, tuple) else (item,))
+    symbols.discard('')
+    return {'clauses': rules + len(fact_set), 'symbols': len(symbols)}
+
+def portfolio_methods(filename): #methods worth racing on a file, with a description of the kb
+    if is_dimacs(filename):
+        return [InferenceMethod.DPLL.value, InferenceMethod.CDCL.value], {'format': 'dimacs'}
+    sentences, queries = parse_truth_table_file(filename)
+    symbols = set().union(*(formula.symbols() for formula in sentences + queries))
+    horn = is_horn_kb(sentences, queries)
+    methods = []
+    if len(symbols) <= PORTFOLIO_TT_SYMBOLS:
+        methods.append(InferenceMethod.TRUTH_TABLE.value)
+    if horn:
+        methods += [InferenceMethod.FORWARD_CHAINING.value, InferenceMethod.BACKWARD_CHAINING.value]
+    methods += [InferenceMethod.DPLL.value, InferenceMethod.CDCL.value]
+    return methods, {'horn': horn, 'symbols': len(symbols), 'queries': len(queries)}
+
+def verdict(answer): #an engine's answer as True / False: dpll and cdcl give booleans, the others '> YES...' or 'NO'
+    if isinstance(answer, str):
+        return answer.startswith('> YES')
+    return bool(answer)
+
+#runs in a child process: answers every query with one method, on an engine configured like the parent
+#(options are its constructor arguments); the answers are sent back as plain verdicts, so the output of
+#the portfolio does not depend on which engine wins, along with the stats summary of the run
+def portfolio_worker(filename, method, answers, options):
+    results = summary = None
+    try:
+        engine = InferenceEngine(**options)
+        results = [(verdict(result.is_valid), result.error_message) for result in engine.process(filename, method)]
+        if engine.stats is not None:
+            summary = engine.stats.summary()
+    finally:
+        answers.put((method, results, summary))
 
 #main engine to process the different inference methods
 class InferenceEngine:    
-    def process_truth_table(self, filename): #processes file using the truth table method
+    def __init__(self, cache=None, stats=False, preprocess=None, slicing=True, fc_slicing=False):
+        self.cache = cache #optional KBCache holding parsed kbs between runs
+        self.slicing = slicing #drop the parts of the kb outside the query cones before TT, DPLL and CDCL
+        self.fc_slicing = fc_slicing #the same before FC, opt-in since its YES lists then only name the facts in the cones
+        self.preprocess = preprocess #preprocessing steps run before DPLL and CDCL search, None for none
+        self.session = None #persistent kb opened by load(), answers ask() without re-parsing
+        self.portfolio_record = None #kb description, candidates and winner of the last portfolio run
+        self.collect_stats = stats #collect parse and search counters on every process_* run
+        self.hooks = [] #hook(event, record) called on 'parse', 'slice', 'preprocess', 'query' and 'finish' of each run
+        self.stats = None #Stats of the last process_* run when collecting
+
+    def add_hook(self, hook): #registers a stats hook, which switches collection on
+        self.hooks.append(hook)
+
+    def remove_hook(self, hook):
+        self.hooks.remove(hook)
+
+    def start_stats(self, method, filename): #new Stats for a run, None when nobody is listening
+        self.stats = Stats(method, filename, self.hooks) if self.collect_stats or self.hooks else None
+        return self.stats
+
+    def load(self, filename, method, workers=1): #parses and compiles a kb once for the given method
+        self.session = open_session(method, filename, workers, self.cache)
+
+    def tell(self, sentences): #adds ';' separated sentences to the loaded kb
+        self.session.tell(sentences)
+
+    def retract(self, facts): #withdraws ';' separated facts from the loaded kb, FC sessions only
+        if not hasattr(self.session, 'retract'):
+            raise ValueError("Only FC sessions can retract facts")
+        self.session.retract(facts)
+
+    def ask(self, query): #answers a query against the loaded kb, keeping derived state warm
+        try:
+            result, derived_facts = self.session.ask(query)
+            return InferenceResult(is_valid=result, derived_facts=derived_facts)
+        except Exception as e:
+            return InferenceResult(is_valid=False, error_message=str(e))
+
+    #each process_* method yields one InferenceResult per query of the ASK section, in query order,
+    #answering all of them in one pass; an error ends the stream with an error result
+    def process_truth_table(self, filename, workers=1): #processes file using the truth table method
         try: 
-            knowledge_base, fact_set, query, bracket_flag = parse_truth_table_file(filename) #parse file
-            if bracket_flag == 0: #evauluate based on bracket flag
-                result = evaluate_truth_table(knowledge_base, fact_set, query)
-            else:
-                result = evaluate_generic_truth_table(knowledge_base, fact_set, query)
-            return InferenceResult(is_valid=result) #return a successful inference result
+            stats = self.start_stats("TT", filename)
+            knowledge_base, queries = load_parsed(self.cache, filename, "TT", parse_truth_table_file) #parse file
+            if stats is not None:
+                symbols = set().union(*(sentence.symbols() for sentence in knowledge_base + queries))
+                stats.parsed(sentences=len(knowledge_base), symbols=len(symbols))
+            for result in evaluate_truth_table_queries(knowledge_base, queries, workers, stats, self.slicing):
+                yield InferenceResult(is_valid=result) #return a successful inference result
+            if stats is not None:
+                stats.finish()
              
         except Exception as e: #handle exceptions and return error result
-            return InferenceResult(is_valid=False, error_message=str(e))
+            yield InferenceResult(is_valid=False, error_message=str(e))
 
     def process_forward_chaining(self, filename): #processes a file using the forward chaining method
         try:
-            knowledge_base, fact_set, query = parse_chain_file(filename, "FC")
-            result = forward_chaining(knowledge_base, fact_set, query)
-            return InferenceResult(is_valid=result)
+            stats = self.start_stats("FC", filename)
+            knowledge_base, fact_set, queries = load_parsed(self.cache, filename, "FC",
+                                                            lambda name: parse_chain_file(name, "FC"))
+            if stats is not None:
+                stats.parsed(**chain_counts(knowledge_base, fact_set))
+            for result in forward_chaining_queries(knowledge_base, fact_set, queries, stats, self.fc_slicing):
+                yield InferenceResult(is_valid=result)
+            if stats is not None:
+                stats.finish()
             
         except Exception as e:
-            return InferenceResult(is_valid=False, error_message=str(e))
+            yield InferenceResult(is_valid=False, error_message=str(e))
 
     def process_backward_chaining(self, filename): #processes file using backward chaining method
         try:
-            knowledge_base, fact_set, query = parse_chain_file(filename, "BC")
-            derived_facts = set()
-            result = backward_chaining(knowledge_base, fact_set, query, derived_facts)
-            return InferenceResult(is_valid=result, derived_facts=derived_facts)
+            stats = self.start_stats("BC", filename)
+            knowledge_base, fact_set, queries = load_parsed(self.cache, filename, "BC",
+                                                            lambda name: parse_chain_file(name, "BC"))
+            if stats is not None:
+                stats.parsed(**chain_counts(knowledge_base, fact_set))
+            for result, derived_facts in backward_chaining_queries(knowledge_base, fact_set, queries, stats):
+                yield InferenceResult(is_valid=result, derived_facts=derived_facts)
+            if stats is not None:
+                stats.finish()
             
         except Exception as e:
-            return InferenceResult(is_valid=False, error_message=str(e))
+            yield InferenceResult(is_valid=False, error_message=str(e))
     
     def process_dpll(self, filename): #processes file using DPLL algorthim method
         try:
-            result = process_dpll_file(filename)
-            return InferenceResult(is_valid=result)
+            stats = self.start_stats("DPLL", filename)
+            if is_dimacs(filename):
+                parse = lambda name: load_parsed(self.cache, name, "DPLL", read_dimacs)
+                results = process_dimacs_file(filename, DPLLSolver, parse, stats, self.preprocess, self.slicing)
+            else:
+                parse = lambda name: load_parsed(self.cache, name, "DPLL", parse_knowledge_base)
+                results = process_dpll_file(filename, parse=parse, stats=stats, preprocess=self.preprocess,
+                                            slicing=self.slicing)
+            for result in results:
+                yield InferenceResult(is_valid=result)
+            if stats is not None:
+                stats.finish()
         except Exception as e:
-            return InferenceResult(is_valid=False, error_message=str(e))
+            yield InferenceResult(is_valid=False, error_message=str(e))
+
+    def process_cdcl(self, filename): #processes file using the conflict-driven clause learning solver
+        try:
+            stats = self.start_stats("CDCL", filename)
+            if is_dimacs(filename):
+                parse = lambda name: load_parsed(self.cache, name, "CDCL", read_dimacs)
+                results = process_dimacs_file(filename, CDCLSolver, parse, stats, self.preprocess, self.slicing)
+            else:
+                parse = lambda name: load_parsed(self.cache, name, "CDCL", parse_knowledge_base)
+                results = process_cdcl_file(filename, parse=parse, stats=stats, preprocess=self.preprocess,
+                                            slicing=self.slicing)
+            for result in results:
+                yield InferenceResult(is_valid=result)
+            if stats is not None:
+                stats.finish()
+        except Exception as e:
+            yield InferenceResult(is_valid=False, error_message=str(e))
+
+    #races the applicable methods in separate processes: the first one to answer every query without an
+    #error wins and the others are terminated; the winner is recorded in self.portfolio_record. when every
+    #engine fails, the answers of the first one to finish are passed on and recorded as the fallback.
+    #every answer is a plain YES or NO, whichever engine gave it
+    def process_portfolio(self, filename):
+        stats = self.start_stats("PORTFOLIO", filename)
+        try:
+            methods, record = portfolio_methods(filename)
+        except Exception as e:
+            yield InferenceResult(is_valid=False, error_message=str(e))
+            return
+        context = multiprocessing.get_context()
+        answers = context.Queue()
+        start = time.perf_counter()
+        options = dict(cache=self.cache, stats=stats is not None, preprocess=self.preprocess, slicing=self.slicing,
+                       fc_slicing=self.fc_slicing)
+        processes = [context.Process(target=portfolio_worker, args=(filename, method, answers, options), daemon=True)
+                     for method in methods]
+        for process in processes:
+            process.start()
+        winner, results, summary, fallback = None, None, None, None
+        try:
+            pending = len(processes)
+            while pending and winner is None:
+                try:
+                    method, answer, run = answers.get(timeout=0.1)
+                except queue.Empty:
+                    if not any(process.is_alive() for process in processes) and answers.empty():
+                        break  #every remaining engine died without answering
+                    continue
+                pending -= 1
+                if answer is not None and not any(error for _, error in answer):
+                    winner, results, summary = method, answer, run
+                elif fallback is None:
+                    fallback = (method, answer, run)
+        finally:
+            for process in processes:
+                if process.is_alive():
+                    process.terminate()
+            for process in processes:
+                process.join()
+        record.update(file=str(filename), candidates=methods, winner=winner,
+                      seconds=round(time.perf_counter() - start, 6))
+        self.portfolio_record = record
+        engine = winner
+        if winner is None:
+            engine, results, summary = fallback or (None, None, None)
+            if not results:
+                yield InferenceResult(is_valid=False, error_message="no engine in the portfolio produced an answer")
+                return
+            record['fallback'] = engine  #answers of the first engine to finish, errors included
+        if stats is not None:
+            stats.info.update(winner=winner, candidates=methods)
+            if 'fallback' in record:
+                stats.info['fallback'] = engine
+            if summary is not None:
+                stats.replay(summary)  #parse, slicing, preprocessing and search counters of the engine answering
+            else:
+                for _ in results:
+                    stats.answered()  #the race is one event, the whole time goes to the first query
+        for entailed, error_message in results:
+            yield InferenceResult(is_valid="YES" if entailed else "NO", error_message=error_message, engine=engine)
+        if stats is not None:
+            stats.finish()
+
+    def process(self, filename, method, workers=1): #dispatches to the process_* method named by an InferenceMethod value
+        if method in SENTENCE_METHODS and is_dimacs(filename):
+            return iter([InferenceResult(is_valid=False, error_message=f"{method} cannot read DIMACS input, "
+                                                                       f"use DPLL, CDCL or PORTFOLIO")])
+        if method == InferenceMethod.TRUTH_TABLE.value:
+            return self.process_truth_table(filename, workers)
+        elif method == InferenceMethod.FORWARD_CHAINING.value:
+            return self.process_forward_chaining(filename)
+        elif method == InferenceMethod.BACKWARD_CHAINING.value:
+            return self.process_backward_chaining(filename)
+        elif method == InferenceMethod.DPLL.value:
+            return self.process_dpll(filename)
+        elif method == InferenceMethod.CDCL.value:
+            return self.process_cdcl(filename)
+        elif method == InferenceMethod.PORTFOLIO.value:
+            return self.process_portfolio(filename)
+        raise ValueError(f"Unknown inference method {method!r}")
 
 #parse command line arguments
 def parse_arguments():
@@ -71,8 +306,69 @@ def parse_arguments():
     parser.add_argument('filename', type=Path, help='Path to the input file')
     parser.add_argument('method', type=str, choices=[m.value for m in InferenceMethod], 
                         help='Inference method to use')
+    parser.add_argument('--workers', type=int, default=1,
+                        help='Number of processes used to enumerate the truth table (TT only)')
+    parser.add_argument('--repl', action='store_true',
+                        help='Load the TELL section once, then answer queries read from stdin '
+                             '(TELL lines add sentences, RETRACT lines withdraw facts with FC)')
+    parser.add_argument('--portfolio-log', type=str, default=None,
+                        help='Append the winner of each PORTFOLIO run to this JSON Lines file')
+    parser.add_argument('--cache-dir', type=str, default=None,
+                        help='Directory caching parsed kbs by file contents and method')
+    parser.add_argument('--cache-size', type=float, default=256,
+                        help='Size limit of the cache directory in MB, least recently used entries go first')
+    parser.add_argument('--stats', nargs='?', const='human', choices=['human', 'json'], default=None,
+                        help='Print parse and search statistics to stderr, as text (default) or one JSON line')
+    parser.add_argument('--to-dimacs', type=str, default=None,
+                        help='Also write the kb, converted to CNF, and its queries to this DIMACS file')
+    parser.add_argument('--preprocess', nargs='?', const=','.join(STEPS), default=None,
+                        help=f"Simplify the clauses before DPLL/CDCL search with these comma separated steps "
+                             f"(default all: {','.join(STEPS)})")
+    parser.add_argument('--no-slice', action='store_true',
+                        help='Keep the whole kb instead of only the part the queries depend on')
+    parser.add_argument('--slice', action='store_true',
+                        help='Also slice the kb before FC, whose YES lists then only name facts the queries depend on')
     return parser.parse_args()
 
+def print_result(result):
+    print(result.is_valid)
+    if result.derived_facts:
+        print(f"Derived facts: {result.derived_facts}")
+
+#reads stdin in the file format: lines after TELL are added to the kb, queries after ASK (the default) are
+#answered one by one; "TELL <sentences>" and "ASK <query>" work on a single line too
+def run_repl(engine, stream=sys.stdin):
+    mode = 'ASK'
+    for line in stream:
+        line = line.strip()
+        if line in ('TELL', 'ASK', 'RETRACT'):
+            mode = line
+            continue
+        if not line:
+            continue
+        line_mode = mode
+        for keyword in ('TELL ', 'ASK ', 'RETRACT '):
+            if line.startswith(keyword):
+                line_mode, line = keyword.strip(), line[len(keyword):]
+        if line_mode in ('TELL', 'RETRACT'):
+            try:
+                if line_mode == 'TELL':
+                    engine.tell(line)
+                else:
+                    engine.retract(line)
+            except Exception as e:
+                print(f"Error: {str(e)}", flush=True)
+            continue
+        for query in line.split(';'):
+            if not query.strip():
+                continue
+            result = engine.ask(query)
+            if result.error_message:
+                print(f"Error: {result.error_message}")
+            else:
+                print_result(result)
+            sys.stdout.flush()
+
 #main function to run the inference engine
 def main():
     args = parse_arguments()
@@ -83,27 +379,45 @@ def main():
         sys.exit(1)
         
     #initialize the inference engine
-    engine = InferenceEngine()
+    cache = KBCache(args.cache_dir, int(args.cache_size * (1 << 20))) if args.cache_dir else None
+    preprocess = tuple(step for step in args.preprocess.split(',') if step) if args.preprocess is not None else None
+    engine = InferenceEngine(cache, stats=args.stats is not None, preprocess=preprocess, slicing=not args.no_slice,
+                             fc_slicing=args.slice and not args.no_slice)
     
     try:
+        if args.to_dimacs:
+            kb, queries = (read_dimacs if is_dimacs(args.filename) else parse_knowledge_base)(args.filename)
+            write_dimacs(kb, args.to_dimacs, queries)
+
+        if args.repl:
+            engine.load(args.filename, args.method, args.workers)
+            run_repl(engine)
+            return
+
         #execute the appropriate inference method based on the user's choice
-        if args.method == InferenceMethod.TRUTH_TABLE.value:
-            result = engine.process_truth_table(args.filename)
-        elif args.method == InferenceMethod.FORWARD_CHAINING.value:
-            result = engine.process_forward_chaining(args.filename)
-        elif args.method == InferenceMethod.BACKWARD_CHAINING.value:
-            result = engine.process_backward_chaining(args.filename)
-        elif args.method == InferenceMethod.DPLL.value:
-            result = engine.process_dpll(args.filename)
+        results = engine.process(args.filename, args.method, args.workers)
         
-        #handle the results and print output
-        if result.error_message:
-            print(f"Error: {result.error_message}")
-            sys.exit(1)
-        else:
-            print(result.is_valid)
-            if result.derived_facts:
-                print(f"Derived facts: {result.derived_facts}")
+        #handle the results and print output as each query is answered
+        for result in results:
+            if result.error_message:
+                print(f"Error: {result.error_message}")
+                sys.exit(1)
+            else:
+                print_result(result)
+                sys.stdout.flush()
+
+        if engine.stats is not None:
+            print(engine.stats.to_json() if args.stats == 'json' else engine.stats.format(), file=sys.stderr)
+
+        if args.method == InferenceMethod.PORTFOLIO.value:
+            record = engine.portfolio_record
+            if record['winner'] is None:
+                print(f"Portfolio: no winner, answers from {record['fallback']} ({record['seconds']:.3f} s)")
+            else:
+                print(f"Portfolio winner: {record['winner']} ({record['seconds']:.3f} s)")
+            if args.portfolio_log:
+                with open(args.portfolio_log, 'a') as log:
+                    log.write(json.dumps(record) + '\n')
                 
     except Exception as e:
         #handle the unexpected errors
@@ -1,58 +1,219 @@
-from logic_operators import operator_chain  #imports a utility function to process logical rules for chaining
+from collections import deque  #fifo agenda of symbols waiting to be processed
+from logic_operators import operator_chain, read_statements  #rule parsing for chaining and the streaming statement reader
+from slicing import horn_cone  #rules the queries can depend on
 
 #chain parser for forward and backward chaining
 def parse_chain_file(filename, method):
     knowledge_base = {}  #dictionary to store logical rules
     fact_set = set()  #set to store known facts
-    query_statement = 0  #placeholder for the query statement
-    parse_mode = 0  #keeps track of whether parsing "TELL" or "ASK" section
-
-    #read the input file line by line
-    with open(filename, 'r') as file:
-        lines = file.read().splitlines()
-
-    for line in lines:
-        line = line.strip()  #remove leading and trailing whitespace
-        if not line:
-            continue  #skip empty lines
-
-        if line == "TELL":
-            #enter the tell section (knowledge base rules)
-            parse_mode = 'TELL'
-
-        elif line == "ASK":
-            #enter the ask section (query statement)
-            parse_mode = 'ASK'
-
-        elif parse_mode == 'TELL':
-            #parse logical rules in the tell section
-            clauses = line.split(';')  #split rules by semicolons
-            for clause in clauses:
-                clause = clause.strip()  #remove extra whitespace
-                #process the clause using the operator_chain function
-                operator_chain(clause, method, knowledge_base, fact_set)
-
-        elif parse_mode == 'ASK' and line:
-            #parse the ask section (query statement)
-            query_statement = line.strip()
-
-    #return the parsed knowledge base, facts, and query statement
-    return knowledge_base, fact_set, query_statement
-
-#forward chaining
+    queries = []  #every query of the ask section, in order
+    operator_chain.error_printed = False  #the generic kb message is printed once per file, not once per process
+
+    #statements are streamed from the file one at a time (see read_statements)
+    for section, statement in read_statements(filename):
+        if section == 'TELL':
+            #process the rule using the operator_chain function
+            operator_chain(statement, method, knowledge_base, fact_set)
+        elif section == 'ASK':
+            #queries, one per line or separated by semicolons
+            queries.append(statement)
+
+    #return the parsed knowledge base, facts, and queries
+    return knowledge_base, fact_set, queries
+
+#resumable agenda forward chaining: one premise counter per rule, facts and rules can be added at any
+#time and the agenda is only run as far as a query needs, so the closure stays warm between queries
+class ForwardChainer:
+    def __init__(self):
+        self.counts = []  #number of premises of each rule not yet inferred
+        self.conclusions = []  #conclusions fired when a rule's counter reaches zero
+        self.premise_index = {}  #symbol -> rules that use it as a premise
+        self.agenda = deque()  #symbols inferred but not yet processed
+        self.inferred = set()
+        self.direct_pushes = 0  #agenda entries from facts and rules with no outstanding premise
+        self.direct_firings = 0  #rules fired as soon as they were added
+
+    def add_fact(self, fact):
+        if fact:
+            self.agenda.append(fact)
+            self.direct_pushes += 1
+
+    def add_rule(self, condition, results):
+        premises = set(condition)
+        premises.discard('')
+        premises.difference_update(self.inferred)  #premises already processed count as satisfied
+        if not premises:
+            self.agenda.extend(results)  #rules without premises behave like facts
+            self.direct_pushes += len(results)
+            self.direct_firings += 1
+            return
+        rule = len(self.counts)
+        self.counts.append(len(premises))
+        self.conclusions.append(results)
+        for premise in premises:
+            self.premise_index.setdefault(premise, []).append(rule)
+
+    def run(self, query_statement=None): #processes the agenda until the query is inferred or nothing is left
+        agenda, inferred, counts = self.agenda, self.inferred, self.counts
+        if query_statement in inferred:
+            return True
+        while agenda:
+            symbol = agenda.popleft()
+            if symbol in inferred:
+                continue
+            inferred.add(symbol)
+            for rule in self.premise_index.get(symbol, ()):
+                counts[rule] -= 1
+                if counts[rule] == 0:
+                    agenda.extend(self.conclusions[rule])
+            if symbol == query_statement:
+                return True  #stop as soon as the query is derived
+        return False
+
+    def stats(self): #counters derived from the premise counts, so the agenda loop carries no extra work
+        fired = [rule for rule, count in enumerate(self.counts) if count == 0]
+        return {'rule_firings': self.direct_firings + len(fired),
+                'agenda_pushes': self.direct_pushes + sum(len(self.conclusions[rule]) for rule in fired),
+                'inferred': len(self.inferred)}
+
+    def answer(self, query_statement):
+        if self.run(query_statement):
+            derived_facts_list = sorted(self.inferred, key=lambda x: (len(x), x))
+            return f"> YES: " + ', '.join(derived_facts_list)
+        else:
+            return "NO"  # Print NO only if the query is not satisfied for valid Horn clauses
+
+#persistent forward chaining network for facts that keep arriving and leaving (rete-style for propositional
+#rules: a node per premise tuple of the rule dict, shared by every conclusion of that tuple, with a counter of
+#its premises not yet true). the closure is kept complete: asserting a fact or adding a rule propagates only
+#what it newly derives, and retracting a fact removes only what no longer follows. every true symbol keeps a
+#support count, one per assertion plus one per rule node currently firing for it. retraction first removes
+#everything whose support runs through the fact (over-deletion), then puts back the removed symbols that
+#still have support from what is left (rederivation), since counts alone keep cyclic rules alive.
+#hooks get (event, symbol) for every 'derived' and 'retracted' symbol as it appears
+class RuleNetwork:
+    def __init__(self, knowledge_base=None, fact_set=(), hooks=()):
+        self.hooks = list(hooks)
+        self.missing = []  #rule node -> premises not true
+        self.conclusions = []  #rule node -> symbols it concludes
+        self.premise_index = {}  #symbol -> rule nodes using it as a premise
+        self.nodes = {}  #premise tuple -> rule node
+        self.support = {}  #symbol -> assertions plus firing rule nodes concluding it
+        self.asserted = set()
+        self.true = set()
+        self.firings = 0  #rule node firings, rederivations included
+        self.retractions = 0  #symbols removed by retract, over-deleted ones put back not counted
+        for condition, results in (knowledge_base or {}).items():
+            self.add_rule(condition, results)
+        for fact in sorted(fact_set):
+            self.add_fact(fact)
+
+    def emit(self, event, symbols):
+        for hook in self.hooks:
+            for symbol in symbols:
+                hook(event, symbol)
+
+    def propagate(self, queue): #makes the queued symbols true with everything they fire, returns the new ones
+        true, support, missing, conclusions = self.true, self.support, self.missing, self.conclusions
+        derived = []
+        for symbol in queue:  #conclusions of fired nodes are queued behind the symbol
+            if symbol in true:
+                continue
+            true.add(symbol)
+            derived.append(symbol)
+            for node in self.premise_index.get(symbol, ()):
+                missing[node] -= 1
+                if not missing[node]:
+                    self.firings += 1
+                    for result in conclusions[node]:
+                        support[result] = support.get(result, 0) + 1
+                        queue.append(result)
+        return derived
+
+    def add_fact(self, fact): #asserts a fact, returns the symbols it newly makes true
+        if not fact or fact in self.asserted:
+            return []
+        self.asserted.add(fact)
+        self.support[fact] = self.support.get(fact, 0) + 1
+        derived = self.propagate([fact])
+        self.emit('derived', derived)
+        return derived
+
+    def add_rule(self, condition, results): #adds premises -> results, returns the symbols it newly makes true
+        premises = set(condition)
+        premises.discard('')
+        key = tuple(sorted(premises))
+        node = self.nodes.get(key)
+        if node is None:
+            node = self.nodes[key] = len(self.missing)
+            self.missing.append(len(premises - self.true))
+            self.conclusions.append([])
+            for premise in premises:
+                self.premise_index.setdefault(premise, []).append(node)
+        results = [result for result in results if result not in self.conclusions[node]]
+        self.conclusions[node].extend(results)
+        if self.missing[node]:
+            return []
+        self.firings += 1
+        for result in results:
+            self.support[result] = self.support.get(result, 0) + 1
+        derived = self.propagate(list(results))
+        self.emit('derived', derived)
+        return derived
+
+    def retract(self, fact): #withdraws an asserted fact, returns the symbols that no longer follow
+        if fact not in self.asserted:
+            return []
+        self.asserted.discard(fact)
+        true, support, missing, conclusions = self.true, self.support, self.missing, self.conclusions
+        support[fact] -= 1
+        removed = []
+        pending = [fact]
+        while pending:
+            symbol = pending.pop()
+            if symbol not in true:
+                continue
+            true.discard(symbol)
+            removed.append(symbol)
+            for node in self.premise_index.get(symbol, ()):
+                missing[node] += 1
+                if missing[node] == 1:  #the node was firing
+                    for result in conclusions[node]:
+                        support[result] -= 1
+                        pending.append(result)
+        rederived = set(self.propagate([symbol for symbol in removed if support.get(symbol)]))
+        removed = [symbol for symbol in removed if symbol not in rederived]
+        self.retractions += len(removed)
+        self.emit('retracted', removed)
+        return removed
+
+    def holds(self, symbol):
+        return symbol in self.true
+
+    def stats(self):
+        return {'rule_firings': self.firings, 'inferred': len(self.true), 'retractions': self.retractions}
+
+#forward chaining (linear-time agenda algorithm with one premise counter per rule); the queries share one
+#agenda, so together they cost at most one fixpoint, and each answer lists the facts inferred so far;
+#a Stats object passed as stats receives the chainer counters after each query. with slicing only the facts
+#and rules in the backward cone of the queries are loaded, so the answers list the facts relevant to them
+def forward_chaining_queries(knowledge_base, fact_set, queries, stats=None, slicing=False):
+    if slicing:
+        rules, facts = horn_cone(knowledge_base, fact_set, queries)
+        if stats is not None:
+            kept = sum(map(len, rules.values())) + len(facts)
+            stats.sliced(kept=kept, dropped=sum(map(len, knowledge_base.values())) + len(fact_set) - kept)
+        knowledge_base, fact_set = rules, facts
+    chainer = ForwardChainer()
+    for fact in sorted(fact_set):  #sorted so the output is deterministic
+        chainer.add_fact(fact)
+    for condition, results in knowledge_base.items():
+        chainer.add_rule(condition, results)
+    for query_statement in queries:
+        answer = chainer.answer(query_statement)
+        if stats is not None:
+            stats.answered(chainer.stats())
+        yield answer
+
 def forward_chaining(knowledge_base, fact_set, query_statement):
-    changed = True  # Flag to track if new facts are being derived
-    while changed:
-        changed = False
-        for condition, result in knowledge_base.items():
-            if all(c in fact_set for c in condition):
-                if result not in fact_set:
-                    fact_set.add(result)
-                    changed = True
-
-    fact_set.discard('')  # Clean up any empty strings
-    if query_statement in fact_set:
-        derived_facts_list = sorted(fact_set, key=lambda x: (len(x), x))
-        return f"> YES: " + ', '.join(derived_facts_list)
-    else:
-        return "NO"  # Print NO only if the query is not satisfied for valid Horn clauses
+    return next(forward_chaining_queries(knowledge_base, fact_set, [query_statement]))
@@ -0,0 +1,206 @@
+import itertools  #prefixes of the clause stream
+
+#horn clauses (at most one positive literal) are decided in linear time by unit resolution: with every
+#variable false, only the clauses whose negative literals all became true force anything, namely their
+#positive literal; the variables forced this way are the least model, and a clause with no positive literal
+#whose body is forced true means there is no model. a clause set is renamable horn when flipping the sign of
+#some variables makes it horn
+
+#assigns the flip of var and every flip it forces, returns the variables assigned or None on a contradiction,
+#which leaves flips as it was. a flip fixes which literal of the variable ends up positive, and every other
+#literal of a clause holding that one must then end up negative, which fixes the flip of its variable
+def propagate_flips(clauses, occurs, flips, var, flip):
+    assigned = []
+    pending = [(var, flip)]
+    while pending:
+        var, flip = pending.pop()
+        if var in flips:
+            if flips[var] != flip:
+                for undone in assigned:
+                    del flips[undone]
+                return None
+            continue
+        flips[var] = flip
+        assigned.append(var)
+        positive = -var if flip else var
+        for index in occurs.get(positive, ()):
+            pending.extend((abs(other), other > 0) for other in clauses[index] if other != positive)
+    return assigned
+
+#set of variables whose flip makes every clause horn, None when no renaming does. this is 2-sat over the
+#flips (at most one literal of each clause may end up positive), solved by propagation: a flip whose
+#consequences hold no contradiction is kept for good, otherwise the other value is tried, and a variable
+#for which both fail means there is no renaming
+def horn_renaming(clauses):
+    kept = []  #clauses as sets of literals, tautologies left out
+    occurs = {}  #literal -> kept clauses holding it
+    for clause in clauses:
+        clause = set(clause)
+        if any(-lit in clause for lit in clause if lit > 0):
+            continue
+        for lit in clause:
+            occurs.setdefault(lit, []).append(len(kept))
+        kept.append(clause)
+    flips = {}  #variable -> whether it is flipped
+    for lit in occurs:
+        var = abs(lit)
+        if var in flips:
+            continue
+        if propagate_flips(kept, occurs, flips, var, False) is None:
+            if propagate_flips(kept, occurs, flips, var, True) is None:
+                return None
+    return {var for var, flip in flips.items() if flip}
+
+PREFIX_CLAUSES = 64  #clauses in the first prefix checked for a renaming
+
+#horn_renaming of the clauses, read from the iterable only as far as needed. a clause set that is not
+#renamable has a prefix that is not either, so the check runs on prefixes four times longer each round,
+#starting past the first clause with two positive literals: a kb that is not renamable is rejected after
+#reading about four times as far as the clause where it stops being renamable, with structures built for
+#that prefix only, and a kb that is horn as it stands is accepted without building anything
+def renamable_horn(clauses):
+    clauses = iter(clauses)
+    prefix = []
+    for clause in clauses:
+        prefix.append(clause)
+        if sum(lit > 0 for lit in clause) > 1:
+            break
+    else:
+        return set()
+    size = max(PREFIX_CLAUSES, 4 * len(prefix))
+    while True:
+        prefix.extend(itertools.islice(clauses, size - len(prefix)))
+        flips = horn_renaming(prefix)
+        if flips is None or len(prefix) < size:
+            return flips
+        size *= 4
+
+#incremental horn-sat: the least model of the clauses added so far is kept and extended by the clauses
+#added since the last call, so a satisfiable call only propagates from its assumptions and undoes that afterwards
+class HornSolver:
+    def __init__(self, flipped=()):
+        self.flipped = set(flipped)  #variables read with their sign flipped
+        self.heads = []  #clause -> its positive variable after renaming, 0 for none
+        self.remaining = []  #clause -> number of its negative literals whose variable is not yet true
+        self.bodies = {}  #variable -> clauses holding it negatively
+        self.true = set()  #least model: variables true after renaming
+        self.pending = []  #heads of added clauses whose body already holds, not yet propagated
+        self.ok = True  #False once the clauses have no model
+
+    def add_clause(self, literals): #returns False, adding nothing, when the clause is not horn after renaming
+        flipped = self.flipped
+        if flipped:
+            literals = [-lit if abs(lit) in flipped else lit for lit in literals]
+        head = 0
+        for lit in literals:
+            if lit > 0 and lit != head:
+                if head:  #a tautology is skipped, anything else is not horn
+                    return any(-other in literals for other in literals if other > 0)
+                head = lit
+        if head and -head in literals:
+            return True
+        index = len(self.heads)
+        self.heads.append(head)
+        true, bodies = self.true, self.bodies
+        remaining = 0
+        for lit in literals:  #a repeated literal is counted down as often as it is counted
+            if lit < 0:
+                bodies.setdefault(-lit, []).append(index)
+                if -lit not in true:
+                    remaining += 1
+        self.remaining.append(remaining)
+        if not remaining:
+            if head:
+                self.pending.append(head)
+            else:
+                self.ok = False
+        return True
+
+    #makes the queued variables true along with everything they force, returns the variables made true or
+    #None when a clause with no positive literal, or a forbidden variable, is forced
+    def propagate(self, queue, forbidden):
+        true, heads, remaining, bodies = self.true, self.heads, self.remaining, self.bodies
+        added = []
+        for var in queue:  #heads forced below are appended and propagated by this same loop
+            if var in true:
+                continue
+            if var in forbidden:
+                self.retract(added)
+                return None
+            true.add(var)
+            added.append(var)
+            conflict = False  #the whole body list is counted down anyway, so retract can count it back up
+            for index in bodies.get(var, ()):
+                remaining[index] -= 1
+                if remaining[index]:
+                    continue
+                head = heads[index]
+                if head:
+                    queue.append(head)
+                else:
+                    conflict = True
+            if conflict:
+                self.retract(added)
+                return None
+        return added
+
+    def retract(self, added): #undoes a propagate call
+        true, remaining, bodies = self.true, self.remaining, self.bodies
+        for var in added:
+            true.discard(var)
+            for index in bodies.get(var, ()):
+                remaining[index] += 1
+
+    def satisfiable(self, assumptions=()): #whether the clauses have a model in which the assumption literals hold
+        if self.pending and self.ok:
+            pending, self.pending = self.pending, []
+            self.ok = self.propagate(pending, ()) is not None
+        if not self.ok:
+            return False
+        flipped = self.flipped
+        units = [-lit if abs(lit) in flipped else lit for lit in assumptions]
+        forbidden = {-lit for lit in units if lit < 0}  #variables that must stay false
+        if not forbidden.isdisjoint(self.true):
+            return False
+        added = self.propagate([lit for lit in units if lit > 0], forbidden)
+        if added is None:
+            return False
+        self.retract(added)
+        return True
+
+#answers kb |= q with horn-sat while the clauses of the kb, and those its tseitin encoder adds for the
+#queries, stay horn under the renaming found for the kb; entails returns None once they do not
+class HornEntailment:
+    def __init__(self, kb, encoder):
+        self.kb = kb
+        self.encoder = encoder
+        self.renamed = 0  #variables flipped, None when the kb is not renamable horn
+        self.synced = 0  #clauses of the kb already handed to the solver
+        self.answered = 0  #queries decided by horn-sat
+        self.solver = HornSolver()  #loading the clauses as they stand is the horn check
+        self.sync()
+        if self.solver is None:
+            flipped = renamable_horn(kb.clauses)
+            self.renamed = None if flipped is None else len(flipped)
+            if flipped is not None:
+                self.solver = HornSolver(flipped)
+                self.synced = 0
+                self.sync()
+
+    def sync(self): #passes new clauses of the kb to the solver, dropping it at the first one that is not horn
+        kb = self.kb
+        while self.solver is not None and self.synced < len(kb):
+            if not self.solver.add_clause(kb.clause(self.synced)):
+                self.solver = None
+            self.synced += 1
+
+    def entails(self, query):
+        if self.solver is None:
+            return None
+        self.encoder.define([(query, -1)])
+        literal = self.encoder.literal(query)
+        self.sync()
+        if self.solver is None:
+            return None
+        self.answered += 1
+        return not self.solver.satisfiable((-literal,))
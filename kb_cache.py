@@ -0,0 +1,258 @@
+import contextlib
+import hashlib
+import io
+import mmap
+import os
+import struct
+import sys
+import tempfile
+from array import array  #sections are stored as raw int arrays
+
+from logic_operators import Formula, LogicalOperator
+from dpll import KnowledgeBase
+
+#on-disk cache of parsed and compiled knowledge bases, one file per (file contents, parse)
+#
+#file layout: magic, section count, then one (name, typecode, offset, length) entry per section followed
+#by the raw section bytes, each section 8-byte aligned; int sections are native-endian arrays
+#  STRS  interned strings (symbol names, chain queries), utf-8, NUL separated
+#  NODE  formula dag in dependency order: [op, argument count, arguments...], op 0 is a symbol whose
+#        single argument is a string id, otherwise arguments are earlier node ids
+#  ROOT  node ids of the kb sentences       QURY  node ids (or string ids for chains) of the queries
+#  LITS / OFFS  csr clause database         RULE  horn rule index, see encode_mapping
+#  FACT  string ids of the facts            MSGS  text the parser printed, replayed on every load
+
+FORMAT_VERSION = 1
+MAGIC = b'KBC1'
+HEADER = struct.Struct('<4sI')
+ENTRY = struct.Struct('<4scxxxQQ')
+DEFAULT_MAX_BYTES = 256 << 20
+
+PARSES = {'DPLL': 'CNF', 'CDCL': 'CNF'}  #dpll and cdcl read a file into the same clause database
+
+OPCODES = {op: op.value for op in LogicalOperator}
+OPERATORS = {code: op for op, code in OPCODES.items()}
+
+class StringTable:
+    def __init__(self, names=()):
+        self.names = list(names)
+        self.index = {name: i for i, name in enumerate(self.names)}
+
+    def intern(self, name):
+        i = self.index.get(name)
+        if i is None:
+            i = self.index[name] = len(self.names)
+            self.names.append(name)
+        return i
+
+    def encode(self):
+        return '\0'.join(self.names).encode('utf-8')
+
+    @classmethod
+    def decode(cls, data):
+        text = bytes(data).decode('utf-8')
+        return cls(text.split('\0') if text else ())
+
+def encode_formulas(formulas, strings): #flattens formula dags into one NODE array, returns (nodes, root ids)
+    ids, nodes, roots = {}, array('i'), []
+    for root in formulas:
+        stack = [(root, False)]
+        while stack:
+            node, expanded = stack.pop()
+            if node in ids:
+                continue
+            if node.op is None:
+                ids[node] = len(ids)
+                nodes.extend((0, 1, strings.intern(node.name)))
+            elif expanded:
+                ids[node] = len(ids)
+                nodes.extend((OPCODES[node.op], len(node.args)))
+                nodes.extend(ids[arg] for arg in node.args)
+            else:
+                stack.append((node, True))
+                stack.extend((arg, False) for arg in reversed(node.args) if arg not in ids)
+        roots.append(ids[root])
+    return nodes, array('i', roots)
+
+def decode_formulas(nodes, strings):
+    built, position = [], 0
+    names = strings.names
+    while position < len(nodes):
+        op, count = nodes[position], nodes[position + 1]
+        args = nodes[position + 2:position + 2 + count]
+        position += 2 + count
+        if op == 0:
+            built.append(Formula.symbol(names[args[0]]))
+        else:
+            built.append(Formula.make(OPERATORS[op], *(built[arg] for arg in args)))
+    return built
+
+#a chain kb maps keys to lists of values, where keys and values are names or tuples of names (fc: premise
+#tuple -> conclusions, bc: conclusion -> premise tuples); each item is stored as -1, id for a name or as
+#n, ids... for an n-tuple, and each entry as key, number of values, values...
+def encode_item(item, strings, out):
+    if isinstance(item, tuple):
+        out.append(len(item))
+        out.extend(strings.intern(name) for name in item)
+    else:
+        out.extend((-1, strings.intern(item)))
+
+def decode_item(data, position, names):
+    size = data[position]
+    if size < 0:
+        return names[data[position + 1]], position + 2
+    return tuple(names[i] for i in data[position + 1:position + 1 + size]), position + 1 + size
+
+def encode_mapping(mapping, strings):
+    out = array('i')
+    for key, values in mapping.items():
+        encode_item(key, strings, out)
+        out.append(len(values))
+        for value in values:
+            encode_item(value, strings, out)
+    return out
+
+def decode_mapping(data, strings):
+    mapping, position, names = {}, 0, strings.names
+    while position < len(data):
+        key, position = decode_item(data, position, names)
+        count = data[position]
+        position += 1
+        values = mapping[key] = []
+        for _ in range(count):
+            value, position = decode_item(data, position, names)
+            values.append(value)
+    return mapping
+
+#each parse's output <-> sections
+def encode_parsed(method, parsed):
+    strings = StringTable()
+    sections = {}
+    if method == 'TT':
+        sentences, queries = parsed
+        nodes, roots = encode_formulas(list(sentences) + list(queries), strings)
+        sections.update(NODE=nodes, ROOT=roots[:len(sentences)], QURY=roots[len(sentences):])
+    elif method in ('FC', 'BC'):
+        knowledge_base, fact_set, queries = parsed
+        sections['RULE'] = encode_mapping(knowledge_base, strings)
+        sections['FACT'] = array('i', (strings.intern(fact) for fact in sorted(fact_set)))
+        sections['QURY'] = array('i', (strings.intern(query) for query in queries))
+    else:
+        kb, queries = parsed
+        for name in kb.symbol_table.names[1:]:
+            strings.intern(name)  #string id + 1 is the variable
+        nodes, roots = encode_formulas(queries, strings)
+        sections.update(LITS=kb.literals, OFFS=kb.offsets, NODE=nodes, QURY=roots,
+                        VARS=array('i', [kb.num_vars]))
+    sections['STRS'] = strings.encode()
+    return sections
+
+def decode_parsed(method, sections):
+    strings = StringTable.decode(sections['STRS'])
+    if method == 'TT':
+        nodes = decode_formulas(sections['NODE'], strings)
+        return [nodes[i] for i in sections['ROOT']], [nodes[i] for i in sections['QURY']]
+    if method in ('FC', 'BC'):
+        names = strings.names
+        return (decode_mapping(sections['RULE'], strings), {names[i] for i in sections['FACT']},
+                [names[i] for i in sections['QURY']])
+    kb = KnowledgeBase()
+    num_vars = sections['VARS'][0]
+    kb.symbol_table.names = [None] + strings.names[:num_vars]
+    kb.symbol_table.index = {name: var for var, name in enumerate(kb.symbol_table.names) if var}
+    kb.literals, kb.offsets = array('i'), array('q')  #copied out of the mapping, the kb grows in place
+    kb.literals.frombytes(sections['LITS'])
+    kb.offsets.frombytes(sections['OFFS'])
+    nodes = decode_formulas(sections['NODE'], strings)
+    return kb, [nodes[i] for i in sections['QURY']]
+
+def write_sections(path, sections):
+    entries, chunks, offset = [], [], HEADER.size + ENTRY.size * len(sections)
+    for name, data in sections.items():
+        offset += -offset % 8
+        typecode = data.typecode if isinstance(data, array) else 'B'
+        raw = data.tobytes() if isinstance(data, array) else bytes(data)
+        entries.append(ENTRY.pack(name.encode('ascii'), typecode.encode('ascii'), offset, len(raw)))
+        chunks.append((offset, raw))
+        offset += len(raw)
+    with open(path, 'wb') as file:
+        file.write(HEADER.pack(MAGIC, len(sections)))
+        file.write(b''.join(entries))
+        for offset, raw in chunks:
+            file.seek(offset)
+            file.write(raw)
+
+#memory-maps the file and returns each section as a typed read-only view of the mapping, without
+#copying; the mapping stays open until the last view is released
+def read_sections(path):
+    with open(path, 'rb') as file:
+        view = memoryview(mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ))
+    magic, count = HEADER.unpack_from(view, 0)
+    if magic != MAGIC:
+        raise ValueError(f"{path} is not a kb cache file")
+    sections = {}
+    for i in range(count):
+        name, typecode, offset, length = ENTRY.unpack_from(view, HEADER.size + i * ENTRY.size)
+        sections[name.decode('ascii')] = view[offset:offset + length].cast(typecode.decode('ascii'))
+    return sections
+
+class KBCache:
+    def __init__(self, directory, max_bytes=DEFAULT_MAX_BYTES):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        os.makedirs(directory, exist_ok=True)
+
+    def key(self, filename, parse): #hash of the file contents, the parse and the format
+        digest = hashlib.sha256(f"{FORMAT_VERSION}:{sys.byteorder}:{parse}:".encode())
+        with open(filename, 'rb') as file:
+            for block in iter(lambda: file.read(1 << 20), b''):
+                digest.update(block)
+        return digest.hexdigest()
+
+    def load(self, filename, method, parse): #parser output for a file, from the cache when possible
+        method = PARSES.get(method, method)
+        path = os.path.join(self.directory, self.key(filename, method) + '.kbc')
+        try:
+            sections = read_sections(path)
+            parsed = decode_parsed(method, sections)
+            os.utime(path)  #mark as recently used
+        except (OSError, ValueError, TypeError, KeyError, IndexError, struct.error):
+            parsed = None  #missing or unreadable entry: parse again and overwrite it
+        if parsed is not None:
+            sys.stdout.write(bytes(sections['MSGS']).decode('utf-8'))
+            return parsed
+
+        printed = io.StringIO()
+        with contextlib.redirect_stdout(printed):
+            parsed = parse(filename)
+        sys.stdout.write(printed.getvalue())
+        sections = encode_parsed(method, parsed)
+        sections['MSGS'] = printed.getvalue().encode('utf-8')
+        handle, temporary = tempfile.mkstemp(dir=self.directory, suffix='.tmp')
+        os.close(handle)
+        try:
+            write_sections(temporary, sections)
+            os.replace(temporary, path)  #atomic, so concurrent readers never see a partial file
+        except OSError:
+            with contextlib.suppress(OSError):
+                os.remove(temporary)
+        self.evict()
+        return parsed
+
+    def evict(self): #removes least recently used entries until the cache fits in max_bytes
+        entries = []
+        for entry in os.scandir(self.directory):
+            if entry.name.endswith('.kbc'):
+                with contextlib.suppress(OSError):
+                    stat = entry.stat()
+                    entries.append((stat.st_mtime, stat.st_size, entry.path))
+        total = sum(size for _, size, _ in entries)
+        for _, size, path in sorted(entries):
+            if total <= self.max_bytes:
+                break
+            with contextlib.suppress(OSError):
+                os.remove(path)
+            total -= size
+
+def load_parsed(cache, filename, method, parse): #parse(filename), through the cache when one is given
+    return parse(filename) if cache is None else cache.load(filename, method, parse)
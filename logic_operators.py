@@ -1,7 +1,8 @@
+import io
 import re
-from dataclasses import dataclass
+import mmap
+import weakref
 from enum import Enum, auto
-from typing import Tuple
 
 class LogicalOperator(Enum):
     #enumeration of logical operators
@@ -12,181 +13,316 @@ class LogicalOperator(Enum):
     IMPLIED_BY = auto()
     EQUIVALENCE = auto()
 
-@dataclass
-class ParsedExpression:
-    #dataclass to hold parsed logical expression components
-    left_side: Tuple[str, ...]
-    right_side: str
-    operator_type: LogicalOperator
-    level: int = 0
+#hash-consed formula node: building the same subformula twice returns the same object, so shared
+#subformulas are stored once and nodes can be compared and hashed by identity
+class Formula:
+    __slots__ = ('op', 'args', 'name', '__weakref__')
+    interned = weakref.WeakValueDictionary()  #(op, args) or (None, name) -> live node
+
+    @classmethod
+    def symbol(cls, name):
+        key = (None, name)
+        node = cls.interned.get(key)
+        if node is None:
+            node = object.__new__(cls)
+            node.op, node.args, node.name = None, (), name
+            cls.interned[key] = node
+        return node
+
+    @classmethod
+    def make(cls, op, *args):
+        if op in (LogicalOperator.AND, LogicalOperator.OR):
+            #flatten nested chains of the same associative operator
+            flat = []
+            for arg in args:
+                flat.extend(arg.args if arg.op is op else (arg,))
+            args = tuple(flat)
+        key = (op, args)
+        node = cls.interned.get(key)
+        if node is None:
+            node = object.__new__(cls)
+            node.op, node.args, node.name = op, args, None
+            cls.interned[key] = node
+        return node
+
+    def is_literal(self): #symbol or negated symbol
+        return self.op is None or (self.op is LogicalOperator.NOT and self.args[0].op is None)
+
+    def literal_name(self): #'a' or '~a' for literals
+        return self.name if self.op is None else f"~{self.args[0].name}"
+
+    def conjuncts(self): #top-level conjuncts of the formula
+        return self.args if self.op is LogicalOperator.AND else (self,)
+
+    def symbols(self): #names of every symbol in the formula
+        names, seen, stack = set(), set(), [self]
+        while stack:
+            node = stack.pop()
+            if node in seen:
+                continue
+            seen.add(node)
+            if node.op is None:
+                names.add(node.name)
+            stack.extend(node.args)
+        return names
+
+    def __str__(self):
+        if self.op is None:
+            return self.name
+        if self.op is LogicalOperator.NOT:
+            return f"~{self.args[0]}"
+        return '(' + f" {LogicParser.OPERATOR_SYMBOLS[self.op]} ".join(str(arg) for arg in self.args) + ')'
+
+    __repr__ = __str__
 
 class LogicParser:
-    #parser for logical expressions with stadardized operator handinling
-    OPERATOR_MAPPING = {
-        '^': '&', '∧': '&',              # AND operators
-        '|': '||',                       # OR operator
-        '¬': '~', '!': '~',              # NOT operators
-        '->': '=>', '→': '=>',           # IMPLIES operators
-        '<-': '<=', '←': '<=',           # IMPLIED BY operators
-        '<=>': '<->', '↔': '<->',        # EQUIVALENCE operators
+    #single-pass tokenizer and precedence parser accepting the universal operator spellings
+    TOKEN_PATTERN = re.compile(r'''\s*(?:
+        (?P<EQUIVALENCE><=>|<->|↔)
+      | (?P<IMPLIES>=>|->|→)
+      | (?P<IMPLIED_BY><=|<-|←)
+      | (?P<OR>\|\||\||∨)
+      | (?P<AND>&|\^|∧)
+      | (?P<NOT>~|!|¬)
+      | (?P<LPAREN>\()
+      | (?P<RPAREN>\))
+      | (?P<SYMBOL>[^\s()&|^∧∨~!¬<>=→←↔-]+)
+    )''', re.VERBOSE)
+
+    #binary operator -> (precedence, right associative); ~ binds tighter than all of them
+    BINARY_OPERATORS = {
+        'AND': (4, False),
+        'OR': (3, False),
+        'IMPLIES': (2, True),
+        'IMPLIED_BY': (2, True),
+        'EQUIVALENCE': (1, True),
     }
+    NOT_PRECEDENCE = 5
 
-    #internal symbols to operator type mapping
-    SYMBOL_TO_TYPE = {
-        '&': LogicalOperator.AND,
-        '||': LogicalOperator.OR,
-        '~': LogicalOperator.NOT,
-        '=>': LogicalOperator.IMPLIES,
-        '<=': LogicalOperator.IMPLIED_BY,
-        '<->': LogicalOperator.EQUIVALENCE
+    OPERATOR_SYMBOLS = {
+        LogicalOperator.AND: '&',
+        LogicalOperator.OR: '||',
+        LogicalOperator.IMPLIES: '=>',
+        LogicalOperator.EQUIVALENCE: '<=>',
     }
 
     @classmethod
-    def standardize_expression(cls, expression):
-        #convert universal operators into internal symbols
-        result = expression.strip()
-        for universal, internal in cls.OPERATOR_MAPPING.items():
-            result = result.replace(universal, internal)
-        return result
+    def tokenize(cls, expression): #yields (kind, text) pairs
+        position, end = 0, len(expression)
+        match = cls.TOKEN_PATTERN.match
+        while position < end:
+            token = match(expression, position)
+            if token is None:
+                if expression[position:].strip():
+                    raise ValueError(f"Unexpected character {expression[position]!r} in {expression!r}")
+                return
+            position = token.end()
+            yield token.lastgroup, token.group(token.lastgroup)
+
+    @classmethod
+    def combine(cls, kind, left, right): #builds the node for a binary operator
+        if kind == 'IMPLIED_BY':
+            return Formula.make(LogicalOperator.IMPLIES, right, left)  #a <= b is stored as b => a
+        return Formula.make(LogicalOperator[kind], left, right)
+
+    @staticmethod
+    def materialize(operand): #turns a pending [op, args...] chain into a node
+        return Formula.make(operand[0], *operand[1:]) if isinstance(operand, list) else operand
 
     @classmethod
-    def parse_expression(cls, expression, level: int = 0):
-        #parse a logical expression into its components
-        expression = cls.standardize_expression(expression)
-        
-        #handle simple facts
-        if not any(symbol in expression for symbol in cls.SYMBOL_TO_TYPE.keys()):
-            return expression
-
-        #handle implications
-        for symbol, op_type in cls.SYMBOL_TO_TYPE.items():
-            if symbol in expression:
-                parts = expression.split(symbol, 1)
-                
-                if op_type in {LogicalOperator.IMPLIES, LogicalOperator.IMPLIED_BY, LogicalOperator.EQUIVALENCE}:
-                    left, right = parts if op_type != LogicalOperator.IMPLIED_BY else (parts[1], parts[0])
-                    
-                    #handle AND conditions
-                    if '&' in left:
-                        conditions = tuple(term.strip() for term in left.split('&'))
-                        return ParsedExpression(conditions, right.strip(), op_type, level)
-                    
-                    #handle OR conditions
-                    elif '||' in left:
-                        conditions = tuple(f"*{term.strip()}" if term.strip() else term.strip() 
-                                        for term in left.split('||'))
-                        return ParsedExpression(conditions, right.strip(), op_type, level)
-                    
-                    #handle NOT conditions
-                    elif '~' in left:
-                        fact = left.strip('~').strip()
-                        return ParsedExpression((fact,), "False", LogicalOperator.NOT, level)
-                    
-                    #handle simple implications
-                    else:
-                        return ParsedExpression((left.strip(),), right.strip(), op_type, level)
-
-        return expression
-
-def operator_table(expression, knowledge_base, facts_set):
+    def parse_formula(cls, expression):
+        #precedence parsing with explicit operand and operator stacks, so nesting depth is unbounded;
+        #& and || chains are collected in pending lists so long chains are built in linear time
+        operands = []  #formula nodes or pending [op, args...] chains
+        operators = []  #(kind, precedence), including ('LPAREN', 0) markers and prefix ('NOT', 5)
+        materialize = cls.materialize
+
+        def reduce():
+            kind, _ = operators.pop()
+            if kind == 'NOT':
+                operands.append(Formula.make(LogicalOperator.NOT, materialize(operands.pop())))
+                return
+            right, left = operands.pop(), operands.pop()
+            if kind in ('AND', 'OR'):
+                op = LogicalOperator[kind]
+                if isinstance(right, list) and right[0] is op:
+                    items = right[1:]
+                else:
+                    right = materialize(right)
+                    items = right.args if right.op is op else [right]
+                if isinstance(left, list) and left[0] is op:
+                    left.extend(items)
+                    operands.append(left)
+                else:
+                    operands.append([op, materialize(left), *items])
+            else:
+                operands.append(cls.combine(kind, materialize(left), materialize(right)))
+
+        expect_operand = True
+        for kind, text in cls.tokenize(expression):
+            if expect_operand:
+                if kind == 'NOT':
+                    operators.append(('NOT', cls.NOT_PRECEDENCE))
+                elif kind == 'LPAREN':
+                    operators.append(('LPAREN', 0))
+                elif kind == 'SYMBOL':
+                    operands.append(Formula.symbol(text))
+                    expect_operand = False
+                else:
+                    raise ValueError(f"Expected a symbol before {text!r} in {expression!r}")
+            elif kind == 'RPAREN':
+                while operators and operators[-1][0] != 'LPAREN':
+                    reduce()
+                if not operators:
+                    raise ValueError(f"Unbalanced ')' in {expression!r}")
+                operators.pop()
+            elif kind in cls.BINARY_OPERATORS:
+                precedence, right_associative = cls.BINARY_OPERATORS[kind]
+                while operators and (operators[-1][1] > precedence or
+                                     (operators[-1][1] == precedence and not right_associative)):
+                    reduce()
+                operators.append((kind, precedence))
+                expect_operand = True
+            else:
+                raise ValueError(f"Expected an operator before {text!r} in {expression!r}")
+
+        if expect_operand:
+            raise ValueError(f"Incomplete expression {expression!r}")
+        while operators:
+            if operators[-1][0] == 'LPAREN':
+                raise ValueError(f"Unbalanced '(' in {expression!r}")
+            reduce()
+        return materialize(operands[0])
+
+#a line ending in one of these continues on the next line (so do lines inside open parentheses)
+CONTINUATION_SUFFIXES = tuple(token.encode('utf-8') for token in
+                              ('&', '|', '^', '~', '!', '=>', '->', '<=', '<-', '<=>', '<->', '(',
+                               '∧', '∨', '¬', '→', '←', '↔'))
+READ_CHUNK = 1 << 20
 
+def read_chunks(file, chunk_size): #consecutive windows of a memory map of the file, buffered reads when it cannot be mapped
     try:
-        parsed = LogicParser.parse_expression(expression)
-        
-        if isinstance(parsed, str):
-            facts_set.add(parsed)
-            facts_set.discard('')
-            return expression, facts_set
-        
-        if parsed.operator_type == LogicalOperator.EQUIVALENCE:
-            #handle bi-directional implications
-            knowledge_base.append((parsed.left_side, parsed.right_side))
-            reverse_sides = tuple(parsed.right_side.split('&'))
-            knowledge_base.append((reverse_sides, ' & '.join(parsed.left_side)))
+        mapped = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+    except (OSError, ValueError, io.UnsupportedOperation):
+        mapped = None  #empty file, pipe or stream without a file descriptor
+    if mapped is None:
+        yield from iter(lambda: file.read(chunk_size), b'')
+        return
+    with mapped:
+        for start in range(0, len(mapped), chunk_size):
+            yield mapped[start:start + chunk_size]
+
+def statement_tail(pending): #last non-blank bytes of a pending statement, joined across pieces
+    tail = b''
+    for piece in reversed(pending):
+        tail = piece + tail
+        if len(tail.rstrip()) >= 4:  #longer than any continuation suffix
+            break
+    return tail.rstrip()
+
+#streams the statements of a TELL/ASK file as (section, text) pairs one chunk at a time, so memory stays
+#bounded by the chunk and the longest statement: statements end at ';' or at a line break, except that a
+#statement continues on the next line while it has unclosed parentheses or its line ends with an operator;
+#section is 'TELL', 'ASK' or None before either header
+def read_statements(filename, chunk_size=READ_CHUNK):
+    section = None
+    pending = []  #pieces of the statement being read, possibly spanning chunks and lines
+    depth = 0  #parenthesis depth of the pending pieces
+
+    def finish(text): #decoded statement, None for blanks and for section headers
+        nonlocal section
+        text = text.strip()
+        if text == b'TELL' or text == b'ASK':
+            section = text.decode('ascii')
+            return None
+        return text.decode('utf-8') if text else None
+
+    with open(filename, 'rb') as file:
+        for chunk in read_chunks(file, chunk_size):
+            lines = chunk.split(b'\n')
+            last = len(lines) - 1
+            for index, line in enumerate(lines):
+                parts = line.split(b';')
+                for part in parts[:-1]:  #statements ended by ';'
+                    if pending:
+                        pending.append(part)
+                        part = b''.join(pending)
+                        pending, depth = [], 0
+                    statement = finish(part)
+                    if statement is not None:
+                        yield section, statement
+                part = parts[-1]
+                pending.append(part)
+                depth += part.count(b'(') - part.count(b')')
+                if index == last:
+                    continue  #the chunk ended inside this line
+                if depth > 0 or statement_tail(pending).endswith(CONTINUATION_SUFFIXES):
+                    pending.append(b' ')  #the statement goes on after the line break
+                    continue
+                statement = finish(b''.join(pending))
+                pending, depth = [], 0
+                if statement is not None:
+                    yield section, statement
+    statement = finish(b''.join(pending))
+    if statement is not None:
+        yield section, statement
+
+def literal_names(formula): #literal names of a literal or a conjunction of literals, None otherwise
+    if formula.is_literal():
+        return [formula.literal_name()]
+    if formula.op is LogicalOperator.AND and all(arg.is_literal() for arg in formula.args):
+        return [arg.literal_name() for arg in formula.args]
+    return None
+
+def horn_rules(formula): #(facts, [(premises, conclusion)]) for a definite clause sentence, None if not horn
+    facts, rules = [], []
+    for sentence in formula.conjuncts():
+        if sentence.is_literal():
+            facts.append(sentence.literal_name())
+            continue
+        if sentence.op is LogicalOperator.IMPLIES:
+            directions = [sentence.args]
+        elif sentence.op is LogicalOperator.EQUIVALENCE and len(sentence.args) == 2:
+            directions = [sentence.args, sentence.args[::-1]]
         else:
-            knowledge_base.append((parsed.left_side, parsed.right_side))
-        
-        return expression, facts_set
-    except Exception as e:
-        print(f"Error processing expression: {expression}")
-        print(f"Error details: {str(e)}")
-        return expression, facts_set
+            return None
+        for premise, conclusion in directions:
+            premises, conclusions = literal_names(premise), literal_names(conclusion)
+            if premises is None or conclusions is None:
+                return None
+            rules.extend((tuple(premises), result) for result in conclusions)
+    return facts, rules
 
 def operator_chain(expression, method, knowledge_base, facts_set):
     # Initialize a static flag to track whether the generic KB error message was printed
     if not hasattr(operator_chain, "error_printed"):
         operator_chain.error_printed = False
 
-    # Early validation for unsupported generic KB syntax
-    if any(char in expression for char in '()||~'):
-        if not operator_chain.error_printed:
-            print("Generic KB is not applicable to FC and BC method.")
-            operator_chain.error_printed = True
-        # Skip further processing for this expression
-        return knowledge_base, facts_set, True  # Return a flag indicating generic KB
+    if not expression.strip():
+        return knowledge_base, facts_set, False
 
-    # Process the expression if it is valid for Horn clauses
     try:
-        parsed = LogicParser.parse_expression(expression)
-        if isinstance(parsed, str):
-            facts_set.add(parsed)
-        else:
-            if method == "FC":
-                # Forward chaining rule processing
-                knowledge_base[parsed.left_side] = parsed.right_side
-                if parsed.operator_type == LogicalOperator.EQUIVALENCE:
-                    reverse_sides = tuple(parsed.right_side.split('&'))
-                    knowledge_base[reverse_sides] = ' & '.join(parsed.left_side)
-            elif method == "BC":
-                # Backward chaining rule processing
-                knowledge_base.setdefault(parsed.right_side, []).append(parsed.left_side)
-                if parsed.operator_type == LogicalOperator.EQUIVALENCE:
-                    reverse_sides = tuple(parsed.right_side.split('&'))
-                    knowledge_base.setdefault(' & '.join(parsed.left_side), []).append(reverse_sides)
-
-        return knowledge_base, facts_set, False  # Return False for no generic KB detected
-    
-    
+        parsed = horn_rules(LogicParser.parse_formula(expression))
     except Exception as e:
         print(f"Error processing expression: {expression}")
         print(f"Error details: {str(e)}")
         return knowledge_base, facts_set, True  # Return True to indicate an error
 
-    except Exception as e:
-        print(f"Error processing expression: {expression}")
-        print(f"Error details: {str(e)}")
-        return knowledge_base, facts_set
-
-    except Exception as e:
-        print(f"Error processing expression: {expression}")
-        print(f"Error details: {str(e)}")
-        return knowledge_base, facts_set
+    # Only definite clauses (facts and conjunctive implications) can be chained
+    if parsed is None:
+        if not operator_chain.error_printed:
+            print("Generic KB is not applicable to FC and BC method.")
+            operator_chain.error_printed = True
+        return knowledge_base, facts_set, True  # Return a flag indicating generic KB
 
-def generic_operator_table(expression, knowledge_base, facts_set, level: int = 0):
+    facts, rules = parsed
+    facts_set.update(facts)
+    for premises, conclusion in rules:
+        if method == "FC":
+            # Forward chaining: premise tuple -> conclusions (rules sharing premises keep every conclusion)
+            knowledge_base.setdefault(premises, []).append(conclusion)
+        elif method == "BC":
+            # Backward chaining: conclusion -> alternative premise tuples
+            knowledge_base.setdefault(conclusion, []).append(premises)
 
-    try:
-        if '(' in expression:
-            level += 1
-            while '(' in expression:
-                inner_expressions = re.findall(r'\(([^()]+)\)', expression)
-                for inner_expr in inner_expressions:
-                    generic_operator_table(inner_expr, knowledge_base, facts_set, level)
-                expression = re.sub(r'\(([^()]+)\)', '@', expression)
-
-        parsed = LogicParser.parse_expression(expression, level)
-        
-        if isinstance(parsed, str):
-            facts_set.add(parsed)
-            facts_set.discard('')
-            return
-
-        if parsed.operator_type == LogicalOperator.EQUIVALENCE:
-            knowledge_base.append((parsed.left_side, parsed.right_side, level))
-            reverse_sides = tuple(parsed.right_side.split('&'))
-            knowledge_base.append((reverse_sides, ' & '.join(parsed.left_side), level))
-        else:
-            knowledge_base.append((parsed.left_side, parsed.right_side, level))
-            
-    except Exception as e:
-        print(f"Error processing expression: {expression}")
-        print(f"Error details: {str(e)}")
+    return knowledge_base, facts_set, False  # Return False for no generic KB detected
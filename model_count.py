@@ -0,0 +1,219 @@
+from collections import Counter
+from itertools import chain
+from dpll import KnowledgeBase, add_formula  #csr clause database and clausal / tseitin loading of sentences
+from cnf import TseitinEncoder  #full-equivalence encoding, which keeps the number of models unchanged
+
+#exact model counting (#sat). a dpll-style search branches on a variable and unit-propagates, but after
+#every branch the clauses left are split into connected components (clauses sharing a variable), each
+#component is counted on its own and the counts are multiplied; component counts are cached under the
+#component's clause set, so a component met again in another branch or another count is not searched twice.
+#the search runs on an explicit stack of generators, one per component being branched on, so its depth is
+#not bounded by python recursion
+
+CACHE_SIZE = 100000  #component counts kept, oldest entries evicted first
+
+def occurrences(clauses): #literal -> indices of the clauses containing it
+    occurs = {}
+    for i, clause in enumerate(clauses):
+        for lit in clause:
+            occurs.setdefault(lit, []).append(i)
+    return occurs
+
+#(true literals, satisfied clause flags, literals left per clause) once lits and every unit they imply
+#hold, None on a conflict; the clauses still open hold no unit
+def propagate(clauses, occurs, lits):
+    true = set()
+    queue = []
+    for lit in lits:
+        if -lit in true:
+            return None
+        if lit not in true:
+            true.add(lit)
+            queue.append(lit)
+    left = [len(clause) for clause in clauses]  #literals not yet known false
+    satisfied = bytearray(len(clauses))
+    for lit in queue:  #units found below join the queue and are walked in turn
+        for i in occurs.get(lit, ()):
+            satisfied[i] = 1
+        for i in occurs.get(-lit, ()):
+            if satisfied[i]:
+                continue
+            left[i] -= 1
+            if left[i] > 1:
+                continue
+            rest = [other for other in clauses[i] if -other not in true]
+            if not rest:
+                return None
+            unit = rest[0]
+            if unit not in true:  #when it is, the clause is marked satisfied once unit leaves the queue
+                true.add(unit)
+                queue.append(unit)
+    return true, satisfied, left
+
+#splits the clauses still open after propagate into connected components (clauses linked by a shared
+#variable), false literals removed; returns (components, number of variables they hold)
+def components(clauses, occurs, true, satisfied, left):
+    seen = bytearray(satisfied)  #clauses placed in a component or satisfied
+    visited = {abs(lit) for lit in true}  #variables whose clauses are already linked, or fixed
+    parts = []
+    for first in range(len(clauses)):
+        if seen[first]:
+            continue
+        seen[first] = 1
+        stack, part = [first], []
+        while stack:
+            i = stack.pop()
+            clause = clauses[i]
+            if left[i] != len(clause):
+                clause = tuple(lit for lit in clause if -lit not in true)
+            part.append(clause)
+            for lit in clause:
+                var = abs(lit)
+                if var in visited:
+                    continue
+                visited.add(var)
+                for linked in (occurs.get(var, ()), occurs.get(-var, ())):
+                    for other in linked:
+                        if not seen[other]:
+                            seen[other] = 1
+                            stack.append(other)
+        parts.append(part)
+    return parts, len(visited) - len(true)
+
+class ModelCounter:
+    def __init__(self, num_vars, clauses, cache_size=CACHE_SIZE, decision_vars=None):
+        self.num_vars = num_vars
+        #variables branched on while a component holds any, e.g. the input symbols of a tseitin encoding,
+        #whose values fix every auxiliary variable by propagation; None lets every variable be branched on
+        self.decision_vars = decision_vars
+        self.cache_size = cache_size
+        self.cache = {}  #frozenset of a component's clauses -> its number of models over its variables
+        self.unsatisfiable = False  #an empty clause was given
+        self.clauses = []
+        for clause in clauses:
+            clause = tuple(sorted(set(clause)))  #sorted literals make equal components equal sets
+            if not clause:
+                self.unsatisfiable = True
+            elif not any(-lit in clause for lit in clause if lit > 0):  #tautologies constrain nothing
+                self.clauses.append(clause)
+        self.units = [clause[0] for clause in self.clauses if len(clause) == 1]
+        self.occurs = occurrences(self.clauses)
+        self.decisions = 0  #branches taken
+        self.components = 0  #components counted by search, cache hits excluded
+        self.cache_hits = 0
+
+    def count(self, assumptions=()): #models over variables 1..num_vars in which every assumption literal holds
+        if self.unsatisfiable:
+            return 0
+        result = propagate(self.clauses, self.occurs, list(assumptions) + self.units)
+        if result is None:
+            return 0
+        parts, num_vars = components(self.clauses, self.occurs, *result)
+        total = 1 << (self.num_vars - len(result[0]) - num_vars)  #variables in no clause are free
+        for part in parts:
+            total *= self.count_component(part)
+            if not total:
+                break
+        return total
+
+    def lookup(self, key):
+        count = self.cache.get(key)
+        if count is not None:
+            self.cache_hits += 1
+        return count
+
+    def store(self, key, count):
+        if len(self.cache) >= self.cache_size:
+            del self.cache[next(iter(self.cache))]
+        self.cache[key] = count
+
+    def count_component(self, component): #drives the branch generators, passing each count to its parent
+        key = frozenset(component)
+        count = self.lookup(key)
+        if count is not None:
+            return count
+        stack = [self.branch(component, key)]
+        count = None
+        while stack:
+            try:
+                component = stack[-1].send(count)
+            except StopIteration as done:
+                stack.pop()
+                count = done.value
+                continue
+            key = frozenset(component)
+            count = self.lookup(key)
+            if count is None:
+                stack.append(self.branch(component, key))
+        return count
+
+    #counts one component by branching on its most frequent variable; yields the components left in each
+    #branch and receives their counts, returns the count of the component
+    def branch(self, component, key):
+        self.components += 1
+        occurs = occurrences(component)
+        frequency = Counter(map(abs, chain.from_iterable(component)))
+        candidates = frequency.keys() if self.decision_vars is None else (frequency.keys() & self.decision_vars or frequency)
+        var = max(candidates, key=frequency.__getitem__)
+        total = 0
+        for lit in (var, -var):
+            self.decisions += 1
+            result = propagate(component, occurs, (lit,))
+            if result is None:
+                continue
+            parts, num_vars = components(component, occurs, *result)
+            product = 1 << (len(frequency) - len(result[0]) - num_vars)
+            for part in parts:
+                product *= yield part
+                if not product:
+                    break
+            total += product
+        self.store(key, total)
+        return total
+
+    def stats(self): #search counters accumulated over every count call
+        return {'decisions': self.decisions, 'components': self.components, 'cache_hits': self.cache_hits}
+
+def count_models(num_vars, clauses): #models of a clause set over variables 1..num_vars
+    return ModelCounter(num_vars, clauses).count()
+
+def encode(sentences): #(kb, encoder) of sentences under the count-preserving encoding
+    kb = KnowledgeBase()
+    encoder = TseitinEncoder(kb, polarity=False)
+    for sentence in sentences:
+        add_formula(kb, encoder, sentence)
+    return kb, encoder
+
+def input_vars(kb): #variables of parsed symbols, tseitin auxiliaries left out
+    names = kb.symbol_table.names
+    return {var for var in range(1, kb.num_vars + 1) if not names[var].startswith('<aux')}
+
+def count_sentences(sentences): #models of parsed sentences over their symbols
+    kb, _ = encode(sentences)
+    return ModelCounter(kb.num_vars, kb.clauses, decision_vars=input_vars(kb)).count()
+
+#decides KB |= query for parsed sentences by counting: the query is entailed when KB & ~query has no model.
+#yields (entailed, number of KB models over the KB and query symbols) per query, the count None for
+#refuted queries, as the truth table does; a dict passed as counters receives the search counters
+def count_entails_all(sentences, queries, counters=None):
+    kb, encoder = encode(sentences)
+    query_literals = []
+    for query in queries:
+        encoder.define([(query, 1)])
+        query_literals.append(encoder.literal(query))
+    symbols = input_vars(kb)
+    kb_symbols = set().union(*(sentence.symbols() for sentence in sentences))
+    #symbols only some query mentions: every KB model counts twice for each one outside the query at hand
+    query_only = {kb.symbol_table.names[var] for var in symbols} - kb_symbols
+    counter = ModelCounter(kb.num_vars, kb.clauses, decision_vars=symbols)
+    total = None
+    for query, literal in zip(queries, query_literals):
+        entailed = counter.count((-literal,)) == 0
+        models = None
+        if entailed:
+            if total is None:
+                total = counter.count()
+            models = total >> len(query_only - query.symbols())
+        if counters is not None:
+            counters.update(counter.stats())
+        yield entailed, models
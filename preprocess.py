@@ -0,0 +1,296 @@
+import heapq
+import time
+from array import array  #csr arrays written back into the knowledge base
+
+#clause database simplification run before search. every step can be switched off and reports how much it
+#shrank the problem. frozen variables (the ones queries will be assumed on) are never eliminated, so each
+#step keeps satisfiability under any assumption on them; fixed and eliminated variables are recorded so a
+#model of the simplified clauses extends to a model of the original ones
+#  tautologies  clauses holding a literal and its negation, clauses repeated verbatim
+#  units        top-level unit propagation
+#  subsumption  clauses containing another clause, and self-subsuming resolution (strengthening)
+#  elimination  bounded variable elimination: resolve a variable away when that does not add clauses
+#  probing      failed literals (assuming l propagates to a conflict, so ~l holds) and literals implied
+#               by both polarities of a variable
+
+STEPS = ('tautologies', 'units', 'subsumption', 'elimination', 'probing')
+
+class Preprocessor:
+    def __init__(self, num_vars, clauses, frozen=(), steps=STEPS, max_occurrences=16, max_resolvent=20,
+                 max_candidates=1000, probe_limit=2000):
+        self.num_vars = num_vars
+        self.steps = set(steps)
+        unknown = self.steps.difference(STEPS)
+        if unknown:
+            raise ValueError(f"Unknown preprocessing step(s): {', '.join(sorted(unknown))}")
+        self.frozen = set(frozen)
+        self.max_occurrences = max_occurrences  #elimination skips variables occurring more often in either polarity
+        self.max_resolvent = max_resolvent  #and variables whose resolvents would be longer than this
+        self.max_candidates = max_candidates  #subsumption skips clauses whose pivot occurs more often
+        self.probe_limit = probe_limit  #variables probed at most
+        self.ok = True  #False once the clauses are known to be unsatisfiable
+        self.clauses = []  #clause id -> list of literals, None once deleted
+        self.inert = []  #tautologies left in place when that step is off: always true, ignored by every step
+        self.occurs = [set() for _ in range(2 * num_vars + 1)]  #literal -> ids of live clauses containing it
+        self.fixed = {}  #variable -> value forced at the top level
+        self.pending = []  #fixed literals not yet propagated
+        self.eliminated = []  #(variable, clauses it occurred in) in elimination order
+        self.report = []  #one entry per step run
+        for clause in clauses:
+            self.add(list(dict.fromkeys(clause)))  #repeated literals inside a clause are always merged
+
+    def add(self, clause): #stores a clause, returns its id (None when it is not stored)
+        if not clause:
+            self.ok = False
+            return None
+        if len(set(clause)) != len({abs(lit) for lit in clause}):
+            self.inert.append(clause)
+            return None
+        cid = len(self.clauses)
+        self.clauses.append(clause)
+        for lit in clause:
+            self.occurs[lit].add(cid)
+        return cid
+
+    def remove(self, cid):
+        for lit in self.clauses[cid]:
+            self.occurs[lit].discard(cid)
+        self.clauses[cid] = None
+
+    def strengthen(self, cid, lit): #drops a false literal from a clause
+        clause = self.clauses[cid]
+        clause.remove(lit)
+        self.occurs[lit].discard(cid)
+        if not clause:
+            self.ok = False
+        elif len(clause) == 1 and 'units' in self.steps:
+            self.assign(clause[0])
+
+    def assign(self, lit): #fixes a literal at the top level, propagated by propagate_units
+        value = self.fixed.get(abs(lit))
+        if value is None:
+            self.fixed[abs(lit)] = lit > 0
+            self.pending.append(lit)
+        elif value != (lit > 0):
+            self.ok = False
+
+    def add_unit(self, lit): #a literal found to hold: fixed when units run, kept as a unit clause otherwise
+        if 'units' in self.steps:
+            self.assign(lit)
+            self.propagate_units()
+        else:
+            self.add([lit])
+
+    def size(self): #(clauses, literals, variables) of the current database, fixed variables as unit clauses
+        live = [clause for clause in self.clauses if clause is not None]
+        occurs = self.occurs
+        variables = sum(1 for var in range(1, self.num_vars + 1) if occurs[var] or occurs[-var])
+        return (len(live) + len(self.inert) + len(self.fixed),
+                sum(map(len, live)) + sum(map(len, self.inert)) + len(self.fixed), variables)
+
+    def run(self): #applies the enabled steps in order, returns the simplified clauses
+        for step, method in (('tautologies', self.remove_tautologies), ('units', self.propagate_units),
+                             ('subsumption', self.subsume), ('elimination', self.eliminate),
+                             ('probing', self.probe_all)):
+            if step not in self.steps or not self.ok:
+                continue
+            before = self.size()
+            start = time.perf_counter()
+            if step == 'units':
+                for clause in self.clauses:
+                    if clause is not None and len(clause) == 1:
+                        self.assign(clause[0])
+            method()
+            seconds = time.perf_counter() - start
+            after = self.size()
+            self.report.append({'step': step, 'seconds': round(seconds, 6),
+                                'clauses_removed': before[0] - after[0], 'literals_removed': before[1] - after[1],
+                                'variables_removed': before[2] - after[2]})
+        return self.simplified()
+
+    def simplified(self): #clauses equisatisfiable with the input under any assumption on frozen variables
+        if not self.ok:
+            return [[]]
+        units = [[var if value else -var] for var, value in self.fixed.items()]
+        return units + [clause for clause in self.clauses if clause is not None] + self.inert
+
+    def remove_tautologies(self):
+        self.inert.clear()
+        seen = set()
+        for cid, clause in enumerate(self.clauses):
+            if clause is not None:
+                key = tuple(sorted(clause))
+                if key in seen:
+                    self.remove(cid)
+                seen.add(key)
+
+    def propagate_units(self):
+        clauses, occurs, pending = self.clauses, self.occurs, self.pending
+        while pending and self.ok:
+            lit = pending.pop()
+            for cid in list(occurs[lit]):
+                self.remove(cid)  #satisfied
+            for cid in list(occurs[-lit]):
+                if clauses[cid] is not None:
+                    self.strengthen(cid, -lit)
+
+    def subsume(self): #backward subsumption and strengthening, smallest clauses first
+        clauses, occurs = self.clauses, self.occurs
+        queue = sorted((cid for cid, clause in enumerate(clauses) if clause is not None),
+                       key=lambda cid: len(clauses[cid]), reverse=True)
+        queued = set(queue)
+        while queue and self.ok:
+            cid = queue.pop()
+            queued.discard(cid)
+            clause = clauses[cid]
+            if clause is None:
+                continue
+            #every clause that the clause subsumes or strengthens contains the pivot or its negation
+            pivot = min(clause, key=lambda lit: len(occurs[lit]) + len(occurs[-lit]))
+            candidates = occurs[pivot] | occurs[-pivot]
+            if len(candidates) > self.max_candidates:
+                continue
+            for other in candidates:
+                target = clauses[other]
+                if other == cid or target is None or len(target) < len(clause):
+                    continue
+                members = set(target)
+                flipped = None
+                for lit in clause:
+                    if lit in members:
+                        continue
+                    if -lit in members and flipped is None:
+                        flipped = lit
+                        continue
+                    break
+                else:
+                    if flipped is None:
+                        self.remove(other)
+                    else:
+                        self.strengthen(other, -flipped)  #resolving on flipped leaves a subset of other
+                        self.propagate_units()
+                        if clauses[other] is not None and other not in queued:
+                            queue.append(other)  #a shorter clause may now subsume others
+                            queued.add(other)
+                if clauses[cid] is None:
+                    break
+
+    def resolvents(self, var): #non-tautological resolvents on var, None when eliminating var would grow the kb
+        clauses, occurs = self.clauses, self.occurs
+        positive, negative = occurs[var], occurs[-var]
+        if len(positive) > self.max_occurrences or len(negative) > self.max_occurrences:
+            return None
+        limit = len(positive) + len(negative)
+        resolvents = []
+        for p in positive:
+            rest = [lit for lit in clauses[p] if lit != var]
+            for n in negative:
+                resolvent = dict.fromkeys(rest)
+                for lit in clauses[n]:
+                    if lit != -var:
+                        if -lit in resolvent:
+                            break
+                        resolvent[lit] = None
+                else:
+                    if len(resolvent) > self.max_resolvent or len(resolvents) == limit:
+                        return None
+                    resolvents.append(list(resolvent))
+        return resolvents
+
+    def eliminate(self): #bounded variable elimination, cheapest variables first
+        occurs = self.occurs
+
+        def cost(var):
+            return len(occurs[var]) * len(occurs[-var])
+
+        heap = [(cost(var), var) for var in range(1, self.num_vars + 1)
+                if var not in self.frozen and var not in self.fixed and (occurs[var] or occurs[-var])]
+        heapq.heapify(heap)
+        done = set()
+        while heap and self.ok:
+            old_cost, var = heapq.heappop(heap)
+            if var in done or var in self.fixed:
+                continue
+            if cost(var) != old_cost:
+                heapq.heappush(heap, (cost(var), var))  #stale entry
+                continue
+            resolvents = self.resolvents(var)
+            if resolvents is None:
+                continue
+            done.add(var)
+            ids = list(occurs[var] | occurs[-var])
+            self.eliminated.append((var, [list(self.clauses[cid]) for cid in ids]))
+            touched = set()
+            for cid in ids:
+                touched.update(abs(lit) for lit in self.clauses[cid])
+                self.remove(cid)
+            for resolvent in resolvents:
+                if len(resolvent) == 1:
+                    self.add_unit(resolvent[0])
+                else:
+                    self.add(resolvent)
+            for other in touched - done - self.frozen:
+                if other != var and other not in self.fixed:
+                    heapq.heappush(heap, (cost(other), other))
+
+    def probe(self, lit): #literals implied by lit through unit propagation, None on a conflict
+        clauses, occurs = self.clauses, self.occurs
+        true = {lit}
+        queue = [lit]
+        for assigned in queue:  #the list grows while it is walked
+            for cid in occurs[-assigned]:
+                unit = 0
+                for other in clauses[cid]:
+                    if -other in true:
+                        continue
+                    if unit or other in true:
+                        unit = None  #two open literals or satisfied
+                        break
+                    unit = other
+                else:
+                    if unit == 0:
+                        return None
+                    true.add(unit)
+                    queue.append(unit)
+        return true
+
+    def probe_all(self): #probes both polarities of variables in binary clauses
+        occurs = self.occurs
+        candidates = [var for var in range(1, self.num_vars + 1) if var not in self.fixed and
+                      any(len(self.clauses[cid]) == 2 for cid in occurs[var] | occurs[-var])]
+        for var in candidates[:self.probe_limit]:
+            if not self.ok:
+                break
+            if var in self.fixed:
+                continue
+            positive = self.probe(var)
+            if positive is None:
+                self.add_unit(-var)
+                continue
+            negative = self.probe(-var)
+            if negative is None:
+                self.add_unit(var)
+                continue
+            for lit in positive & negative:  #holds whichever value var takes
+                if abs(lit) not in self.fixed:
+                    self.add_unit(lit)
+
+    def extend_model(self, model): #completes a model (list indexed by variable) of the simplified clauses
+        for var, value in self.fixed.items():
+            model[var] = value
+        for var, saved in reversed(self.eliminated):
+            model[var] = False
+            for clause in saved:
+                if not any(model[abs(lit)] == (lit > 0) for lit in clause if abs(lit) != var):
+                    model[var] = var in clause
+                    if model[var]:
+                        break
+        return model
+
+def preprocess_kb(kb, frozen=(), steps=STEPS): #simplifies the clauses of a kb in place, returns the Preprocessor
+    preprocessor = Preprocessor(kb.num_vars, kb.clauses, frozen, steps)
+    clauses = preprocessor.run()
+    kb.literals, kb.offsets = array('i'), array('q', [0])
+    for clause in clauses:
+        kb.add_clause(clause)
+    return preprocessor
@@ -0,0 +1,121 @@
+from logic_operators import LogicParser, operator_chain  #sentence parsing shared with the file parsers
+from truth_table import parse_truth_table_file, evaluate_truth_table
+from forward_chaining import parse_chain_file, RuleNetwork
+from backward_chaining import backward_chaining, GoalTable
+from dpll import KnowledgeBase, DPLLSolver, EntailmentChecker, parse_knowledge_base
+from cdcl import CDCLSolver
+from kb_cache import load_parsed
+
+#persistent TELL-once / ASK-many sessions: the kb is parsed and compiled once, each method keeps its
+#derived state between queries, and tell() extends the kb without rebuilding it (FC can also retract facts)
+
+def split_sentences(text): #sentences of a TELL line, separated by semicolons
+    return [sentence.strip() for sentence in text.split(';') if sentence.strip()]
+
+class TruthTableSession:
+    def __init__(self, sentences=(), workers=1):
+        self.sentences = list(sentences)
+        self.workers = workers
+        self.answers = {}  #query formula -> answer, valid until the kb changes
+
+    @classmethod
+    def from_file(cls, filename, workers=1, cache=None):
+        sentences, _ = load_parsed(cache, filename, "TT", parse_truth_table_file)
+        return cls(sentences, workers)
+
+    def tell(self, text):
+        self.sentences.extend(LogicParser.parse_formula(sentence) for sentence in split_sentences(text))
+        self.answers.clear()
+
+    def ask(self, query): #returns (result, derived facts)
+        formula = LogicParser.parse_formula(query)
+        if formula not in self.answers:
+            self.answers[formula] = evaluate_truth_table(self.sentences, formula, self.workers)
+        return self.answers[formula], None
+
+#the closure is kept complete by a RuleNetwork, so told facts can also be retracted between queries; a YES
+#lists every fact that follows from the kb, whatever queries came before
+class ForwardChainingSession:
+    def __init__(self, knowledge_base=None, fact_set=()):
+        self.network = RuleNetwork(knowledge_base, fact_set)
+
+    @classmethod
+    def from_file(cls, filename, cache=None):
+        knowledge_base, fact_set, _ = load_parsed(cache, filename, "FC", lambda name: parse_chain_file(name, "FC"))
+        return cls(knowledge_base, fact_set)
+
+    def tell(self, text):
+        knowledge_base, fact_set = {}, set()
+        for sentence in split_sentences(text):
+            operator_chain(sentence, "FC", knowledge_base, fact_set)
+        for condition, results in knowledge_base.items():
+            self.network.add_rule(condition, results)
+        for fact in sorted(fact_set):
+            self.network.add_fact(fact)
+
+    def retract(self, text): #withdraws told facts, returns the symbols that no longer follow
+        removed = []
+        for sentence in split_sentences(text):
+            knowledge_base, fact_set = {}, set()
+            operator_chain(sentence, "FC", knowledge_base, fact_set)
+            if knowledge_base:
+                raise ValueError(f"Only facts can be retracted: {sentence}")
+            for fact in sorted(fact_set):
+                removed.extend(self.network.retract(fact))
+        return removed
+
+    def ask(self, query):
+        if not self.network.holds(query.strip()):
+            return "NO", None
+        return "> YES: " + ', '.join(sorted(self.network.true, key=lambda x: (len(x), x))), None
+
+class BackwardChainingSession:
+    def __init__(self, knowledge_base=None, fact_set=()):
+        self.knowledge_base = knowledge_base if knowledge_base is not None else {}
+        self.fact_set = set(fact_set)
+        self.table = GoalTable()  #memo of proven and failed goals shared by every query
+
+    @classmethod
+    def from_file(cls, filename, cache=None):
+        knowledge_base, fact_set, _ = load_parsed(cache, filename, "BC", lambda name: parse_chain_file(name, "BC"))
+        return cls(knowledge_base, fact_set)
+
+    def tell(self, text):
+        for sentence in split_sentences(text):
+            operator_chain(sentence, "BC", self.knowledge_base, self.fact_set)
+        self.table.invalidate_failures()
+
+    def ask(self, query):
+        derived_facts = set()
+        result = backward_chaining(self.knowledge_base, self.fact_set, query.strip(), derived_facts, self.table)
+        return result, derived_facts
+
+#keeps one solver alive over the growing clause database, see dpll.EntailmentChecker
+class SatisfiabilitySession(EntailmentChecker):
+    def __init__(self, kb=None, solver_class=CDCLSolver):
+        super().__init__(kb if kb is not None else KnowledgeBase(), solver_class)
+
+    @classmethod
+    def from_file(cls, filename, solver_class=CDCLSolver, cache=None):
+        method = "DPLL" if solver_class is DPLLSolver else "CDCL"
+        kb, _ = load_parsed(cache, filename, method, parse_knowledge_base)
+        return cls(kb, solver_class)
+
+    def tell(self, text):
+        for sentence in split_sentences(text):
+            self.add_formula(LogicParser.parse_formula(sentence))
+
+    def ask(self, query):
+        return self.entails(LogicParser.parse_formula(query)), None
+
+def open_session(method, filename=None, workers=1, cache=None): #session for an inference method, loaded from a file's TELL section
+    if method == "TT":
+        return TruthTableSession.from_file(filename, workers, cache) if filename else TruthTableSession(workers=workers)
+    if method == "FC":
+        return ForwardChainingSession.from_file(filename, cache) if filename else ForwardChainingSession()
+    if method == "BC":
+        return BackwardChainingSession.from_file(filename, cache) if filename else BackwardChainingSession()
+    solver_class = DPLLSolver if method == "DPLL" else CDCLSolver
+    if filename:
+        return SatisfiabilitySession.from_file(filename, solver_class, cache)
+    return SatisfiabilitySession(None, solver_class)
@@ -0,0 +1,108 @@
+#query-driven slicing: the parts of a kb that cannot affect the queries are dropped before inference
+#  sentences and clauses: symbols are linked when they occur together in a sentence (clause). a connected
+#    component of that graph sharing no symbol with a query is independent of it: with KB = A & B and B
+#    over symbols of its own, KB |= q exactly when A |= q or B has no model, and the models of KB are the
+#    models of A times those of B. so B is dropped once it is known to have a model
+#  horn rules: a symbol is only derived through the rules concluding a symbol of its backward cone (the
+#    query and, recursively, the premises of rules concluding it); definite clauses always have a model,
+#    so everything outside the cone is dropped outright
+
+def link(groups): #union-find over the items of each group, returns the lookup of an item's component root
+    parent = {}
+
+    def find(item):
+        while True:
+            up = parent.get(item, item)
+            if up == item:
+                return item
+            parent[item] = item = parent.get(up, up)  #path halving
+
+    for group in groups:
+        items = iter(group)
+        first = next(items, None)
+        if first is None:
+            continue
+        root = find(first)
+        for item in items:
+            other = find(item)
+            if other != root:
+                parent[other] = root
+    return find
+
+#(slices, components) of parsed sentences: components maps a component root to its sentences in kb order,
+#slices lists (query indices, roots of the components the queries touch) with one slice per distinct cone,
+#in order of each slice's first query
+def sentence_slices(sentences, queries):
+    symbol_sets = [sentence.symbols() for sentence in sentences]
+    find = link(symbol_sets)
+    components = {}
+    for sentence, symbols in zip(sentences, symbol_sets):
+        components.setdefault(find(next(iter(symbols))), []).append(sentence)
+    cones = {}
+    for index, query in enumerate(queries):
+        roots = frozenset(root for root in map(find, query.symbols()) if root in components)
+        cones.setdefault(roots, []).append(index)
+    return [(indices, roots) for roots, indices in cones.items()], components
+
+#(clauses kept, components dropped) of a clause database: kept are the clauses of the components holding
+#one of the given variables (and any empty clause), each other component is dropped as a list of clauses;
+#kept is None when nothing is dropped. the union-find runs over the variable numbers in a list, reading the
+#csr arrays of the kb directly, since most kbs are one component and this pass is then pure overhead
+def clause_cone(kb, variables):
+    literals, offsets = kb.literals, kb.offsets
+    parent = list(range(kb.num_vars + 1))  #variable -> parent in the union-find forest
+
+    def find(var):
+        while parent[var] != var:
+            parent[var] = var = parent[parent[var]]  #path halving
+        return var
+
+    firsts = []  #clause -> its first variable, 0 for an empty clause
+    start = 0
+    for end in offsets[1:]:
+        if start == end:
+            firsts.append(0)
+            continue
+        first = abs(literals[start])
+        firsts.append(first)
+        root = find(first)
+        for index in range(start + 1, end):
+            other = abs(literals[index])
+            while parent[other] != other:  #find, inlined as this loop runs once per literal
+                parent[other] = other = parent[parent[other]]
+            if other != root:
+                parent[other] = root
+        start = end
+    roots = {find(var) for var in variables}
+    dropped = {}
+    for index, first in enumerate(firsts):
+        if first:
+            root = find(first)
+            if root not in roots:
+                dropped.setdefault(root, []).append(index)
+    if not dropped:
+        return None, []
+    left_out = set().union(*dropped.values())
+    kept = [kb.clause(index) for index in range(len(firsts)) if index not in left_out]
+    return kept, [[kb.clause(index) for index in indices] for indices in dropped.values()]
+
+#(rules, facts) of a forward chaining kb (premises -> conclusions) restricted to the backward cone of the queries
+def horn_cone(knowledge_base, fact_set, queries):
+    concluded_by = {}  #symbol -> premises of the rules concluding it
+    for premises, results in knowledge_base.items():
+        for result in results:
+            concluded_by.setdefault(result, []).append(premises)
+    cone = set(queries)
+    pending = list(cone)
+    while pending:
+        for premises in concluded_by.get(pending.pop(), ()):
+            for premise in premises:
+                if premise not in cone:
+                    cone.add(premise)
+                    pending.append(premise)
+    rules = {}
+    for premises, results in knowledge_base.items():
+        kept = [result for result in results if result in cone]
+        if kept:
+            rules[premises] = kept
+    return rules, fact_set & cone
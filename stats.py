@@ -0,0 +1,114 @@
+import json
+import time
+
+#opt-in instrumentation of one engine run over a file. the engines keep plain counters as part of their
+#bookkeeping (or derive them from state they already hold) and only read them out when a Stats object is
+#passed in, once per query, so a run without stats pays nothing beyond a None check per query
+
+GAUGES = {'max_depth', 'symbols', 'inferred', 'learned', 'renamed'}  #reported as is, every other counter per query as an increment
+RATES = {'rows': 'rows_per_s', 'propagations': 'propagations_per_s'}  #counter -> rate over the solve time
+
+class Stats:
+    def __init__(self, method, filename=None, hooks=()):
+        self.method = method
+        self.filename = None if filename is None else str(filename)
+        self.hooks = list(hooks)  #hook(event, record) for the 'parse', 'slice', 'preprocess', 'query' and 'finish' events
+        self.parse = None  #parse seconds and kb size counts
+        self.slice = None  #slicing seconds, parts of the kb kept and dropped
+        self.preprocess = None  #one entry per preprocessing step that ran
+        self.preprocess_seconds = 0.0
+        self.queries = []  #per query: seconds and counter increments
+        self.totals = {}  #counters as of the last answer
+        self.info = {}  #extra fields of the summary, e.g. the portfolio winner
+        self.started = self.mark = time.perf_counter()
+
+    def emit(self, event, record):
+        for hook in self.hooks:
+            hook(event, record)
+
+    def lap(self): #seconds since the previous event
+        now = time.perf_counter()
+        elapsed, self.mark = now - self.mark, now
+        return elapsed
+
+    def parsed(self, **counts): #the kb is parsed: records parse time and size counts
+        self.parse = dict(method=self.method, seconds=self.lap(), **counts)
+        self.emit('parse', self.parse)
+
+    def sliced(self, **counts): #the kb was cut down to the query cones: sentences, rules or clauses kept and dropped
+        self.slice = dict(method=self.method, seconds=self.lap(), **counts)
+        self.emit('slice', self.slice)
+
+    def preprocessed(self, report): #the clauses were simplified before search, report has one entry per step
+        self.preprocess = [dict(step, method=self.method) for step in report]
+        self.preprocess_seconds = self.lap()  #setup included, so it can exceed the sum of the steps
+        for step in self.preprocess:
+            self.emit('preprocess', step)
+
+    def answered(self, counters=None): #one query is answered: records its time and counter increments
+        record = {'method': self.method, 'query': len(self.queries), 'seconds': self.lap()}
+        for name, value in (counters or {}).items():
+            record[name] = value if name in GAUGES else value - self.totals.get(name, 0)
+        self.totals.update(counters or {})
+        self.queries.append(record)
+        self.emit('query', record)
+
+    #takes over the events of a run summarized in another process (the engine answering for a portfolio),
+    #sending them to the hooks; the query records keep the method of that run
+    def replay(self, summary):
+        for event in ('parse', 'slice'):
+            if summary[event] is not None:
+                setattr(self, event, summary[event])
+                self.emit(event, summary[event])
+        if summary['preprocess'] is not None:
+            self.preprocess, self.preprocess_seconds = summary['preprocess'], summary['preprocess_seconds']
+            for step in self.preprocess:
+                self.emit('preprocess', step)
+        for record in summary['queries']:
+            self.queries.append(record)
+            self.emit('query', record)
+        self.totals.update((name, value) for name, value in summary['totals'].items() if name not in RATES.values())
+        self.mark = time.perf_counter()
+
+    def summary(self):
+        solve_seconds = sum(record['seconds'] for record in self.queries)
+        totals = dict(self.totals)
+        for name, rate in RATES.items():
+            if name in totals and solve_seconds > 0:
+                totals[rate] = round(totals[name] / solve_seconds, 1)
+        return dict(method=self.method, file=self.filename, seconds=time.perf_counter() - self.started,
+                    parse=self.parse, slice=self.slice, preprocess=self.preprocess, preprocess_seconds=self.preprocess_seconds,
+                    solve_seconds=solve_seconds, totals=totals,
+                    queries=self.queries, **self.info)
+
+    def finish(self): #the run is over: sends the summary to the hooks and returns it
+        summary = self.summary()
+        self.emit('finish', summary)
+        return summary
+
+    def to_json(self):
+        return json.dumps(self.summary())
+
+    def format(self): #human readable report
+        summary = self.summary()
+        lines = [f"{self.method} stats for {self.filename}: {summary['seconds']:.4f} s total"]
+        if self.parse is not None:
+            counts = ', '.join(f"{name} {value}" for name, value in self.parse.items()
+                               if name not in ('method', 'seconds'))
+            lines.append(f"  parse   {self.parse['seconds']:.4f} s" + (f"  ({counts})" if counts else ''))
+        if self.slice is not None:
+            counts = ', '.join(f"{name} {value}" for name, value in self.slice.items() if name not in ('method', 'seconds'))
+            lines.append(f"  slice   {self.slice['seconds']:.4f} s  ({counts})")
+        for step in self.preprocess or ():
+            lines.append(f"  {step['step']:<12} {step['seconds']:.4f} s  (clauses {-step['clauses_removed']:+d}, "
+                         f"literals {-step['literals_removed']:+d}, variables {-step['variables_removed']:+d})")
+        lines.append(f"  solve   {summary['solve_seconds']:.4f} s over {len(self.queries)} queries")
+        for name, value in summary['totals'].items():
+            lines.append(f"  {name:<20} {value}")
+        for name, value in self.info.items():
+            lines.append(f"  {name:<20} {value}")
+        for record in self.queries:
+            counters = ', '.join(f"{name} {value}" for name, value in record.items()
+                                 if name not in ('method', 'query', 'seconds'))
+            lines.append(f"  query {record['query'] + 1}: {record['seconds']:.4f} s" + (f"  ({counters})" if counters else ''))
+        return '\n'.join(lines)
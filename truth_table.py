@@ -1,152 +1,305 @@
-from itertools import product 
-from logic_operators import operator_table, generic_operator_table 
-
-#truth table parser
-def parse_truth_table_file(filename):
-    with open(filename, 'r') as file:
-        lines = file.read().split('\n') #reads all lines and split by newline
-
-    knowledge_base = [] #stores the logical statements from the knowledge base
-    fact_set = set()  #set of facts from the KB
-    query_statement = 0 #placeholder for the ask statement
-    parse_mode = 0 #tracks whether currently parsing TELL or ASK
-    bracket_flag = 0  # 0 indicates no brackets in test case, 1 indicates brackets
-
-    for line in lines: 
-        line = line.strip()
-        if line == "TELL":
-            parse_mode = 'TELL' #switch to parsing knowledge base (tell mode)
-        elif line == "ASK":
-            parse_mode = 'ASK' #switch to parsing query (ask mode)
-        elif parse_mode == 'TELL':
-            #parse logical statements from the tell section
-            clauses = line.split(';') 
-            for clause in clauses:
-                clause = clause.strip()
-                if any('(' in clause for clause in clauses):
-                    #detect if any clause contains brackets
-                    bracket_flag = 1
-                if bracket_flag == 0:
-                    #process clause without brackets using the basic operator table
-                    operator_table(clause, knowledge_base, fact_set)
-                else:
-                    #process clause with brackets using the generic operator table
-                    generic_operator_table(clause, knowledge_base, fact_set)
-        elif parse_mode == 'ASK' and line:
-            #parse the query 
-            query_statement = line.strip()
-    return knowledge_base, fact_set, query_statement, bracket_flag 
-
-#constructing truth table for symbols in KB
-def generate_truth_combinations(symbols):
-    num_symbols = len(symbols) #determine number of symbols
-    truth_combinations = []
-    #generate cartesian product of truth values for all symbols
-    for truth_values in product([True, False], repeat=num_symbols):
-        #map each symbol to its corresponding truth value
-        truth_combinations.append(dict(zip(symbols, truth_values)))
-    return truth_combinations
-
-def evaluate_clause(row, condition): #evaluates single logical clause given a row of truth values
-    if isinstance(condition, tuple):
-        return all(row.get(c, False) for c in condition)
-    return row.get(condition, False)
-
-#basic truth table evaluation without handling brackets
-def evaluate_truth_table(knowledge_base, fact_set, query_statement):
-    symbols = set()  # collect symbols from knowledge base and facts
-
-    #add symbols from kb
-    for condition, _ in knowledge_base:
-        symbols.update(condition)
-
-    symbols.update(fact_set)  #add symbols from facts
-    truth_combinations = generate_truth_combinations(symbols)
-
-    final_conditions = []  #store conditions for final evaluation
-    
-    for row in truth_combinations:  #evaluate each row in the truth table
-        #set the known facts to true in current row
-        for fact in fact_set:
-            row[fact] = True
-            
-        for condition, result in knowledge_base:
-            #store current condition for final evaluation
-            final_conditions = condition
-            
-            #handle or conditions
-            if any('*' in c for c in condition):
-                clean_condition = tuple(c.replace('*', '') for c in condition)
-                #if any condition is true, set result to true
-                if any(row.get(c, False) for c in clean_condition):
-                    row[result] = True
-            else:
-                #handle and conditions
-                if all(row[c] for c in condition):
-                    row[result] = True
-
-    #combine the evaluated condition and query
-    evaluated_clause = final_conditions + (query_statement,)
-    #check if the query is true in final row
-    return f"> YES: {len(evaluated_clause)}" if query_statement in truth_combinations[-1] and truth_combinations[-1][query_statement] else "NO"
-
-def evaluate_generic_truth_table(knowledge_base, fact_set, query_statement):
-    symbols = set()
-
-    for condition, _, _ in knowledge_base:
-        symbols.update(condition)
-
-    symbols.update(fact_set)
-    truth_combinations = generate_truth_combinations(symbols)
-
-    #organize clauses by their nesting level
-    bracketed_clauses = {}
-    final_conditions = []
-    
-    for clause in knowledge_base:
-        if clause[2] not in bracketed_clauses:
-            bracketed_clauses[clause[2]] = []
-        bracketed_clauses[clause[2]].append(clause)
-        final_conditions = clause[0]  #store the last condition
-
-    #evaluate each row in the truth table
-    for row in truth_combinations:
-        for fact in fact_set:  #set known facts to true
-            row[fact] = True
-
-        #evaluate clauses level by level
-        for level in sorted(bracketed_clauses.keys()):
-            level_results = {}
-            for condition, result, _ in bracketed_clauses[level]:
-                #handle inner conditions for nested clauses
-                if condition == ('@',):
-                    inner_conditions = []
-                    for prev_level in range(level - 1, -1, -1):
-                        for cond, res, _ in bracketed_clauses.get(prev_level, []):
-                            if cond == ('@',):
-                                inner_conditions.append(knowledge_base[0][0])
-                            else:
-                                inner_conditions.append(cond)
-                    #evaluate inner conditions
-                    for inner_condition in inner_conditions:
-                        if evaluate_clause(row, inner_condition):
-                            level_results[result] = True
-                else:
-                    #handle or conditions
-                    if any('*' in c for c in condition):
-                        clean_condition = tuple(c.replace('*', '') for c in condition)
-                        if any(row.get(c, False) for c in clean_condition):
-                            row[result] = True
-                    else:
-                        #evaluate the condition normally
-                        if evaluate_clause(row, condition):
-                            level_results[result] = True
-
-            #set the results for the current level in the truth table row
-            for result in level_results:
-                row[result] = True
-
-    #combine evaluated condition and query
-    evaluated_clause = len(final_conditions) + len(bracketed_clauses) + len(query_statement)
-    #return whether the query is satisfied in the final row
-    return f"> YES {evaluated_clause}" if evaluate_clause(truth_combinations[-1], query_statement) else "NO"
\ No newline at end of file
+import multiprocessing
+from functools import lru_cache
+from concurrent.futures import ProcessPoolExecutor, as_completed  #parallel truth table partitions
+from logic_operators import LogicParser, LogicalOperator, read_statements
+from model_count import count_entails_all, count_sentences  #exact counting for tables too large to enumerate
+from slicing import sentence_slices  #query cones of the kb
+from dpll import KnowledgeBase, formula_clauses  #clause form of the kb for the horn check
+from cnf import TseitinEncoder
+from horn import HornEntailment  #linear-time entailment for (renamable) horn kbs
+
+#truth table parser
+def parse_truth_table_file(filename):
+    knowledge_base = [] #stores the parsed sentences of the knowledge base
+    queries = [] #every query of the ask section, in order
+
+    #statements are streamed from the file one at a time, so only the parsed formulas are kept in memory
+    for section, statement in read_statements(filename):
+        if section == 'TELL':
+            knowledge_base.append(LogicParser.parse_formula(statement)) #sentence of the knowledge base
+        elif section == 'ASK':
+            queries.append(LogicParser.parse_formula(statement)) #query, one per line or separated by semicolons
+    return knowledge_base, queries
+
+ROW_BITS = 16  #each block of the truth table covers 2^ROW_BITS rows, one bit per row
+ENUMERATE_SYMBOLS = 24  #larger tables are decided by model counting (model_count.py) instead of enumeration
+
+STEP_KINDS = {
+    LogicalOperator.NOT: 'not',
+    LogicalOperator.AND: 'and',
+    LogicalOperator.OR: 'or',
+    LogicalOperator.IMPLIES: 'implies',
+    LogicalOperator.EQUIVALENCE: 'iff',
+}
+
+#flattens the shared formula dag into a list of steps in dependency order, each step computing one
+#node once per block: ('var', column), ('not', slot), ('and' | 'or', slots), ('implies' | 'iff', slots)
+#returns (number of symbols, steps, slot of each formula)
+def flatten_formulas(formulas):
+    columns = {}  #symbol name -> column
+    slots = {}  #formula node -> step index
+    steps = []
+    for root in formulas:
+        stack = [(root, False)]
+        while stack:
+            node, expanded = stack.pop()
+            if node in slots:
+                continue
+            if node.op is None:
+                slots[node] = len(steps)
+                steps.append(('var', columns.setdefault(node.name, len(columns))))
+            elif expanded:
+                slots[node] = len(steps)
+                steps.append((STEP_KINDS[node.op], tuple(slots[arg] for arg in node.args)))
+            else:
+                stack.append((node, True))
+                stack.extend((arg, False) for arg in reversed(node.args) if arg not in slots)
+    return len(columns), steps, [slots[formula] for formula in formulas]
+
+STEP_TEMPLATES = {
+    'not': lambda args: f"full & ~v{args[0]}",
+    'and': lambda args: ' & '.join(f"v{slot}" for slot in args) if args else 'full',
+    'or': lambda args: ' | '.join(f"v{slot}" for slot in args) if args else '0',
+    'implies': lambda args: f"(full & ~v{args[0]}) | v{args[1]}",
+    'iff': lambda args: f"full & ~(v{args[0]} ^ v{args[1]})",
+}
+COMPILED_CACHE_SIZE = 128
+compiled_programs = {}  #program -> compiled block evaluator, oldest entries evicted first
+
+#generates python source evaluating a whole program over one block with one local per step,
+#compiles it once and caches the function; it returns (rows where the KB holds, rows where each query holds)
+def compile_program(program):
+    evaluator = compiled_programs.get(program)
+    if evaluator is not None:
+        return evaluator
+    _, steps, kb_slots, query_slots = program
+    lines = ['def evaluate(columns, full):']
+    for slot, (kind, args) in enumerate(steps):
+        expression = f"columns[{args}]" if kind == 'var' else STEP_TEMPLATES[kind](args)
+        lines.append(f"    v{slot} = {expression}")
+    kb_expression = ' & '.join(f"v{slot}" for slot in kb_slots) if kb_slots else 'full'
+    query_expression = ''.join(f"v{slot}, " for slot in query_slots)
+    lines.append(f"    return {kb_expression}, ({query_expression})")
+    namespace = {}
+    exec(compile('\n'.join(lines), '<truth table program>', 'exec'), namespace)
+    evaluator = namespace['evaluate']
+    if len(compiled_programs) >= COMPILED_CACHE_SIZE:
+        del compiled_programs[next(iter(compiled_programs))]
+    compiled_programs[program] = evaluator
+    return evaluator
+
+@lru_cache(maxsize=None)
+def block_columns(row_bits): #bit-vector columns of the symbols that vary inside a block of 2^row_bits rows
+    rows = 1 << row_bits
+    full = (1 << rows) - 1
+    columns = []
+    for i in range(row_bits):
+        #symbol i alternates every 2^i rows: repeat one period of the pattern across the block
+        period = 2 << i
+        unit = ((1 << (1 << i)) - 1) << (1 << i)
+        columns.append(unit * (full // ((1 << period) - 1)))
+    return tuple(columns), full
+
+#evaluates the blocks in [first, last), returns (counter-model found for each query, number of KB models seen,
+#number of blocks evaluated)
+#refuted carries the flags of queries already refuted; the scan stops once every query has a counter-model,
+#and stop is an optional event checked between blocks so another process can cancel the scan
+def scan_blocks(program, row_bits, first, last, stop=None, refuted=None):
+    num_symbols = program[0]
+    evaluate = compile_program(program)
+    low_columns, full = block_columns(row_bits)
+    refuted = list(refuted) if refuted is not None else [False] * len(program[3])
+    remaining = refuted.count(False)
+    models = scanned = 0
+    for block in range(first, last):
+        if remaining == 0 or (stop is not None and stop.is_set()):
+            break
+        #symbols above row_bits are constant over a block and follow the block number
+        columns = low_columns + tuple(full if (block >> i) & 1 else 0 for i in range(num_symbols - row_bits))
+        kb_rows, query_rows = evaluate(columns, full)
+        for i, rows in enumerate(query_rows):
+            if kb_rows & ~rows and not refuted[i]:
+                refuted[i] = True  #a model of the KB where the query is false
+                remaining -= 1
+        models += kb_rows.bit_count()
+        scanned += 1
+    return refuted, models, scanned
+
+#compiled KB handed to each worker process once, when the pool starts it
+worker_state = {}
+
+def init_worker(program, row_bits, stop):
+    compile_program(program)
+    worker_state.update(program=program, row_bits=row_bits, stop=stop)
+
+def scan_partition(first, last): #runs in a worker: scans one prefix of the assignment space
+    state = worker_state
+    return scan_blocks(state['program'], state['row_bits'], first, last, state['stop'])
+
+#splits the blocks by the values of the first prefix_bits block symbols and farms the prefixes out,
+#yields (counter-model flags so far, KB models so far, blocks evaluated so far) each time a partition finishes
+def parallel_scan(program, row_bits, workers):
+    num_blocks = 1 << (program[0] - row_bits)
+    prefix_bits = min(program[0] - row_bits, max(workers * 4 - 1, 1).bit_length())
+    span = num_blocks >> prefix_bits
+    context = multiprocessing.get_context()
+    stop = context.Event()
+    refuted = [False] * len(program[3])
+    models = blocks = 0
+    with ProcessPoolExecutor(max_workers=workers, mp_context=context, initializer=init_worker,
+                             initargs=(program, row_bits, stop)) as pool:
+        futures = [pool.submit(scan_partition, start, start + span) for start in range(0, num_blocks, span)]
+        for future in as_completed(futures):
+            partial_refuted, partial, scanned = future.result()
+            refuted = [a or b for a, b in zip(refuted, partial_refuted)]
+            models += partial
+            blocks += scanned
+            if all(refuted):
+                stop.set()
+                for other in futures:
+                    other.cancel()  #drop prefixes that have not started, running ones see the stop event
+                yield refuted, models, blocks
+                return
+            yield refuted, models, blocks
+
+#serial scan one block at a time so refuted queries can be reported before the scan ends
+def serial_scan(program, row_bits):
+    refuted = None
+    models = 0
+    for block in range(1 << (program[0] - row_bits)):
+        refuted, partial, _ = scan_blocks(program, row_bits, block, block + 1, refuted=refuted)
+        models += partial
+        yield refuted, models, block + 1
+        if all(refuted):
+            return
+
+#streams the 2^n assignments of the KB and query symbols block by block and checks KB |= query for every
+#query in the same pass; yields (entailed, number of KB models) per query in query order, as soon as the
+#answer of that query and of every query before it is final (the count is None for refuted queries);
+#a dict passed as counters is kept up to date with the number of truth table rows evaluated. above
+#ENUMERATE_SYMBOLS symbols the same answers and counts come from the model counter instead, whose search
+#counters then go to counters, unless the table is scanned by several workers or enumerate_rows asks for
+#the table anyway. with horn, a kb that is horn in clause form (or after renaming) is answered by
+#horn_entails_all instead
+def truth_table_entails_all(sentences, queries, row_bits=ROW_BITS, workers=1, counters=None, horn=True,
+                            enumerate_rows=False):
+    sentences, queries = list(sentences), list(queries)
+    if not queries:
+        return
+    answers = horn_entails_all(sentences, queries, counters) if horn else None
+    if answers is not None:
+        yield from answers
+        return
+    num_symbols, steps, slots = flatten_formulas(sentences + queries)
+    if num_symbols > ENUMERATE_SYMBOLS and workers == 1 and not enumerate_rows:
+        yield from count_entails_all(sentences, queries, counters)
+        return
+    program = (num_symbols, tuple(steps), tuple(slots[:-len(queries)]), tuple(slots[-len(queries):]))
+    row_bits = min(row_bits, num_symbols)
+    if workers > 1 and num_symbols > row_bits:
+        progress = parallel_scan(program, row_bits, workers)
+    else:
+        progress = serial_scan(program, row_bits)
+    answered = 0
+    refuted, models = [False] * len(queries), 0
+    for refuted, models, blocks in progress:
+        if counters is not None:
+            counters['rows'] = blocks << row_bits
+        while answered < len(queries) and refuted[answered]:
+            yield False, None  #refutations are final as soon as they are found
+            answered += 1
+    #models are counted over the symbols of every query; each count is reported over the KB and its own
+    #query symbols, the other symbols being free in every KB model
+    kb_symbols = set().union(*(sentence.symbols() for sentence in sentences))
+    for query, flag in zip(queries[answered:], refuted[answered:]):
+        yield (False, None) if flag else (True, models >> (num_symbols - len(kb_symbols | query.symbols())))
+
+#(entailed, number of KB models) per query like truth_table_entails_all, None when the clauses of the kb
+#and queries are not horn under one renaming. entailment is decided by horn-sat, only the model count of
+#an entailed query needs a search, done once by the model counter; counters get the horn and renamed counts.
+#the kb is given up at the first sentence that is not clausal: its tseitin definitions are seldom horn and
+#encoding them costs more than the table it would save
+def horn_entails_all(sentences, queries, counters=None):
+    kb = KnowledgeBase()
+    for sentence in sentences:
+        clauses = formula_clauses(sentence, kb.symbol_table.intern)
+        if clauses is None:
+            return None
+        for clause in clauses:
+            kb.add_clause(clause)
+    horn = HornEntailment(kb, TseitinEncoder(kb))
+    answers = []
+    for query in queries:
+        answers.append(horn.entails(query))
+        if answers[-1] is None:
+            return None
+    return horn_answers(sentences, queries, answers, horn.renamed, counters)
+
+def horn_answers(sentences, queries, answers, renamed, counters):
+    kb_symbols = set().union(*(sentence.symbols() for sentence in sentences))
+    total = None
+    for index, (query, entailed) in enumerate(zip(queries, answers)):
+        models = None
+        if entailed:
+            if total is None:
+                total = count_sentences(sentences)
+            models = total << len(query.symbols() - kb_symbols)  #query-only symbols are free in every model
+        if counters is not None:
+            counters.update(horn=index + 1, renamed=renamed)
+        yield entailed, models
+
+#(entailed, number of KB models) for one query
+def truth_table_entails(sentences, query, row_bits=ROW_BITS, workers=1, horn=True, enumerate_rows=False):
+    return next(truth_table_entails_all(sentences, [query], row_bits, workers, horn=horn, enumerate_rows=enumerate_rows))
+
+#truth_table_entails_all over a kb sliced by sentence_slices (see slicing.py): queries with the same cone
+#share one table over the symbols of the cone, and KB model counts are multiplied by the model count of the
+#components left out; answers still come in query order, later ones held back until those before are out
+def sliced_entails_all(queries, slices, components, workers=1, counters=None):
+    component_models = {}  #root -> model count of a component left out of some cone
+    answers = {}
+    answered = 0
+    done = {}  #counters of the slices already finished
+    for indices, roots in slices:
+        factor = 1
+        for root in components.keys() - roots:
+            if root not in component_models:
+                component_models[root] = count_sentences(components[root])
+            factor *= component_models[root]
+        kept = [sentence for root, part in components.items() if root in roots for sentence in part]
+        partial = None if counters is None else {}
+        if factor:
+            results = truth_table_entails_all(kept, [queries[i] for i in indices], workers=workers, counters=partial)
+        else:
+            results = ((True, 0) for _ in indices)  #a component left out has no model, so the kb entails anything
+        for index, (entailed, models) in zip(indices, results):
+            answers[index] = (entailed, None if models is None else models * factor)
+            if counters is not None:
+                counters.update({name: done.get(name, 0) + value for name, value in partial.items()})
+            while answered in answers:
+                yield answers.pop(answered)
+                answered += 1
+        if counters is not None:
+            done = dict(counters)
+
+#truth table evaluation over the parsed sentences of the knowledge base, one answer per query in order;
+#a Stats object passed as stats receives the rows evaluated (or the counting search counters) after each query.
+#with slicing the table only covers the symbols each query depends on
+def evaluate_truth_table_queries(knowledge_base, queries, workers=1, stats=None, slicing=False):
+    counters = None if stats is None else {}
+    if slicing:
+        slices, components = sentence_slices(knowledge_base, queries)
+        if stats is not None:
+            kept = set().union(*(roots for _, roots in slices))
+            stats.sliced(kept=sum(len(components[root]) for root in kept), cones=len(slices),
+                         dropped=sum(len(part) for root, part in components.items() if root not in kept))
+        results = sliced_entails_all(queries, slices, components, workers, counters)
+    else:
+        results = truth_table_entails_all(knowledge_base, queries, workers=workers, counters=counters)
+    for entailed, models in results:
+        if stats is not None:
+            stats.answered(counters)
+        yield f"> YES: {models}" if entailed else "NO"
+
+def evaluate_truth_table(knowledge_base, query_statement, workers=1):
+    return next(evaluate_truth_table_queries(knowledge_base, [query_statement], workers))